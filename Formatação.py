@@ -1,19 +1,131 @@
+"""
+Padroniza as placas (com traço) de uma ou várias planilhas.
+
+Sem argumentos formata todas as planilhas de PLANILHAS/ em paralelo (um
+processo por arquivo). Placas no formato antigo (ABC-1234) e Mercosul
+(ABC-1D23) são aceitas; linhas com placa inválida não vão para a planilha
+formatada e ficam na aba REJEITADAS do mesmo arquivo.
+
+Um arquivo só, sem --saida, vira Pendencia_formatado.xlsx ao lado do script,
+como no script antigo: é a planilha que o Lançamento.py lê (EXCEL_PATH).
+
+Uso:
+    python Formatação.py                                   # PLANILHAS/ -> PLANILHAS_FORMATADAS/
+    python Formatação.py "Pan 02-09.xlsx"                  # -> Pendencia_formatado.xlsx
+    python Formatação.py "Pan 02-09.xlsx" --saida pan.xlsx
+    python Formatação.py PLANILHAS --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 
-# Ler planilha
-df = pd.read_excel("Pan 02-09.xlsx")
+PASTA_SCRIPT = Path(__file__).parent.absolute()
+PASTA_ENTRADA = PASTA_SCRIPT / "PLANILHAS"
+PASTA_SAIDA = PASTA_SCRIPT / "PLANILHAS_FORMATADAS"
+SUFIXO_SAIDA = "_formatado"
+ARQUIVO_LANCAMENTO = PASTA_SCRIPT / "Pendencia_formatado.xlsx"  # entrada do Lançamento.py
+
+# Sem traço: antiga AAA9999, Mercosul AAA9A99
+PADRAO_PLACA = r"[A-Z]{3}\d[A-Z0-9]\d{2}"
+
+
+def padronizar_placas(placas):
+    """Adiciona o traço (vetorizado): devolve (placas com traço, máscara das válidas)"""
+    limpas = placas.astype("string").str.upper().str.replace(r"[\s.\-]", "", regex=True)
+    validas = limpas.str.fullmatch(PADRAO_PLACA).fillna(False).astype(bool)
+    formatadas = limpas.str[:3] + "-" + limpas.str[3:]
+    return formatadas.where(validas, placas.astype("string")), validas
+
+
+def _coluna_placa(df):
+    for coluna in df.columns:
+        if str(coluna).strip().lower() == "placa":
+            return coluna
+    return None
+
+
+def formatar_planilha(entrada, saida):
+    """Formata um arquivo em saida (.xlsx); devolve (nome, total, válidas, rejeitadas, erro)"""
+    entrada = Path(entrada)
+    try:
+        df = pd.read_excel(entrada)
+        coluna = _coluna_placa(df)
+        if coluna is None:
+            return entrada.name, len(df), 0, 0, f"sem coluna de placa (colunas: {list(df.columns)})"
+
+        df[coluna], validas = padronizar_placas(df[coluna])
+        aceitas, rejeitadas = df[validas], df[~validas]
+
+        with pd.ExcelWriter(saida) as escritor:
+            aceitas.to_excel(escritor, index=False)
+            if len(rejeitadas):
+                rejeitadas.to_excel(escritor, sheet_name="REJEITADAS", index=False)
+        return entrada.name, len(df), len(aceitas), len(rejeitadas), None
+    except Exception as e:
+        return entrada.name, 0, 0, 0, str(e)
+
+
+def listar_planilhas(caminhos):
+    arquivos = []
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            arquivos.extend(sorted(p for p in caminho.glob("*.xlsx")
+                                   if not p.name.startswith("~$") and not p.stem.endswith(SUFIXO_SAIDA)))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Padroniza as placas das planilhas (antiga e Mercosul)")
+    parser.add_argument("entradas", nargs="*", default=[str(PASTA_ENTRADA)], help="arquivos .xlsx ou pastas")
+    parser.add_argument("--saida", help="pasta das planilhas formatadas, ou o .xlsx de saída de uma entrada só "
+                                         f"(padrão: {PASTA_SAIDA.name}/, ou {ARQUIVO_LANCAMENTO.name} para um arquivo)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    arquivos = listar_planilhas(args.entradas)
+    if not arquivos:
+        print("❌ Nenhuma planilha encontrada")
+        sys.exit(1)
+
+    saida = args.saida
+    if saida is None:
+        um_arquivo = len(args.entradas) == 1 and Path(args.entradas[0]).is_file()
+        saida = ARQUIVO_LANCAMENTO if um_arquivo else PASTA_SAIDA
+    saida = Path(saida)
+    if saida.suffix.lower() == ".xlsx":
+        if len(arquivos) != 1:
+            print(f"❌ --saida {saida.name} só vale para uma planilha ({len(arquivos)} encontradas)")
+            sys.exit(1)
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        destinos = [saida]
+    else:
+        saida.mkdir(parents=True, exist_ok=True)
+        destinos = [saida / f"{arquivo.stem}{SUFIXO_SAIDA}{arquivo.suffix}" for arquivo in arquivos]
+
+    inicio = time.perf_counter()
+    workers = max(1, min(args.workers, len(arquivos)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        resultados = list(executor.map(formatar_planilha, arquivos, destinos))
 
-# Adicionar traço
-def padronizar_placa(placa):
-    placa = str(placa).strip().upper().replace(" ", "")
-    if "-" in placa:
-        return placa
-    if len(placa) >= 4:
-        return placa[:3] + "-" + placa[3:]
-    return placa
+    houve_erro = False
+    for nome, total, aceitas, rejeitadas, erro in resultados:
+        if erro:
+            houve_erro = True
+            print(f"❌ {nome}: {erro}")
+        else:
+            aviso = f" | ⚠️ {rejeitadas} placas inválidas (aba REJEITADAS)" if rejeitadas else ""
+            print(f"✅ {nome}: {aceitas}/{total} placas formatadas{aviso}")
+    print(f"⏱️  {len(arquivos)} planilhas em {time.perf_counter() - inicio:.1f}s -> {saida}")
+    if houve_erro:
+        sys.exit(1)
 
-df["placa"] = df["placa"].apply(padronizar_placa)
 
-# Salvar de volta
-df.to_excel("Pendencia_formatado.xlsx", index=False)
-print("✅ Planilha atualizada com traços!")
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 import pandas as pd
+import argparse
 import time
 import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support.ui import Select
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, TimeoutException
 import logging
+from urllib.parse import urljoin
+
+from agendador_retentativas import AgendadorRetentativas, VeiculoNaoEncontrado
+from atualizacao_http import LIMITE_CONCORRENCIA, LIMITE_MAXIMO, atualizar_emissoes_http
+from controle_ritmo import ControladorAIMD
+from esperas import (aguardar_ajax_ocioso, aguardar_clicavel, aguardar_habilitado,
+                     aguardar_modal_fechado, aguardar_nova_aba, aguardar_visivel, resumo_esperas)
+from indice_veiculos import PADRAO_PLACA, IndiceVeiculos, normalizar_placa
+from latencia import MedidorEtapas
+from memoria_navegador import VigiaMemoria
+from navegador import CHROME, COMPLETO, ENXUTO, aplicar_perfil, bloquear_recursos, criar_driver, sem_janela
+from paginas import SELETORES_FREITAS, link_veiculo
+from planilhas import ler_planilha
+from registro_progresso import RegistroProgresso, escopo_da_planilha
+from sessao_salva import SessaoSalva, cookie_para_selenium
 
 # ==============================
 # CONFIGURAÇÕES
@@ -18,16 +32,54 @@ EXCEL_PATH = r"C:\Users\vinia\OneDrive\Desktop\FREITAS\Pendencia_formatado.xlsx"
 # Alternative: usar caminho relativo
 # EXCEL_PATH = "Pendencia_formatado.xlsx"
 
-SELECTORS = {
-    "campo_pesquisa": (By.ID, "txtPesquisarVeiculos"),
-    "botao_pesquisar": (By.ID, "btnPesquisarVeiculos"),
-    "aba_leilao": (By.ID, "leilao-tab"),
-    "campo_emissao": (By.ID, "ATPVEmitida"),
-    "campo_data": (By.ID, "DataEmitidaATPV"),
-    "botao_salvar": (By.XPATH, "//button[@onclick='atualizarEmissaoATPVForm();']"),
-    "popup_sim": (By.XPATH, "//button[contains(text(),'Sim')]"),
-    "popup_ok": (By.ID, "modalJsAlertOk"),
-}
+URL_LOGIN = os.environ.get("FREITAS_URL_LOGIN", "https://login.freitasleiloeiro.com.br/Home/Login")
+
+# Navegador sem janela (usado pelo benchmark)
+HEADLESS = os.environ.get("NAVEGADOR_HEADLESS") == "1"
+
+# Perfil do navegador: "completo" (janela normal) ou "enxuto" (headless, sem imagens/fontes)
+PERFIL_NAVEGADOR = os.environ.get("PERFIL_NAVEGADOR_LANCAMENTO", os.environ.get("PERFIL_NAVEGADOR", "completo"))
+
+# Sessão salva após o login (cookies + localStorage): evita o login manual enquanto não expirar
+SESSAO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessao_freitas.json")
+
+# Motor da atualização: "selenium" (tela do veículo) ou "http" (POST direto, navegador só nas falhas)
+MOTOR = os.environ.get("FREITAS_MOTOR", "selenium")
+
+# Registro de progresso por placa (permite retomar após uma queda)
+REGISTRO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progresso_lancamento.sqlite3")
+# Colunas que definem o trabalho: a mesma placa com outra data (ou em outra planilha) é refeita
+COLUNAS_ESCOPO = ["placa", "data_emissao"]
+
+# Placas com falha permanente ou que esgotaram as retentativas (com o motivo)
+FALHAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "FALHAS_LANCAMENTO.xlsx")
+
+# Índice placa -> URL da página do veículo (abre o veículo sem pesquisar)
+INDICE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indice_veiculos.json")
+# Refaz a varredura da listagem quando faltam mais que esta fração das placas
+PROPORCAO_FALTANTES_REINDEXAR = 0.2
+
+# Latência por etapa (resumo: python latencia.py latencia_lancamento.jsonl)
+LATENCIA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "latencia_lancamento.jsonl")
+
+# Memória do navegador por amostra (curvas: python memoria_navegador.py memoria_lancamento.jsonl)
+MEMORIA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria_lancamento.jsonl")
+
+# Seletores das páginas do Freitas (compartilhados em paginas.py)
+SELECTORS = SELETORES_FREITAS
+
+# Mensagens do WebDriver que indicam que a sessão do navegador morreu
+ERROS_FATAIS_DRIVER = (
+    "invalid session id",
+    "no such window",
+    "target window already closed",
+    "session deleted",
+    "disconnected",
+    "chrome not reachable",
+    "max retries exceeded",
+    "connection refused",
+)
+MAX_RECUPERACOES_POR_PLACA = 2
 
 # Configurar logging sem emojis para evitar problemas de encoding
 logging.basicConfig(
@@ -39,10 +91,49 @@ logging.basicConfig(
     ]
 )
 
+def formatar_data_emissao(valor, placa):
+    """Data da planilha no formato dd/mm/aaaa do Freitas ('' se vazia ou inválida)"""
+    if pd.isna(valor) or valor == "":
+        return ""
+    try:
+        return pd.to_datetime(valor).strftime("%d/%m/%Y")
+    except Exception:
+        logging.warning(f"Data inválida para placa {placa}: {valor}")
+        return ""
+
+def erro_fatal_driver(erro):
+    """Indica se o erro significa que a sessão do navegador não serve mais"""
+    if isinstance(erro, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    mensagem = str(erro).lower()
+    return any(trecho in mensagem for trecho in ERROS_FATAIS_DRIVER)
+
 class AutomatizadorFreitas:
-    def __init__(self):
+    def __init__(self, login=None, relogin=None, motor=MOTOR):
         self.driver = None
-        self.wait = None
+        self.ultimo_erro = None
+        self.ultimo_erro_fatal = False
+        # Sessão salva após o login, usada para restaurar o navegador
+        self.url_area = None
+        self.cookies_area = []
+        # Login inicial e login chamado quando os cookies não bastam
+        # (padrão: sessão salva em disco e, se expirou, login manual)
+        self.sessao = SessaoSalva(SESSAO_PATH)
+        self.login = login or self.entrar
+        self.relogin = relogin or self.login
+        self.recuperacoes = 0
+        self.tempo_recuperacao = 0.0
+        self.medidor = MedidorEtapas(LATENCIA_PATH)
+        # Recicla o navegador entre placas quando a memória (ou o número de placas) passa do limite
+        self.vigia = VigiaMemoria(MEMORIA_PATH, self.medidor.execucao)
+        self.indice = IndiceVeiculos(INDICE_PATH)
+        self.motor = motor
+        # Um navegador só: o AIMD controla o ritmo entre as placas (mais espaçado após erros do portal)
+        self.controle = ControladorAIMD(inicial=1, maximo=1, nome="Freitas navegador")
+        self.controle_http = ControladorAIMD(inicial=LIMITE_CONCORRENCIA, maximo=LIMITE_MAXIMO, nome="Freitas HTTP")
+        self.ultima_excecao = None
+        # Falhas transitórias voltam para o fim do lote com espera exponencial
+        self.agendador = AgendadorRetentativas()
     
     def verificar_arquivo_excel(self):
         """Verifica se o arquivo Excel existe e é válido"""
@@ -55,8 +146,8 @@ class AutomatizadorFreitas:
             return False
         
         try:
-            # Testa se consegue ler o arquivo
-            df = pd.read_excel(EXCEL_PATH)
+            # Testa se consegue ler o arquivo (a leitura fica em cache para o executar)
+            df = ler_planilha(EXCEL_PATH)
             if df.empty:
                 logging.error("O arquivo Excel está vazio")
                 return False
@@ -67,7 +158,7 @@ class AutomatizadorFreitas:
             
             if colunas_faltantes:
                 logging.error(f"Colunas faltantes no Excel: {colunas_faltantes}")
-                logging.info(f"Colunas encontradas: {list(df.columns)}")
+                logging.info(f"Colunas encontradas: {df.attrs['colunas_originais']}")
                 return False
             
             logging.info(f"Arquivo Excel validado com sucesso. {len(df)} registros encontrados.")
@@ -77,29 +168,77 @@ class AutomatizadorFreitas:
             logging.error(f"Erro ao ler arquivo Excel: {e}")
             return False
     
+    def criar_chrome(self, visivel=False):
+        """Chrome com o perfil configurado; visivel=True ignora o perfil/headless (janela do login manual)"""
+        perfil = COMPLETO if visivel else PERFIL_NAVEGADOR
+        options = webdriver.ChromeOptions()
+        if perfil != ENXUTO:
+            options.add_argument('--start-maximized')
+        aplicar_perfil(options, perfil, headless=HEADLESS and not visivel)
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        
+        # Driver resolvido pelo cache local, sem consultar a rede a cada início
+        driver = criar_driver(CHROME, options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        bloquear_recursos(driver, perfil)
+        return driver
+    
     def iniciar_navegador(self):
         """Inicializa o navegador Chrome"""
         try:
-            service = Service(ChromeDriverManager().install())
-            options = webdriver.ChromeOptions()
-            options.add_argument('--start-maximized')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.wait = WebDriverWait(self.driver, 30)
-            
+            self.driver = self.criar_chrome()
             logging.info("Navegador iniciado com sucesso")
             return True
         except Exception as e:
             logging.error(f"Erro ao iniciar navegador: {e}")
             return False
     
+    def area_logada(self):
+        """Checagem rápida: o campo de pesquisa da área aparece (logado)"""
+        try:
+            aguardar_visivel(self.driver, SELECTORS["campo_pesquisa"], timeout=10)
+            return True
+        except Exception:
+            return False
+    
+    def entrar(self):
+        """Reaproveita a sessão salva em disco; só pede o login manual se ela expirou"""
+        if self.sessao.restaurar(self.driver):
+            if self.area_logada():
+                logging.info("Sessão salva reaproveitada, sem login manual")
+                self.salvar_sessao()
+                return
+            logging.info("Sessão salva expirou, fazendo login manual")
+        self.fazer_login_manual()
+    
     def fazer_login_manual(self):
-        """Aguarda login manual do usuário"""
-        URL_LOGIN = "https://login.freitasleiloeiro.com.br/Home/Login"
+        """
+        Aguarda login manual do usuário. Com o navegador sem janela
+        (enxuto/headless) o login é feito em uma janela visível, e a sessão
+        passa para o navegador sem janela pelos cookies
+        """
+        if not sem_janela(PERFIL_NAVEGADOR, HEADLESS):
+            self.login_na_janela()
+            return
+        
+        logging.info("Navegador sem janela: abrindo uma janela só para o login")
+        sem_janela_driver = self.driver
+        self.driver = self.criar_chrome(visivel=True)
+        try:
+            self.login_na_janela()
+        finally:
+            self.driver.quit()
+            self.driver = sem_janela_driver
+        if not self.restaurar_sessao():
+            raise RuntimeError("O login da janela visível não passou para o navegador sem janela; "
+                               "rode com PERFIL_NAVEGADOR=completo e NAVEGADOR_HEADLESS desligado")
+        self.salvar_sessao()
+        logging.info("Login copiado para o navegador sem janela")
+    
+    def login_na_janela(self):
+        """Login manual no self.driver (visível), até a área logada"""
         self.driver.get(URL_LOGIN)
         input("Faça login manualmente e pressione ENTER para continuar...")
         
@@ -107,121 +246,370 @@ class AutomatizadorFreitas:
         input("Após selecionar a área desejada, pressione ENTER para continuar...")
         
         # Espera explícita por nova aba
-        self.wait.until(lambda d: len(d.window_handles) > 1)
+        aguardar_nova_aba(self.driver, 1)
         self.driver.switch_to.window(self.driver.window_handles[-1])
         logging.info("Mudou para a nova aba com a área selecionada")
         
-        # Espera adicional para carregamento
-        time.sleep(3)
+        # Espera o carregamento da área
+        aguardar_ajax_ocioso(self.driver)
+        aguardar_visivel(self.driver, SELECTORS["campo_pesquisa"])
+        self.salvar_sessao()
+    
+    def salvar_sessao(self):
+        """Guarda a URL e os cookies da aba logada para uma eventual recuperação"""
+        try:
+            self.url_area = self.driver.current_url
+            self.cookies_area = self.driver.get_cookies()
+            self.sessao.salvar(self.driver)
+        except Exception as e:
+            logging.warning(f"Não foi possível salvar a sessão: {e}")
+    
+    def restaurar_sessao(self):
+        """Abre a área logada com os cookies salvos; retorna True se funcionou"""
+        if not self.url_area or not self.cookies_area:
+            return False
+        self.driver.get(self.url_area)
+        for cookie in self.cookies_area:
+            try:
+                self.driver.add_cookie(cookie_para_selenium(cookie))
+            except Exception:
+                pass
+        self.driver.get(self.url_area)
+        try:
+            aguardar_visivel(self.driver, SELECTORS["campo_pesquisa"], timeout=10)
+            return True
+        except Exception:
+            return False
+    
+    def reiniciar_navegador(self):
+        """Fecha o navegador, abre outro e volta para a área logada (cookies ou login)"""
+        try:
+            if self.driver:
+                self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+        
+        if not self.iniciar_navegador():
+            return False
+        if self.restaurar_sessao():
+            logging.info("Sessão restaurada com os cookies salvos")
+        else:
+            logging.info("Cookies não restauraram a sessão, chamando o login")
+            self.relogin()
+        return True
+    
+    def recuperar_sessao(self):
+        """Reinicia o navegador e volta para a área logada"""
+        inicio = time.time()
+        logging.warning("Sessão do navegador perdida, reiniciando o navegador...")
+        try:
+            if not self.reiniciar_navegador():
+                return False
+            self.recuperacoes += 1
+            return True
+        except Exception as e:
+            logging.error(f"Falha ao recuperar a sessão: {e}")
+            return False
+        finally:
+            self.tempo_recuperacao += time.time() - inicio
+            logging.info(f"Recuperação levou {time.time() - inicio:.1f}s")
+    
+    def processar_com_recuperacao(self, placa, data_emissao):
+        """Processa a placa; se o navegador morrer, reinicia e tenta de novo"""
+        for tentativa in range(MAX_RECUPERACOES_POR_PLACA + 1):
+            with self.controle.pedido() as resultado:
+                sucesso = self.processar_placa(placa, data_emissao)
+                if not sucesso:
+                    resultado["erro"] = self.ultima_excecao
+            if sucesso:
+                return True
+            if not self.ultimo_erro_fatal or tentativa == MAX_RECUPERACOES_POR_PLACA:
+                return False
+            if not self.recuperar_sessao():
+                raise RuntimeError(f"Não foi possível recuperar o navegador: {self.ultimo_erro}")
+            logging.info(f"Repetindo placa {placa} após recuperação")
+        return False
+    
+    def listar_todos_veiculos(self):
+        """Pesquisa sem filtro: a primeira página da listagem de veículos"""
+        campo = aguardar_visivel(self.driver, SELECTORS["campo_pesquisa"])
+        campo.clear()
+        self.driver.find_element(*SELECTORS["botao_pesquisar"]).click()
+        aguardar_ajax_ocioso(self.driver)
+    
+    def preparar_indice(self, placas):
+        """Varre a listagem uma vez se o índice não cobre a planilha"""
+        faltantes = self.indice.faltantes(placas)
+        if len(faltantes) <= len(placas) * PROPORCAO_FALTANTES_REINDEXAR:
+            logging.info(f"Índice de veículos cobre {len(placas) - len(faltantes)}/{len(placas)} placas")
+            return
+        logging.info(f"{len(faltantes)} placas fora do índice, varrendo a listagem de veículos...")
+        try:
+            self.indice.construir(self.driver, self.listar_todos_veiculos, SELECTORS["proxima_pagina"],
+                                  SELECTORS["links_veiculos"])
+        except Exception as e:
+            logging.warning(f"Falha ao montar o índice de veículos, usando a pesquisa: {e}")
+            return
+        faltantes = self.indice.faltantes(placas)
+        if len(faltantes) > len(placas) * PROPORCAO_FALTANTES_REINDEXAR:
+            logging.warning(f"Índice ainda sem {len(faltantes)} placas: confira o seletor 'proxima_pagina' "
+                            f"(python verificar_seletores.py verificar freitas)")
+    
+    def abrir_pelo_indice(self, placa):
+        """Abre o veículo direto pela URL do índice; False se não há URL, ela ficou velha ou é de outra placa"""
+        url = self.indice.obter(placa)
+        if not url:
+            return False
+        self.driver.get(url)
+        try:
+            aguardar_clicavel(self.driver, SELECTORS["aba_leilao"], timeout=10)
+        except TimeoutException:
+            logging.warning(f"URL do índice não abriu o veículo {placa}, voltando para a pesquisa")
+            self.indice.remover(placa)
+            return False
+        if not self.placa_na_pagina(placa):
+            logging.warning(f"URL do índice abriu outro veículo no lugar de {placa}, voltando para a pesquisa")
+            self.indice.remover(placa)
+            return False
+        return True
+    
+    def placa_na_pagina(self, placa):
+        """Confere se a página do veículo aberta é mesmo da placa"""
+        texto = self.driver.find_element(By.TAG_NAME, "body").text.upper()
+        chave = normalizar_placa(placa)
+        return any(normalizar_placa(encontrada) == chave for encontrada in PADRAO_PLACA.findall(texto))
+    
+    def atualizar_por_http(self, df, registro):
+        """Marca por HTTP as placas pendentes; as que falharem seguem pelo navegador"""
+        placas = []
+        for _, row in df.iterrows():
+            placa = str(row["placa"]).strip()
+            if not registro.concluido(placa):
+                placas.append((placa, formatar_data_emissao(row.get("data_emissao", ""), placa)))
+        if not placas:
+            return
+        
+        logging.info(f"Atualizando {len(placas)} placas direto por HTTP...")
+        url_base = urljoin(self.url_area or self.driver.current_url, "/")
+        try:
+            atualizadas, pendentes = atualizar_emissoes_http(self.driver, placas, url_base, self.indice,
+                                                             self.controle_http)
+        except Exception as e:
+            logging.warning(f"Motor HTTP indisponível, seguindo pelo navegador: {e}")
+            return
+        
+        for placa in atualizadas:
+            registro.iniciar(placa)
+            registro.sucesso(placa)
+        logging.info(f"{len(atualizadas)} placas atualizadas por HTTP ({self.controle_http.resumo()})")
+        if pendentes:
+            logging.info(f"{len(pendentes)} placas seguem pelo navegador "
+                         f"(ex.: {pendentes[0][0]} - {pendentes[0][1]})")
     
     def processar_placa(self, placa, data_emissao):
         """Processa uma placa individual"""
+        self.ultimo_erro_fatal = False
+        self.ultima_excecao = None
         try:
             logging.info(f"Processando placa: {placa}")
             
-            # Pesquisar placa
-            campo = self.wait.until(EC.visibility_of_element_located(SELECTORS["campo_pesquisa"]))
-            campo.clear()
-            campo.send_keys(placa)
+            etapa = self.medidor.etapa
             
-            self.driver.find_element(*SELECTORS["botao_pesquisar"]).click()
+            # Abrir direto pelo índice
+            with etapa(placa, "abrir_indice"):
+                aberto = self.abrir_pelo_indice(placa)
             
-            # Clicar no link da placa
-            link_placa = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, f"//a[contains(@href,'{placa}')]"))
-            )
-            link_placa.click()
+            if not aberto:
+                # Pesquisar placa
+                with etapa(placa, "pesquisar"):
+                    campo = aguardar_visivel(self.driver, SELECTORS["campo_pesquisa"])
+                    campo.clear()
+                    campo.send_keys(placa)
+                    
+                    self.driver.find_element(*SELECTORS["botao_pesquisar"]).click()
+                
+                # Clicar no link da placa (e guardar a URL no índice)
+                with etapa(placa, "abrir_veiculo"):
+                    try:
+                        link_placa = aguardar_clicavel(self.driver, link_veiculo(placa))
+                    except TimeoutException:
+                        # Pesquisa terminada e sem o link: a placa não está cadastrada
+                        aguardar_ajax_ocioso(self.driver, timeout=5)
+                        if not self.driver.find_elements(*link_veiculo(placa)):
+                            raise VeiculoNaoEncontrado(f"Placa {placa} não encontrada na pesquisa do Freitas")
+                        raise
+                    self.indice.registrar(placa, link_placa.get_attribute("href"))
+                    link_placa.click()
             
             # Aba Leilão
-            aba_leilao = self.wait.until(EC.element_to_be_clickable(SELECTORS["aba_leilao"]))
-            aba_leilao.click()
-            time.sleep(2)  # Espera para carregamento da aba
-            
-            # Emissão ATPV = "Sim"
-            campo_emissao = self.wait.until(EC.presence_of_element_located(SELECTORS["campo_emissao"]))
-            self.wait.until(lambda d: campo_emissao.is_enabled())
-            select_emissao = Select(campo_emissao)
-            select_emissao.select_by_visible_text("Sim")
-            
-            # Data de emissão
-            if data_emissao:
-                campo_data = self.driver.find_element(*SELECTORS["campo_data"])
-                campo_data.clear()
-                campo_data.send_keys(data_emissao)
+            with etapa(placa, "aba_leilao"):
+                aba_leilao = aguardar_clicavel(self.driver, SELECTORS["aba_leilao"])
+                aba_leilao.click()
+            
+            # Emissão ATPV = "Sim" (espera a aba carregar e o campo habilitar)
+            with etapa(placa, "selecionar"):
+                campo_emissao = aguardar_habilitado(self.driver, SELECTORS["campo_emissao"])
+                select_emissao = Select(campo_emissao)
+                select_emissao.select_by_visible_text("Sim")
+                
+                # Data de emissão
+                if data_emissao:
+                    campo_data = self.driver.find_element(*SELECTORS["campo_data"])
+                    campo_data.clear()
+                    campo_data.send_keys(data_emissao)
             
             # Salvar
-            self.driver.find_element(*SELECTORS["botao_salvar"]).click()
+            with etapa(placa, "salvar"):
+                self.driver.find_element(*SELECTORS["botao_salvar"]).click()
             
             # Pop-ups de confirmação
-            self.wait.until(EC.element_to_be_clickable(SELECTORS["popup_sim"])).click()
-            self.wait.until(EC.element_to_be_clickable(SELECTORS["popup_ok"])).click()
-            
-            # Pequeno delay entre processamentos
-            time.sleep(1)
+            with etapa(placa, "popup_sim"):
+                aguardar_clicavel(self.driver, SELECTORS["popup_sim"]).click()
+            with etapa(placa, "popup_ok"):
+                aguardar_clicavel(self.driver, SELECTORS["popup_ok"]).click()
+                
+                # Espera o modal fechar antes da próxima placa
+                aguardar_modal_fechado(self.driver, SELECTORS["popup_ok"])
             
             logging.info(f"Placa {placa} processada com sucesso")
             return True
             
         except Exception as e:
             logging.error(f"Erro ao processar placa {placa}: {str(e)}")
+            self.ultimo_erro = str(e)
+            self.ultima_excecao = e
+            self.ultimo_erro_fatal = erro_fatal_driver(e)
             return False
     
-    def executar(self):
-        """Função principal de execução"""
+    def vigiar_memoria(self):
+        """Entre duas placas: recicla o navegador (mantendo o login) se o vigia pedir"""
         try:
-            # Verificar arquivo primeiro
-            if not self.verificar_arquivo_excel():
-                return
-            
-            # Ler planilha
-            df = pd.read_excel(EXCEL_PATH)
+            motivo = self.vigia.verificar(self.driver)
+        except Exception:
+            return
+        if not motivo:
+            return
+        inicio = time.time()
+        logging.info(f"Reciclando o navegador ({motivo})")
+        self.salvar_sessao()
+        try:
+            if self.reiniciar_navegador():
+                self.vigia.reciclado(self.driver)
+                logging.info(f"Navegador reciclado em {time.time() - inicio:.1f}s")
+        except Exception as e:
+            logging.error(f"Falha ao reciclar o navegador: {e}")
+    
+    def tentar_placa(self, registro, placa, data_emissao):
+        """Uma tentativa da placa com registro do resultado; falhas transitórias são reagendadas"""
+        self.vigiar_memoria()
+        registro.iniciar(placa)
+        if self.processar_com_recuperacao(placa, data_emissao):
+            registro.sucesso(placa)
+            return True
+        registro.falha(placa, self.ultimo_erro)
+        if self.agendador.falhou(placa, (placa, data_emissao), self.ultima_excecao or self.ultimo_erro):
+            logging.info(f"Placa {placa} reagendada")
+        return False
+    
+    def executar(self, df=None, recomecar=False):
+        """
+        Função principal de execução (df substitui a planilha do EXCEL_PATH;
+        recomecar apaga o progresso registrado desta planilha)
+        """
+        registro = None
+        try:
+            if df is None:
+                # Verificar arquivo primeiro
+                if not self.verificar_arquivo_excel():
+                    return
+                
+                # Ler planilha (já carregada pela verificação)
+                df = ler_planilha(EXCEL_PATH)
             total_placas = len(df)
             sucessos = 0
             
+            registro = RegistroProgresso(REGISTRO_PATH, escopo_da_planilha(df, COLUNAS_ESCOPO))
+            if recomecar:
+                logging.info(f"Progresso anterior desta planilha apagado ({registro.recomecar()} eventos)")
+            ja_concluidas = sum(1 for placa in df["placa"] if registro.concluido(str(placa).strip()))
+            if ja_concluidas:
+                logging.info(f"{ja_concluidas} placas já concluídas em execuções anteriores serão puladas")
+            
             logging.info(f"Iniciando processamento de {total_placas} placas")
             
             # Iniciar navegador e login
             if not self.iniciar_navegador():
                 return
             
-            self.fazer_login_manual()
+            self.login()
+            self.preparar_indice([str(placa).strip() for placa in df["placa"]])
+            
+            if self.motor == "http":
+                self.atualizar_por_http(df, registro)
             
             # Processar cada placa
             for i, row in df.iterrows():
                 placa = str(row["placa"]).strip()
-                data_emissao_raw = row.get("data_emissao", "")
+                if registro.concluido(placa):
+                    sucessos += 1
+                    continue
                 
                 # Formatar data
-                if pd.notna(data_emissao_raw) and data_emissao_raw != "":
-                    try:
-                        data_emissao = pd.to_datetime(data_emissao_raw).strftime("%d/%m/%Y")
-                    except:
-                        data_emissao = ""
-                        logging.warning(f"Data inválida para placa {placa}: {data_emissao_raw}")
-                else:
-                    data_emissao = ""
+                data_emissao = formatar_data_emissao(row.get("data_emissao", ""), placa)
                 
-                if self.processar_placa(placa, data_emissao):
+                if self.tentar_placa(registro, placa, data_emissao):
                     sucessos += 1
                 
                 # Progresso
                 progresso = (i + 1) / total_placas * 100
                 logging.info(f"Progresso: {i + 1}/{total_placas} ({progresso:.1f}%)")
             
+            # Retentativas no fim do lote
+            while True:
+                lote = self.agendador.proximo_lote()
+                if not lote:
+                    break
+                logging.info(f"Retentativa de {len(lote)} placas")
+                for placa, data_emissao in lote:
+                    if self.tentar_placa(registro, placa, data_emissao):
+                        sucessos += 1
+            
             # Relatório final
             logging.info(f"Processamento concluído! Sucessos: {sucessos}/{total_placas}")
+            logging.info(f"Recuperações do navegador: {self.recuperacoes} "
+                         f"({self.tempo_recuperacao:.1f}s gastos recuperando)")
+            for nome, (quantidade, total, maior) in resumo_esperas().items():
+                logging.info(f"Espera '{nome}': {quantidade}x, {total:.1f}s no total, maior {maior:.1f}s")
+            logging.info(f"Controle de ritmo: {self.controle.resumo()}")
+            logging.info(f"Memória do navegador: {self.vigia.resumo()}")
             
         except Exception as e:
             logging.error(f"Erro geral na execução: {e}")
         
         finally:
+            if registro:
+                logging.info(f"Situação no registro de progresso: {registro.contagem()}")
+                registro.fechar()
+            quantidade = self.agendador.salvar_falhas(FALHAS_PATH)
+            if quantidade:
+                logging.warning(f"{quantidade} placas com falha definitiva: {FALHAS_PATH}")
+            self.indice.fechar()
+            self.medidor.fechar()
+            self.vigia.fechar()
+            logging.info(f"Latência por etapa: python latencia.py {LATENCIA_PATH} {self.medidor.execucao}")
+            logging.info(f"Memória do navegador: python memoria_navegador.py {MEMORIA_PATH} {self.medidor.execucao}")
             if self.driver:
                 self.driver.quit()
                 logging.info("Navegador fechado")
 
 def main():
+    parser = argparse.ArgumentParser(description="Marca a emissão do ATPV no Freitas para as placas da planilha")
+    parser.add_argument("--recomecar", "--recomeçar", action="store_true",
+                        help="ignora o progresso registrado desta planilha e começa do zero")
+    args = parser.parse_args()
     automatizador = AutomatizadorFreitas()
-    automatizador.executar()
+    automatizador.executar(recomecar=args.recomecar)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
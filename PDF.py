@@ -1,22 +1,353 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.options import Options
-from selenium.webdriver.edge.service import Service  # ⬅ IMPORTANTE
 from pathlib import Path
 import pandas as pd
-import time
+import argparse
+import queue
+import threading
 import os
 import shutil
+import tempfile
 
-# 🔥 CAMINHO FIXO DO DRIVER NA OUTRA MÁQUINA
-EDGE_DRIVER_PATH = r"C:\Users\jrwil\OneDrive\Desktop\GERADOR DE PDFs\Gerador-de-PDFs-ATPVe\msedgedriver.exe"
+from agendador_retentativas import AgendadorRetentativas
+from conferencia_pdfs import DIVERGENTE, conferir_planilha
+from controle_ritmo import ControladorAIMD
+from esperas import resumo_esperas
+from latencia import MedidorEtapas
+from manifesto_pdfs import ManifestoPdfs, pdf_baixado
+from memoria_navegador import VigiaMemoria
+from motor_http import LIMITE_CONCORRENCIA, LIMITE_MAXIMO, baixar_atpvs_http
+from navegador import COMPLETO, EDGE, aplicar_perfil, bloquear_recursos, criar_driver, sem_janela
+from organizador import OrganizadorPdfs
+from paginas import PaginaEcrv
+from planilhas import ler_planilha
+from rastreador_downloads import RastreadorDownloads, ativar_log_performance
+from registro_progresso import RegistroProgresso, escopo_da_planilha
+from sessao_salva import SessaoSalva, cookie_para_selenium
 
+# 🔥 CAMINHO FIXO DO DRIVER NA OUTRA MÁQUINA (se não existir, usa o cache de drivers)
+EDGE_DRIVER_PATH = os.environ.get(
+    "EDGE_DRIVER_PATH",
+    r"C:\Users\jrwil\OneDrive\Desktop\GERADOR DE PDFs\Gerador-de-PDFs-ATPVe\msedgedriver.exe"
+)
 
-def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
+# 👻 NAVEGADOR SEM JANELA (usado pelo benchmark)
+HEADLESS = os.environ.get("NAVEGADOR_HEADLESS") == "1"
+
+# 🪶 PERFIL DO NAVEGADOR: "completo" (janela normal) ou "enxuto" (headless, sem imagens/fontes)
+PERFIL_NAVEGADOR = os.environ.get("PERFIL_NAVEGADOR_PDF", os.environ.get("PERFIL_NAVEGADOR", "completo"))
+
+# 🌐 ENDEREÇO DO e-CRV (pode apontar para um servidor local de testes)
+ECRV_URL = os.environ.get("ECRV_URL", "https://www.e-crvsp.sp.gov.br/")
+
+# 📋 RELATÓRIO FINAL
+ARQUIVO_RELATORIO = "RELATORIO_COMITENTES.xlsx"
+
+# 🔎 DIVERGÊNCIAS ENTRE O CONTEÚDO DO PDF E A PLANILHA
+ARQUIVO_CONFERENCIA = "CONFERENCIA_PDFS.xlsx"
+
+# 🔑 SESSÃO SALVA (EVITA O LOGIN MANUAL ENQUANTO ELA NÃO EXPIRAR)
+ARQUIVO_SESSAO = "sessao_ecrv.json"
+
+# ☠️ FALHAS DEFINITIVAS (PERMANENTES OU QUE ESGOTARAM AS RETENTATIVAS)
+ARQUIVO_FALHAS = "FALHAS_PDF.xlsx"
+
+# 💾 REGISTRO DE PROGRESSO (permite retomar de onde parou)
+ARQUIVO_REGISTRO = "progresso_pdf.sqlite3"
+# Colunas que definem o trabalho: outra planilha (ou outro banco) não herda o progresso
+COLUNAS_ESCOPO = ["placa", "renavam", "comitente", "COMITENTE"]
+
+# ⏱️ LATÊNCIA POR ETAPA (resumo: python latencia.py latencia_pdf.jsonl)
+ARQUIVO_LATENCIA = "latencia_pdf.jsonl"
+
+# 🧠 MEMÓRIA DO NAVEGADOR (curvas: python memoria_navegador.py memoria_pdf.jsonl)
+ARQUIVO_MEMORIA = "memoria_pdf.jsonl"
+
+# 🔥 QUANTIDADE MÁXIMA DE NAVEGADORES EM PARALELO
+MAX_WORKERS = int(os.environ.get("ECRV_MAX_WORKERS", "8"))
+
+
+def criar_driver_edge(pasta_download, visivel=False):
+    """
+    Inicializa o Edge com downloads direcionados para pasta_download;
+    visivel=True ignora o perfil/headless (janela do login manual)
+    """
+    perfil = COMPLETO if visivel else PERFIL_NAVEGADOR
+    options = Options()
+
+    # Configurar preferências de download
+    prefs = {
+        "download.default_directory": str(pasta_download),
+        "download.prompt_for_download": False,
+        "plugins.always_open_pdf_externally": True,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": False
+    }
+
+    options.use_chromium = True
+
+    try:
+        options.add_experimental_option("prefs", prefs)
+    except Exception:
+        try:
+            options.set_capability("ms:edgeOptions", {"prefs": prefs})
+        except Exception:
+            print("⚠️  Usando configuração básica do Edge")
+
+    try:
+        options.add_argument("--inprivate")
+        aplicar_perfil(options, perfil, headless=HEADLESS and not visivel)
+    except AttributeError:
+        print("⚠️  Argumentos não suportados nesta versão, continuando...")
+
+    # 🔥 EVENTOS DE DOWNLOAD DO DEVTOOLS
+    ativar_log_performance(options)
+
+    # 🚀 INICIALIZAR EDGE (DRIVER FIXO OU DO CACHE, SERVIÇO REAPROVEITADO)
+    try:
+        driver = criar_driver(EDGE, options, caminho_driver=EDGE_DRIVER_PATH)
+        print("✅ Edge WebDriver iniciado")
+    except Exception as e:
+        print(f"❌ ERRO ao inicializar Edge: {e}")
+        raise
+
+    bloquear_recursos(driver, perfil)
+
+    # Configurar download via DevTools Protocol (se disponível)
+    try:
+        driver.execute_cdp_cmd('Page.setDownloadBehavior', {
+            'behavior': 'allow',
+            'downloadPath': str(pasta_download)
+        })
+    except Exception:
+        print("⚠️  CDP commands não disponíveis, usando configuração padrão")
+
+    return driver
+
+
+def navegar_formulario_atpv(driver):
+    """
+    Entra no frame 'body' e abre o formulário de impressão do ATPV; devolve
+    a página (PaginaEcrv) com a aba principal e os campos já localizados
+    """
+    # NAVEGAÇÃO (FRAME, MENU ATPVe, IMPRIMIR ATPV E CAMPOS)
+    print("📝 Navegando para impressão ATPV...")
+    pagina = PaginaEcrv(driver)
+    pagina.abrir_formulario()
+
+    print("✅✅✅ FORMULÁRIO PRONTO!")
+    return pagina
+
+
+def copiar_sessao(cookies, driver_destino):
+    """
+    Reaproveita o login de um navegador em outro copiando os cookies
+    """
+    driver_destino.get(ECRV_URL)
+    driver_destino.delete_all_cookies()
+    for cookie in cookies:
+        try:
+            driver_destino.add_cookie(cookie_para_selenium(cookie))
+        except Exception as e:
+            print(f"   ⚠️  Cookie {cookie.get('name')} não copiado: {e}")
+    driver_destino.get(ECRV_URL)
+
+
+def reciclar_navegador(pagina, rastreador):
+    """
+    Abre um navegador novo com o login do atual (cookies copiados), já no
+    formulário, e só então fecha o antigo; devolve a página do novo.
+    Se o novo não abrir, segue com o antigo.
+    """
+    driver = pagina.driver
+    driver.switch_to.window(pagina.aba_principal)
+    cookies = driver.get_cookies()
+    novo = None
+    try:
+        novo = criar_driver_edge(rastreador.pasta_raiz)
+        copiar_sessao(cookies, novo)
+        pagina_nova = navegar_formulario_atpv(novo)
+    except Exception as e:
+        print(f"   ⚠️  Reciclagem falhou, seguindo com o mesmo navegador: {e}")
+        if novo:
+            try:
+                novo.quit()
+            except Exception:
+                pass
+        pagina.voltar_formulario()
+        return pagina
+
+    rastreador.trocar_navegador(novo)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    return pagina_nova
+
+
+def sessao_ecrv_valida(driver):
+    """Checagem rápida: o frame 'body' abre com o menu ATPVe (logado)"""
+    return PaginaEcrv(driver).menu_disponivel()
+
+
+def entrar_ecrv(driver, caminho_sessao):
+    """
+    Reaproveita a sessão salva; só pede o login manual se ela expirou.
+    Com o navegador sem janela (enxuto/headless) o login é feito em uma
+    janela visível, e a sessão salva passa para o navegador sem janela
+    """
+    sessao = SessaoSalva(caminho_sessao)
+    if sessao.restaurar(driver):
+        if sessao_ecrv_valida(driver):
+            print("🔑 Sessão salva reaproveitada, sem login manual")
+            return
+        print("🔑 Sessão salva expirou")
+
+    if not sem_janela(PERFIL_NAVEGADOR, HEADLESS):
+        driver.get(ECRV_URL)
+        input("✅ Faça o login e pressione ENTER para começar...")
+        sessao.salvar(driver)
+        return
+
+    print("🔑 Navegador sem janela: abrindo uma janela só para o login")
+    janela = criar_driver_edge(Path(tempfile.mkdtemp(prefix="login_ecrv_")), visivel=True)
+    try:
+        janela.get(ECRV_URL)
+        input("✅ Faça o login na janela aberta e pressione ENTER para começar...")
+        sessao.salvar(janela)
+    finally:
+        janela.quit()
+    if not (sessao.restaurar(driver) and sessao_ecrv_valida(driver)):
+        raise RuntimeError("O login da janela visível não passou para o navegador sem janela; "
+                           "rode com PERFIL_NAVEGADOR=completo e NAVEGADOR_HEADLESS desligado")
+    print("🔑 Login copiado para o navegador sem janela")
+
+
+def processar_veiculo(pagina, rastreador, organizador, renavam, placa, comitente, medidor):
+    """
+    Gera o ATPV de um veículo e entrega o PDF ao organizador, que o move
+    para a pasta do comitente em segundo plano. A página continua na aba e
+    no frame do formulário entre um veículo e outro, com os campos guardados
+    (só são procurados de novo se a página recarregar).
+    """
+    with medidor.etapa(placa, "preencher"):
+        # Preencher campos
+        pagina.preencher_veiculo(renavam, placa)
+
+    with medidor.etapa(placa, "preparar_download"):
+        # 🔥 PASTA DE DOWNLOAD EXCLUSIVA PARA ESTE VEÍCULO (SEM LIMPAR A PASTA TODA)
+        rastreador.preparar_pedido()
+
+    with medidor.etapa(placa, "imprimir"):
+        # Clicar em IMPRIMIR (rastreador marca o estado logo antes do clique)
+        pagina.imprimir(antes=rastreador.iniciar, timeout=10)
+
+    print(f"   ⏳ Baixando PDF...")
+
+    with medidor.etapa(placa, "download"):
+        # 🔥 AGUARDAR O DOWNLOAD TERMINAR (EVENTO DO NAVEGADOR OU PASTA)
+        arquivo_baixado = rastreador.aguardar(timeout=30)
+
+    if not arquivo_baixado:
+        raise RuntimeError("PDF não foi baixado")
+
+    # 🔥 MOVER, RENOMEAR E CONFERIR FICAM COM O ORGANIZADOR (O NAVEGADOR SEGUE)
+    organizador.entregar(arquivo_baixado, placa, comitente)
+
+    with medidor.etapa(placa, "limpar"):
+        # Limpar campos para próximo
+        pagina.limpar_campos()
+
+
+def processar_fila(pagina, rastreador, organizador, controle, agendador, fila, registro, medidor,
+                   total_veiculos, vigia=None, nome_sessao=""):
+    """
+    Consome a fila de veículos com um navegador já posicionado no formulário;
+    o sucesso de cada placa é registrado pelo organizador depois de mover o PDF.
+    O controle (AIMD) decide quantas sessões pedem ao mesmo tempo e o ritmo;
+    falhas transitórias são reagendadas pelo agendador. Quando o vigia acusa
+    memória alta (ou placas demais), o navegador é reciclado entre duas placas.
+    Devolve a página, que muda se houve reciclagem.
+    """
+    while True:
+        try:
+            index, renavam, placa, comitente = fila.get_nowait()
+        except queue.Empty:
+            return pagina
+
+        print(f"\n🚗 {nome_sessao}[{index + 1}/{total_veiculos}] {placa} - Comitente: {comitente}")
+
+        registro.iniciar(placa)
+        try:
+            with controle.pedido():
+                processar_veiculo(pagina, rastreador, organizador, renavam, placa, comitente, medidor)
+
+        except Exception as e:
+            print(f"   ❌ Erro: {e}")
+            registro.falha(placa, e)
+            if agendador.falhou(placa, (index, renavam, placa, comitente), e):
+                print(f"   🔁 {placa} reagendado para o fim do lote")
+
+            # Recuperação
+            try:
+                pagina.voltar_formulario()
+            except Exception:
+                pass
+
+        # 🧠 RECICLAR O NAVEGADOR ANTES QUE A MEMÓRIA DERRUBE A SESSÃO
+        if vigia and not fila.empty():
+            try:
+                motivo = vigia.verificar(pagina.driver, nome_sessao.strip())
+            except Exception:
+                motivo = None
+            if motivo:
+                print(f"   ♻️  {nome_sessao}Reciclando o navegador ({motivo})...")
+                pagina = reciclar_navegador(pagina, rastreador)
+                vigia.reciclado(pagina.driver, nome_sessao.strip())
+
+
+def _sessao_paralela(numero, cookies, pasta_temp, organizador, controle, agendador, fila, registro, medidor,
+                     total_veiculos, vigia):
+    """
+    Abre um navegador extra com o login copiado e consome a fila compartilhada
+    """
+    pasta_sessao = pasta_temp / f"sessao_{numero}"
+    pasta_sessao.mkdir(parents=True, exist_ok=True)
+    driver = None
+    rastreador = None
+    try:
+        driver = criar_driver_edge(pasta_sessao)
+        rastreador = RastreadorDownloads(driver, pasta_sessao)
+        copiar_sessao(cookies, driver)
+        pagina = navegar_formulario_atpv(driver)
+        processar_fila(pagina, rastreador, organizador, controle, agendador, fila, registro, medidor,
+                       total_veiculos, vigia, nome_sessao=f"[S{numero}] ")
+    except Exception as e:
+        print(f"❌ Sessão {numero} encerrada: {e}")
+    finally:
+        # O rastreador acompanha o navegador atual (trocado a cada reciclagem)
+        if rastreador:
+            rastreador.parar()
+            driver = rastreador.driver
+        if driver:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None, num_workers=1, motor="selenium",
+                                    aguardar_login=None, df=None, recomecar=False, df_relatorio=None):
     """
     SISTEMA QUE ORGANIZA PDFs POR COMITENTE - VERSÃO PORTÁVEL
+
+    Com num_workers > 1 abre outras sessões do Edge reaproveitando o login
+    da primeira; todas consomem a mesma fila de veículos.
+    Com motor="http" os PDFs são pedidos direto ao servidor com os cookies
+    do login, e só as falhas passam pelo navegador.
+    aguardar_login(driver) substitui o login manual (testes e benchmark).
+    df, se informado, substitui a leitura da planilha (fila de vários bancos);
+    df_relatorio é a mesma fila com todas as colunas, para o relatório.
+    recomecar=True apaga o progresso registrado desta planilha antes de começar.
     """
     try:
         # 🔥 USAR PATHLIB PARA CAMINHOS MULTIPLATAFORMA
@@ -34,14 +365,20 @@ def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
         if isinstance(pasta_base, str):
             pasta_base = Path(pasta_base)
 
-        # Ler planilha
-        df = pd.read_excel(str(caminho_planilha))  # ← Converter Path para string para pandas
+        num_workers = max(1, min(int(num_workers), MAX_WORKERS))
+
+        # Ler planilha (leitura única, em cache por caminho + data de modificação)
+        if df is None:
+            df = ler_planilha(caminho_planilha)
+            df_relatorio = ler_planilha(caminho_planilha, completa=True)
+        elif df_relatorio is None:
+            df_relatorio = df
         total_veiculos = len(df)
 
         # 🔥 VERIFICAR SE TEM COLUNA COMITENTE
         if 'comitente' not in df.columns and 'COMITENTE' not in df.columns:
             print("❌ ERRO: Planilha não tem coluna 'COMITENTE'")
-            print("📋 Colunas encontradas:", list(df.columns))
+            print("📋 Colunas encontradas:", df.attrs.get("colunas_originais", list(df.columns)))
             return
 
         # Padronizar nome da coluna
@@ -50,6 +387,8 @@ def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
         # 🔥 CRIAR PASTA TEMPORÁRIA COM PATHLIB
         pasta_temp = pasta_script / "TEMP_DOWNLOADS"
         pasta_temp.mkdir(parents=True, exist_ok=True)
+        pasta_sessao_principal = pasta_temp / "sessao_0"
+        pasta_sessao_principal.mkdir(parents=True, exist_ok=True)
 
         # 🔥 CRIAR PASTAS PARA CADA COMITENTE
         comitentes = df[coluna_comitente].unique()
@@ -62,209 +401,136 @@ def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
                 print(f"   ✅ Pasta criada: {comitente}")
 
         print(f"📊 TOTAL DE VEÍCULOS: {total_veiculos}")
-
-        # CONFIGURAÇÕES EDGE
-        options = Options()
-
-        # Configurar preferências de download
-        prefs = {
-            "download.default_directory": str(pasta_temp),
-            "download.prompt_for_download": False,
-            "plugins.always_open_pdf_externally": True,
-            "download.directory_upgrade": True,
-            "safebrowsing.enabled": False
-        }
-
-        options.use_chromium = True
-
-        try:
-            options.add_experimental_option("prefs", prefs)
-        except Exception:
-            try:
-                options.set_capability("ms:edgeOptions", {"prefs": prefs})
-            except Exception:
-                print("⚠️  Usando configuração básica do Edge")
-
-        try:
-            options.add_argument("--inprivate")
-        except AttributeError:
-            print("⚠️  Argumentos não suportados nesta versão, continuando...")
-
-        # 🚀 INICIALIZAR EDGE COM SERVICE E CAMINHO FIXO DO DRIVER
-        try:
-            service = Service(executable_path=EDGE_DRIVER_PATH)
-            driver = webdriver.Edge(service=service, options=options)
-            print(f"✅ Edge WebDriver iniciado com driver em: {EDGE_DRIVER_PATH}")
-        except Exception as e:
-            print(f"❌ ERRO ao inicializar Edge com driver fixo: {e}")
-            raise
-
-        # Configurar download via DevTools Protocol (se disponível)
-        try:
-            driver.execute_cdp_cmd('Page.setDownloadBehavior', {
-                'behavior': 'allow',
-                'downloadPath': str(pasta_temp)
-            })
-        except Exception:
-            print("⚠️  CDP commands não disponíveis, usando configuração padrão")
+        print(f"🧵 SESSÕES DO NAVEGADOR: {num_workers}")
+
+        # 🔥 FILA COMPARTILHADA ENTRE AS SESSÕES
+        veiculos = []
+        for index, veiculo in df.iterrows():
+            renavam = str(veiculo['renavam']).strip()
+            placa = str(veiculo['placa']).strip()
+            comitente = str(veiculo[coluna_comitente]).strip() if pd.notna(veiculo[coluna_comitente]) else "SEM_COMITENTE"
+            veiculos.append((index, renavam, placa, comitente))
+
+        # 💾 PULAR O QUE JÁ TEM PDF VÁLIDO NO DISCO (UMA VARREDURA SÓ)
+        registro = RegistroProgresso(pasta_script / ARQUIVO_REGISTRO, escopo_da_planilha(df, COLUNAS_ESCOPO))
+        if recomecar:
+            print(f"🧹 Progresso anterior desta planilha apagado ({registro.recomecar()} eventos)")
+        manifesto = ManifestoPdfs(pasta_base)
+        validos, corrompidos = manifesto.atualizar()
+        print(f"📄 PDFs já na pasta: {validos} válidos, {corrompidos} corrompidos")
+
+        pendentes = []
+        for veiculo in veiculos:
+            index, renavam, placa, comitente = veiculo
+            if manifesto.valido(comitente, placa):
+                if not registro.concluido(placa):
+                    registro.iniciar(placa)
+                    registro.sucesso(placa)
+                continue
+            if manifesto.invalido(comitente, placa):
+                print(f"   ♻️  {placa}: PDF corrompido, será baixado de novo")
+            elif registro.concluido(placa):
+                print(f"   ♻️  {placa}: concluído antes, mas o PDF sumiu da pasta")
+            pendentes.append(veiculo)
+        if len(pendentes) < len(veiculos):
+            print(f"⏭️  {len(veiculos) - len(pendentes)} veículos com PDF válido serão pulados")
+        # Todos os veículos da planilha (a conferência também acusa PDFs de execuções anteriores)
+        veiculos_por_placa = {veiculo[2]: veiculo for veiculo in veiculos}
+        veiculos = pendentes
+        nome_arquivo_saida = pasta_script / ARQUIVO_RELATORIO
+        medidor = MedidorEtapas(pasta_script / ARQUIVO_LATENCIA)
+        vigia = VigiaMemoria(pasta_script / ARQUIVO_MEMORIA, medidor.execucao)
+
+        # 🔁 RETENTATIVAS COM ESPERA EXPONENCIAL (TAMBÉM PARA PDFs QUE O ORGANIZADOR RECUSOU)
+        agendador = AgendadorRetentativas()
+        organizador = OrganizadorPdfs(
+            pasta_base, registro, medidor,
+            ao_falhar=lambda placa, erro: agendador.falhou(placa, veiculos_por_placa[placa], erro)
+        )
+        # 🚦 CONCORRÊNCIA E RITMO ADAPTATIVOS (AIMD) ENTRE AS SESSÕES
+        controle = ControladorAIMD(inicial=num_workers, maximo=num_workers, nome="e-CRV navegador")
+        controle_http = None
+        driver = criar_driver_edge(pasta_sessao_principal)
+        rastreador = RastreadorDownloads(driver, pasta_sessao_principal)
 
         try:
             print("🌐 Acessando sistema...")
-            driver.get("https://www.e-crvsp.sp.gov.br/")
-
-            input("✅ Faça o login e pressione ENTER para começar...")
-
-            # Entrar no frame
-            driver.switch_to.frame("body")
-            print("✅ Sistema carregado")
-
-            # NAVEGAÇÃO
-            print("📝 Navegando para impressão ATPV...")
-
-            menu = driver.find_element(By.XPATH, "//a[contains(., 'ATPVe')]")
-            menu.click()
-            time.sleep(3)
-
-            submenu = driver.find_element(By.XPATH, "//a[contains(text(), 'imprimir ATPV')]")
-            submenu.click()
-
-            # AGUARDAR CAMPOS
-            print("⏳ Aguardando formulário carregar...")
-            campo_renavam = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "renavam"))
-            )
-            campo_placa = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "placa"))
-            )
-
-            print("✅✅✅ FORMULÁRIO PRONTO!")
-
-            # ABA PRINCIPAL
-            aba_principal = driver.current_window_handle
+            if aguardar_login:
+                driver.get(ECRV_URL)
+                aguardar_login(driver)
+            else:
+                entrar_ecrv(driver, pasta_script / ARQUIVO_SESSAO)
+
+            # 🔥 MOTOR HTTP: BAIXAR DIRETO E DEIXAR SÓ AS FALHAS PARA O NAVEGADOR
+            if motor == "http":
+                print("⚡ Baixando PDFs direto do servidor...")
+                controle_http = ControladorAIMD(inicial=LIMITE_CONCORRENCIA, maximo=LIMITE_MAXIMO, nome="e-CRV HTTP")
+                baixados, pendentes = baixar_atpvs_http(driver, veiculos, pasta_base, ECRV_URL, controle_http)
+                placas_por_index = {veiculo[0]: veiculo[2] for veiculo in veiculos}
+                for index in baixados:
+                    registro.sucesso(placas_por_index[index])
+                print(f"   ✅ {len(baixados)} PDFs baixados por HTTP")
+                if pendentes:
+                    print(f"   ↩️  {len(pendentes)} veículos seguem pelo navegador "
+                          f"(ex.: {pendentes[0][0][2]} - {pendentes[0][1]})")
+                veiculos = [veiculo for veiculo, motivo in pendentes]
+
+            fila = queue.Queue()
+            for veiculo in veiculos:
+                fila.put(veiculo)
+
+            # 🔥 ABRIR AS SESSÕES EXTRAS COM OS COOKIES DO LOGIN
+            cookies = driver.get_cookies()
+            sessoes = []
+            for numero in range(1, num_workers):
+                sessao = threading.Thread(
+                    target=_sessao_paralela,
+                    args=(numero, cookies, pasta_temp, organizador, controle, agendador, fila, registro, medidor,
+                          total_veiculos, vigia),
+                    daemon=True
+                )
+                sessao.start()
+                sessoes.append(sessao)
+
+            pagina = navegar_formulario_atpv(driver)
 
             # 🔥 PROCESSAR TODOS OS VEÍCULOS
-            for index, veiculo in df.iterrows():
-                renavam = str(veiculo['renavam']).strip()
-                placa = str(veiculo['placa']).strip()
-                comitente = str(veiculo[coluna_comitente]).strip() if pd.notna(veiculo[coluna_comitente]) else "SEM_COMITENTE"
-
-                print(f"\n🚗 [{index + 1}/{total_veiculos}] {placa} - Comitente: {comitente}")
-
-                try:
-                    # VOLTAR PARA ABA/FORMA PRINCIPAL
-                    driver.switch_to.window(aba_principal)
-                    driver.switch_to.frame("body")
-
-                    # Atualizar referências dos campos
-                    campo_renavam = driver.find_element(By.ID, "renavam")
-                    campo_placa = driver.find_element(By.ID, "placa")
-
-                    # Preencher campos
-                    campo_renavam.clear()
-                    campo_renavam.send_keys(renavam)
-                    campo_placa.clear()
-                    campo_placa.send_keys(placa)
-
-                    # 🔥 LIMPAR PASTA TEMPORÁRIA ANTES DE BAIXAR
-                    for arquivo in pasta_temp.iterdir():
-                        try:
-                            if arquivo.is_file():
-                                arquivo.unlink()
-                        except Exception as e:
-                            print(f"   ⚠️  Erro ao limpar {arquivo}: {e}")
-
-                    # Clicar em IMPRIMIR
-                    btn_imprimir = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'IMPRIMIR')]"))
-                    )
-                    btn_imprimir.click()
-
-                    print(f"   ⏳ Baixando PDF...")
-
-                    # 🔥 AGUARDAR E CAPTURAR O ARQUIVO BAIXADO
-                    arquivo_baixado = None
-                    tempo_inicio = time.time()
-
-                    while time.time() - tempo_inicio < 30:
-                        time.sleep(1)
-                        arquivos = list(pasta_temp.glob('*'))
-
-                        # Verificar se há algum arquivo na pasta
-                        if arquivos:
-                            for arquivo in arquivos:
-                                # Ignorar arquivos temporários
-                                if not arquivo.name.endswith('.tmp') and not arquivo.name.endswith('.crdownload'):
-                                    arquivo_baixado = arquivo
-                                    break
-
-                        if arquivo_baixado:
-                            # Verificar se o arquivo está completamente baixado
-                            if arquivo_baixado.exists():
-                                try:
-                                    tamanho_atual = arquivo_baixado.stat().st_size
-                                    time.sleep(1)
-                                    tamanho_depois = arquivo_baixado.stat().st_size
-                                    if tamanho_atual == tamanho_depois and tamanho_atual > 0:
-                                        break
-                                except Exception:
-                                    break
-
-                    if arquivo_baixado:
-                        # 🔥 MOVER ARQUIVO PARA PASTA DO COMITENTE COM PATHLIB
-                        pasta_destino = pasta_base / comitente
-                        pasta_destino.mkdir(parents=True, exist_ok=True)
-
-                        # 🔥 RENOMEAR ARQUIVO COM PLACA
-                        extensao = arquivo_baixado.suffix or '.pdf'
-                        nome_novo = f"{placa}{extensao}"
-                        caminho_destino = pasta_destino / nome_novo
-
-                        # Esperar um pouco e tentar mover
-                        time.sleep(2)
-
-                        tentativas = 0
-                        while tentativas < 3:
-                            try:
-                                arquivo_baixado.rename(caminho_destino)
-                                print(f"   ✅ PDF ORGANIZADO: {nome_novo}")
-                                break
-                            except Exception as e:
-                                tentativas += 1
-                                time.sleep(1)
-                                if tentativas == 3:
-                                    print(f"   ⚠️  Erro ao mover arquivo: {e}")
-                    else:
-                        print(f"   ⚠️  PDF não foi baixado")
-
-                    # Limpar campos para próximo
-                    campo_renavam.clear()
-                    campo_placa.clear()
-                    time.sleep(1)
-
-                    # Marcar como processado
-                    if 'processado' not in df.columns:
-                        df['processado'] = ''
-                    df.at[index, 'processado'] = 'Sim'
-                    df.at[index, 'data_processamento'] = time.strftime('%Y-%m-%d %H:%M:%S')
-
-                except Exception as e:
-                    print(f"   ❌ Erro: {e}")
-                    if 'processado' not in df.columns:
-                        df['processado'] = ''
-                    df.at[index, 'processado'] = 'Erro'
-                    df.at[index, 'erro'] = str(e)
-
-                    # Recuperação
-                    try:
-                        driver.switch_to.window(aba_principal)
-                        driver.switch_to.frame("body")
-                    except Exception:
-                        pass
-                    continue
-
-            # 💾 SALVAR RELATÓRIO FINAL
-            nome_arquivo_saida = pasta_script / "RELATORIO_COMITENTES.xlsx"
-            df.to_excel(str(nome_arquivo_saida), index=False)
+            pagina = processar_fila(pagina, rastreador, organizador, controle, agendador, fila, registro, medidor,
+                                    total_veiculos, vigia, nome_sessao="[S0] " if num_workers > 1 else "")
+
+            for sessao in sessoes:
+                sessao.join()
+
+            # 🗂️ ESPERAR O ORGANIZADOR MOVER OS ÚLTIMOS PDFs
+            organizador.aguardar()
+
+            while True:
+                # 🔁 RETENTATIVAS NO FIM DO LOTE (SESSÃO PRINCIPAL)
+                while True:
+                    lote = agendador.proximo_lote()
+                    if not lote:
+                        break
+                    print(f"\n🔁 RETENTATIVA DE {len(lote)} VEÍCULOS")
+                    for veiculo in lote:
+                        fila.put(veiculo)
+                    pagina = processar_fila(pagina, rastreador, organizador, controle, agendador, fila, registro,
+                                            medidor, total_veiculos, vigia)
+                    organizador.aguardar()
+
+                # 🔎 CONFERIR SE CADA PDF É MESMO DO VEÍCULO (PLACA/RENAVAM NO TEXTO)
+                # Divergentes (renomeados) voltam para as retentativas até esgotar as tentativas
+                conferencia = conferir_planilha(df, pasta_base, pasta_script / ARQUIVO_CONFERENCIA)
+                reagendados = 0
+                for linha in conferencia[conferencia["situacao"] == DIVERGENTE].itertuples():
+                    motivo = "PDF não confere com a placa/renavam da planilha"
+                    registro.falha(linha.placa, motivo)
+                    reagendados += agendador.falhou(linha.placa, veiculos_por_placa[linha.placa], motivo)
+                if not reagendados:
+                    break
+                print(f"   🔁 {reagendados} PDFs divergentes serão baixados de novo")
+
+            # Marcar como processado (a partir do registro)
+            df = registro.relatorio(df)
 
             # 📊 RELATÓRIO FINAL POR COMITENTE
             print(f"\n{'='*60}")
@@ -277,7 +543,7 @@ def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
                     comitente_str = str(comitente).strip()
                     pasta_comitente = pasta_base / comitente_str
                     if pasta_comitente.exists():
-                        qtd_pdfs = len(list(pasta_comitente.glob('*.pdf')))
+                        qtd_pdfs = sum(1 for arquivo in pasta_comitente.iterdir() if pdf_baixado(arquivo.name))
                         qtd_veiculos = df[df[coluna_comitente] == comitente].shape[0]
                         print(f"📁 {comitente_str}: {qtd_pdfs}/{qtd_veiculos} PDFs")
 
@@ -288,18 +554,46 @@ def automatizar_ecrv_com_comitentes(nome_planilha, pasta_base=None):
             print(f"   ✅ Sucessos: {sucessos} veículos")
             print(f"   ❌ Erros: {erros} veículos")
             print(f"   📁 Pasta organizada: {pasta_base}")
-            print(f"   📋 Relatório: RELATORIO_COMITENTES.xlsx")
+            print(f"   📋 Relatório: {ARQUIVO_RELATORIO}")
+
+            print(f"\n⏱️  TEMPO EM ESPERAS:")
+            for nome, (quantidade, total, maior) in resumo_esperas().items():
+                print(f"   {nome}: {quantidade}x, {total:.1f}s no total, maior {maior:.1f}s")
+
+            print(f"\n🚦 CONTROLE DE RITMO:")
+            for controlador in (controle_http, controle):
+                if controlador:
+                    print(f"   {controlador.resumo()}")
+
+            print(f"\n🧠 MEMÓRIA DO NAVEGADOR: {vigia.resumo()}")
 
         except Exception as e:
             print(f"❌ Erro durante automação: {e}")
             import traceback
             traceback.print_exc()
         finally:
+            organizador.encerrar()
+            rastreador.parar()
             try:
-                driver.quit()
+                rastreador.driver.quit()
             except Exception:
                 pass
 
+            # 💾 SALVAR RELATÓRIO (MESMO SE A EXECUÇÃO FOI INTERROMPIDA)
+            try:
+                registro.relatorio(df_relatorio).to_excel(str(nome_arquivo_saida), index=False)
+            except Exception as e:
+                print(f"⚠️  Erro ao salvar relatório: {e}")
+            registro.fechar()
+            medidor.fechar()
+            vigia.fechar()
+            manifesto.atualizar()
+            quantidade = agendador.salvar_falhas(pasta_script / ARQUIVO_FALHAS)
+            if quantidade:
+                print(f"☠️  {quantidade} veículos com falha definitiva: {ARQUIVO_FALHAS}")
+            print(f"⏱️  Latência por etapa: python latencia.py {ARQUIVO_LATENCIA} {medidor.execucao}")
+            print(f"🧠 Memória do navegador: python memoria_navegador.py {ARQUIVO_MEMORIA} {medidor.execucao}")
+
             # 🔥 LIMPAR PASTA TEMPORÁRIA COM PATHLIB
             try:
                 shutil.rmtree(str(pasta_temp))
@@ -334,6 +628,13 @@ def criar_planilha_exemplo():
 
 # 🚀 EXECUTAR
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os ATPVs da planilha_veiculos.xlsx organizados por comitente")
+    parser.add_argument("--motor", choices=["selenium", "http"], default="selenium",
+                        help="http: POST direto ao e-CRV, contrato não verificado (veja motor_http.py)")
+    parser.add_argument("--recomecar", "--recomeçar", action="store_true",
+                        help="ignora o progresso registrado desta planilha e começa do zero")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🤖 SISTEMA ORGANIZADOR POR COMITENTE")
     print("=" * 60)
@@ -353,18 +654,25 @@ if __name__ == "__main__":
         exit()
 
     # Verificar coluna COMITENTE
-    df = pd.read_excel(str(caminho_planilha))
+    df = ler_planilha(caminho_planilha)
     if 'comitente' not in df.columns and 'COMITENTE' not in df.columns:
         print("❌ Planilha não tem coluna 'COMITENTE'")
-        print("📋 Colunas encontradas:", list(df.columns))
+        print("📋 Colunas encontradas:", df.attrs["colunas_originais"])
         print("\n💡 A planilha deve ter colunas: renavam, placa, COMITENTE")
         exit()
 
     print("✅ Planilha com comitentes encontrada!")
 
+    resposta = input(f"\n🧵 Quantas sessões do navegador em paralelo? (1-{MAX_WORKERS}, ENTER = 1): ").strip()
+    num_workers = int(resposta) if resposta.isdigit() else 1
+
+    if args.motor == "http":
+        print("⚠️  Motor HTTP: endpoint do e-CRV não verificado, confira os primeiros PDFs")
+
     input("\n🚀 Pressione ENTER para iniciar organização por comitentes...")
 
-    automatizar_ecrv_com_comitentes(str(caminho_planilha))
+    automatizar_ecrv_com_comitentes(str(caminho_planilha), num_workers=num_workers, motor=args.motor,
+                                    recomecar=args.recomecar)
 
     print(f"\n⭐ ORGANIZAÇÃO CONCLUÍDA!")
     print("⭐ PDFs organizados em pastas por comitente!")
@@ -0,0 +1,137 @@
+"""
+Retentativas com espera exponencial e lista de falhas definitivas.
+
+Cada falha de uma placa é classificada:
+
+- transitória (timeout, elemento "stale", janela/sessão perdida, HTTP
+  429/5xx, conexão, PDF não baixado, corrompido ou que não confere com a
+  placa/renavam): a placa volta para o fim do lote depois de
+  ESPERA_BASE * FATOR^(tentativa-1) segundos, até MAX_TENTATIVAS;
+- permanente (veículo não encontrado, dados inválidos) ou transitória que
+  esgotou as tentativas: vai para a lista de falhas definitivas, salva em
+  uma planilha com o motivo, para tratar à mão (sem nenhuma, a planilha da
+  execução anterior é apagada).
+
+Quem sabe que a placa não existe levanta VeiculoNaoEncontrado: sem isso o
+TimeoutException da espera pelo resultado seria tratado como transitório.
+"""
+import heapq
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from controle_ritmo import CONGESTIONAMENTO, SESSAO, classificar_erro
+
+MAX_TENTATIVAS = 3
+ESPERA_BASE = 5.0
+FATOR = 2.0
+ESPERA_MAXIMA = 120.0
+
+TRANSITORIA = "transitória"
+PERMANENTE = "permanente"
+
+PADRAO_TRANSITORIA = re.compile(
+    r"timeout|stale element|pdf não foi baixado|pdf inválido|não é pdf|element click intercepted|"
+    r"not interactable|erro de comunicação|erro ao salvar|não confere",
+    re.IGNORECASE,
+)
+PADRAO_PERMANENTE = re.compile(
+    r"não encontrad|inválid|não cadastrad|inexistente|bloquead",
+    re.IGNORECASE,
+)
+
+
+class VeiculoNaoEncontrado(LookupError):
+    """A pesquisa terminou e a placa não está lá: não adianta tentar de novo"""
+
+
+def classificar_falha(erro):
+    """TRANSITORIA ou PERMANENTE (desconhecidas contam como transitórias)"""
+    if isinstance(erro, VeiculoNaoEncontrado):
+        return PERMANENTE
+    if classificar_erro(erro) in (CONGESTIONAMENTO, SESSAO):
+        return TRANSITORIA
+    texto = f"{type(erro).__name__} {erro}" if isinstance(erro, BaseException) else str(erro)
+    if PADRAO_TRANSITORIA.search(texto):
+        return TRANSITORIA
+    if PADRAO_PERMANENTE.search(texto):
+        return PERMANENTE
+    return TRANSITORIA
+
+
+class AgendadorRetentativas:
+    def __init__(self, max_tentativas=MAX_TENTATIVAS, espera_base=ESPERA_BASE, fator=FATOR,
+                 espera_maxima=ESPERA_MAXIMA):
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.fator = fator
+        self.espera_maxima = espera_maxima
+        self.falhas_definitivas = []
+        self.reagendadas = 0
+        self._tentativas = {}
+        self._agenda = []
+        self._desempate = itertools.count()
+        self._trava = threading.Lock()
+
+    def falhou(self, chave, item, erro):
+        """Registra a falha do item; devolve True se ele foi reagendado"""
+        classe = classificar_falha(erro)
+        with self._trava:
+            tentativas = self._tentativas.get(chave, 0) + 1
+            self._tentativas[chave] = tentativas
+            if classe == TRANSITORIA and tentativas < self.max_tentativas:
+                espera = min(self.espera_maxima, self.espera_base * self.fator ** (tentativas - 1))
+                heapq.heappush(self._agenda, (time.monotonic() + espera, next(self._desempate), item))
+                self.reagendadas += 1
+                return True
+
+            motivo = str(erro) or type(erro).__name__
+            if classe == TRANSITORIA:
+                motivo = f"{motivo} (esgotou {tentativas} tentativas)"
+            self.falhas_definitivas.append({
+                "chave": chave,
+                "classe": classe,
+                "tentativas": tentativas,
+                "motivo": motivo,
+                "momento": time.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            return False
+
+    def proximo_lote(self):
+        """
+        Espera até a primeira retentativa ficar pronta e devolve todas as que
+        já estão prontas (lista vazia quando não há mais nada agendado)
+        """
+        with self._trava:
+            if not self._agenda:
+                return []
+            espera = self._agenda[0][0] - time.monotonic()
+        if espera > 0:
+            logging.info(f"Aguardando {espera:.0f}s para as retentativas...")
+            time.sleep(espera)
+
+        lote = []
+        with self._trava:
+            agora = time.monotonic()
+            while self._agenda and self._agenda[0][0] <= agora:
+                lote.append(heapq.heappop(self._agenda)[2])
+        return lote
+
+    def salvar_falhas(self, caminho, coluna_chave="placa"):
+        """
+        Grava a planilha de falhas definitivas; devolve quantas.
+        Sem nenhuma, remove a planilha antiga em vez de gravar uma vazia
+        """
+        if not self.falhas_definitivas:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            return 0
+        falhas = pd.DataFrame(self.falhas_definitivas,
+                              columns=["chave", "classe", "tentativas", "motivo", "momento"])
+        falhas.rename(columns={"chave": coluna_chave}).to_excel(str(caminho), index=False)
+        return len(falhas)
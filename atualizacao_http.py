@@ -0,0 +1,143 @@
+"""
+Atualização direta (sem navegador) da "Emissão ATPV" no Freitas.
+
+Faz o mesmo que o atualizarEmissaoATPVForm() da página do veículo: com os
+cookies do login feito no Chrome, abre a página do veículo por HTTP (URL do
+índice ou pesquisa), lê o IdVeiculo e envia o POST de atualização com
+ATPVEmitida = Sim e a data. Cliente com pool de conexões e concorrência
+limitada; cada resposta JSON é conferida. Placas que falham voltam como
+pendentes para o caminho normal pelo Selenium.
+
+ATENÇÃO: o contrato dos endpoints (CAMINHO_PESQUISA, CAMINHO_ATUALIZAR, os
+nomes dos campos do POST e o JSON {sucesso, mensagem}) foi deduzido da
+página do veículo e só foi testado contra o servidor_mock, nunca contra o
+Freitas real. Por isso o motor padrão do Lançamento continua sendo
+"selenium"; use FREITAS_MOTOR=http só depois de conferir o POST real
+(DevTools > Rede) com algumas placas.
+"""
+import asyncio
+import os
+import re
+from urllib.parse import urljoin
+
+import httpx
+
+from controle_ritmo import ControladorAIMD, executar_controlado
+from indice_veiculos import PADRAO_PLACA, normalizar_placa
+from motor_http import cookies_do_driver
+
+# 🔥 ENDPOINTS DO FREITAS (relativos ao endereço da área logada)
+CAMINHO_PESQUISA = os.environ.get("FREITAS_CAMINHO_PESQUISA", "/Veiculos")
+CAMINHO_ATUALIZAR = os.environ.get("FREITAS_CAMINHO_ATUALIZAR", "/Veiculo/AtualizarEmissaoATPV")
+VALOR_SIM = "1"
+
+LIMITE_CONCORRENCIA = 4
+LIMITE_MAXIMO = int(os.environ.get("FREITAS_HTTP_MAX_CONEXOES", "16"))
+TIMEOUT_REQUISICAO = 30
+
+PADRAO_ID_VEICULO = re.compile(r"ID_VEICULO\s*=\s*(\d+)|name=[\"']IdVeiculo[\"'][^>]*value=[\"'](\d+)")
+PADRAO_TOKEN = re.compile(r"name=[\"']__RequestVerificationToken[\"'][^>]*value=[\"']([^\"']+)")
+PADRAO_LINK = re.compile(r"href=[\"']([^\"']+)[\"']")
+
+
+def _link_do_veiculo(html, placa):
+    """Primeiro link do resultado da pesquisa que aponta para a placa"""
+    chave = normalizar_placa(placa)
+    for href in PADRAO_LINK.findall(html):
+        encontrada = PADRAO_PLACA.search(href.upper())
+        if encontrada and normalizar_placa(encontrada.group(0)) == chave:
+            return href
+    return None
+
+
+async def _url_do_veiculo(cliente, url_base, placa, indice):
+    url = indice.obter(placa) if indice is not None else None
+    if url:
+        return urljoin(url_base, url)
+
+    resposta = await cliente.get(urljoin(url_base, CAMINHO_PESQUISA), params={"q": placa})
+    resposta.raise_for_status()
+    href = _link_do_veiculo(resposta.text, placa)
+    if not href:
+        return None
+    url = urljoin(str(resposta.url), href)
+    if indice is not None:
+        indice.registrar(placa, url)
+    return url
+
+
+async def _atualizar_placa(cliente, url_base, placa, data_emissao, indice):
+    """Atualiza uma placa; devolve (placa, erro) com erro None em caso de sucesso"""
+    try:
+        url = await _url_do_veiculo(cliente, url_base, placa, indice)
+        if not url:
+            return placa, "Veículo não encontrado na pesquisa"
+
+        pagina = await cliente.get(url)
+        if pagina.status_code != 200:
+            return placa, f"Página do veículo: HTTP {pagina.status_code}"
+        encontrado = PADRAO_ID_VEICULO.search(pagina.text)
+        if not encontrado:
+            # Provavelmente caiu na tela de login ou o layout mudou
+            return placa, "IdVeiculo não encontrado na página do veículo"
+
+        dados = {
+            "IdVeiculo": encontrado.group(1) or encontrado.group(2),
+            "ATPVEmitida": VALOR_SIM,
+        }
+        if data_emissao:
+            # Sem data o campo não vai no POST, como no Selenium, que não mexe nele
+            dados["DataEmitidaATPV"] = data_emissao
+        token = PADRAO_TOKEN.search(pagina.text)
+        if token:
+            dados["__RequestVerificationToken"] = token.group(1)
+
+        resposta = await cliente.post(urljoin(url_base, CAMINHO_ATUALIZAR), data=dados,
+                                      headers={"X-Requested-With": "XMLHttpRequest", "Referer": url})
+        if resposta.status_code != 200:
+            return placa, f"Atualização: HTTP {resposta.status_code}"
+        try:
+            retorno = resposta.json()
+        except ValueError:
+            return placa, f"Resposta não é JSON ({resposta.headers.get('content-type', '?')})"
+        if not retorno.get("sucesso"):
+            return placa, retorno.get("mensagem") or "Servidor recusou a atualização"
+        return placa, None
+
+    except httpx.HTTPError as e:
+        return placa, str(e) or type(e).__name__
+
+
+async def atualizar_lote(cookies, placas, url_base, controlador, indice=None, user_agent=None):
+    """Atualiza várias placas em paralelo; placas = [(placa, data_emissao)]; devolve {placa: erro ou None}"""
+    cabecalhos = {"User-Agent": user_agent} if user_agent else {}
+    limites = httpx.Limits(max_connections=controlador.maximo, max_keepalive_connections=controlador.maximo)
+
+    async with httpx.AsyncClient(cookies=cookies, headers=cabecalhos, limits=limites,
+                                 timeout=TIMEOUT_REQUISICAO, follow_redirects=True) as cliente:
+        tarefas = [executar_controlado(controlador, _atualizar_placa(cliente, url_base, placa, data, indice))
+                   for placa, data in placas]
+        return dict(await asyncio.gather(*tarefas))
+
+
+def atualizar_emissoes_http(driver, placas, url_base, indice=None, controlador=None):
+    """
+    Tenta marcar todas as placas por HTTP usando o login do driver.
+    Devolve (atualizadas, pendentes): placas concluídas e [(placa, motivo)]
+    que devem seguir pelo Selenium.
+    """
+    if controlador is None:
+        controlador = ControladorAIMD(inicial=LIMITE_CONCORRENCIA, maximo=LIMITE_MAXIMO, nome="Freitas HTTP")
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception:
+        user_agent = None
+
+    resultados = asyncio.run(atualizar_lote(cookies_do_driver(driver), placas, url_base,
+                                            controlador, indice, user_agent))
+    if indice is not None:
+        indice.salvar()
+
+    atualizadas = [placa for placa, erro in resultados.items() if erro is None]
+    pendentes = [(placa, erro) for placa, erro in resultados.items() if erro]
+    return atualizadas, pendentes
@@ -0,0 +1,201 @@
+"""
+Benchmark offline do PDF.py e do Lançamento.py contra o servidor mock.
+
+Sobe o servidor_mock, gera uma planilha sintética, roda os scripts em modo
+headless (sem login manual, com registro/relatórios em uma pasta temporária)
+e mede placas por minuto e memória dos navegadores por sessão.
+
+Uso:
+    python benchmark.py --alvo pdf --placas 50 --workers 2 --latencia 150
+    python benchmark.py --alvo lancamento --placas 30 --falhas 0.05
+    python benchmark.py --alvo pdf --perfil comparar   # ganho do perfil enxuto
+"""
+import argparse
+import importlib
+import logging
+import os
+import random
+import string
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # sem psutil o benchmark só não mede memória
+    psutil = None
+
+from manifesto_pdfs import pdf_baixado
+from navegador import PERFIS
+from servidor_mock import iniciar_servidor
+
+os.environ.setdefault("NAVEGADOR_HEADLESS", "1")
+
+
+def gerar_placas(quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    placas = set()
+    while len(placas) < quantidade:
+        letras = "".join(aleatorio.choice(string.ascii_uppercase) for _ in range(3))
+        placas.add(f"{letras}{aleatorio.randint(0, 9)}{aleatorio.choice(string.ascii_uppercase)}{aleatorio.randint(10, 99)}")
+    return sorted(placas)
+
+
+class MedidorMemoria:
+    """Amostra o RSS somado de todos os processos filhos (drivers e navegadores)"""
+
+    def __init__(self, intervalo=0.5):
+        self.intervalo = intervalo
+        self.pico_mb = 0.0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _amostrar(self):
+        processo = psutil.Process(os.getpid())
+        while not self._parar.is_set():
+            total = 0
+            for filho in processo.children(recursive=True):
+                try:
+                    total += filho.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.pico_mb = max(self.pico_mb, total / 1024 / 1024)
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        if psutil:
+            self._thread = threading.Thread(target=self._amostrar, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *erro):
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+
+
+def rodar_pdf(url_base, pasta, placas, workers, motor, perfil):
+    """Roda automatizar_ecrv_com_comitentes contra o mock; devolve quantos PDFs saíram"""
+    pdf = importlib.import_module("PDF")
+    pdf.PERFIL_NAVEGADOR = perfil
+    pdf.ECRV_URL = url_base
+    pdf.ARQUIVO_RELATORIO = str(pasta / "RELATORIO_COMITENTES.xlsx")
+    pdf.ARQUIVO_REGISTRO = str(pasta / "progresso_pdf.sqlite3")
+    pdf.ARQUIVO_LATENCIA = str(pasta / "latencia_pdf.jsonl")
+    pdf.ARQUIVO_FALHAS = str(pasta / "FALHAS_PDF.xlsx")
+    pdf.ARQUIVO_MEMORIA = str(pasta / "memoria_pdf.jsonl")
+    pdf.ARQUIVO_CONFERENCIA = str(pasta / "CONFERENCIA_PDFS.xlsx")
+
+    planilha = pasta / "planilha_benchmark.xlsx"
+    pd.DataFrame({
+        "renavam": [f"{i:011d}" for i in range(1, len(placas) + 1)],
+        "placa": placas,
+        "comitente": [f"BANCO_{i % 3}" for i in range(len(placas))],
+    }).to_excel(planilha, index=False)
+
+    pasta_pdfs = pasta / "PDFs_ORGANIZADOS"
+    pdf.automatizar_ecrv_com_comitentes(str(planilha), pasta_base=str(pasta_pdfs), num_workers=workers,
+                                        motor=motor, aguardar_login=lambda driver: None)
+    return sum(1 for arquivo in pasta_pdfs.rglob("*.pdf") if pdf_baixado(arquivo.name))
+
+
+def rodar_lancamento(url_base, pasta, placas, perfil, motor):
+    """Roda AutomatizadorFreitas.executar contra o mock; devolve as placas concluídas"""
+    lancamento = importlib.import_module("Lançamento")
+    lancamento.PERFIL_NAVEGADOR = perfil
+    from esperas import aguardar_nova_aba, aguardar_visivel
+    from selenium.webdriver.common.by import By
+
+    lancamento.EXCEL_PATH = str(pasta / "planilha_lancamento.xlsx")
+    lancamento.REGISTRO_PATH = str(pasta / "progresso_lancamento.sqlite3")
+    lancamento.LATENCIA_PATH = str(pasta / "latencia_lancamento.jsonl")
+    lancamento.INDICE_PATH = str(pasta / "indice_veiculos.json")
+    lancamento.SESSAO_PATH = str(pasta / "sessao_freitas.json")
+    lancamento.FALHAS_PATH = str(pasta / "FALHAS_LANCAMENTO.xlsx")
+    lancamento.MEMORIA_PATH = str(pasta / "memoria_lancamento.jsonl")
+    lancamento.URL_LOGIN = url_base + "Home/Login"
+
+    pd.DataFrame({
+        "placa": [f"{p[:3]}-{p[3:]}" for p in placas],
+        "data_emissao": ["2025-12-19"] * len(placas),
+    }).to_excel(lancamento.EXCEL_PATH, index=False)
+
+    automatizador = None
+
+    def login_automatico():
+        driver = automatizador.driver
+        driver.get(lancamento.URL_LOGIN)
+        driver.find_element(By.ID, "linkArea").click()
+        aguardar_nova_aba(driver, 1)
+        driver.switch_to.window(driver.window_handles[-1])
+        aguardar_visivel(driver, lancamento.SELECTORS["campo_pesquisa"])
+        automatizador.salvar_sessao()
+
+    automatizador = lancamento.AutomatizadorFreitas(login=login_automatico, motor=motor)
+    automatizador.executar()
+
+    registro = importlib.import_module("registro_progresso").RegistroProgresso(lancamento.REGISTRO_PATH)
+    concluidas = registro.contagem()["ok"]
+    registro.fechar()
+    return concluidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline contra o e-CRV/Freitas simulados")
+    parser.add_argument("--alvo", choices=["pdf", "lancamento", "ambos"], default="ambos")
+    parser.add_argument("--placas", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=1, help="sessões paralelas do PDF.py")
+    parser.add_argument("--motor", choices=["selenium", "http"], default="selenium",
+                        help="http: PDFs/atualizações direto por HTTP, navegador só nas falhas")
+    parser.add_argument("--latencia", type=int, default=100, help="latência média do mock em ms")
+    parser.add_argument("--falhas", type=float, default=0.0, help="fração de requisições que falham")
+    parser.add_argument("--perfil", choices=list(PERFIS) + ["comparar"], default="completo",
+                        help="perfil do navegador; 'comparar' roda completo e enxuto")
+    args = parser.parse_args()
+
+    # Log só no console (não mistura com o automacao.log de produção)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    placas = gerar_placas(args.placas)
+    servidor, url_base = iniciar_servidor(latencia_ms=args.latencia, taxa_falhas=args.falhas,
+                                          placas_cadastradas=[f"{p[:3]}-{p[3:]}" for p in placas])
+    alvos = ["pdf", "lancamento"] if args.alvo == "ambos" else [args.alvo]
+    perfis = list(PERFIS) if args.perfil == "comparar" else [args.perfil]
+    resultados = []
+
+    try:
+        for alvo in alvos:
+            for perfil in perfis:
+                with tempfile.TemporaryDirectory(prefix=f"bench_{alvo}_") as temporaria:
+                    pasta = Path(temporaria)
+                    with MedidorMemoria() as memoria:
+                        inicio = time.perf_counter()
+                        if alvo == "pdf":
+                            concluidas = rodar_pdf(url_base, pasta, placas, args.workers, args.motor, perfil)
+                            sessoes = args.workers
+                        else:
+                            concluidas = rodar_lancamento(url_base, pasta, placas, perfil, args.motor)
+                            sessoes = 1
+                        duracao = time.perf_counter() - inicio
+                    resultados.append((f"{alvo}/{perfil}", concluidas, duracao, sessoes, memoria.pico_mb))
+    finally:
+        servidor.shutdown()
+
+    print(f"\n{'=' * 72}")
+    print(f"📊 BENCHMARK - {args.placas} placas, latência {args.latencia} ms, falhas {args.falhas:.0%}")
+    print(f"{'=' * 72}")
+    for alvo, concluidas, duracao, sessoes, pico_mb in resultados:
+        print(f"{alvo:<20} {concluidas}/{args.placas} ok em {duracao:.1f}s "
+              f"-> {concluidas / duracao * 60:.1f} placas/min | {sessoes} sessão(ões)")
+        if psutil:
+            print(f"{'':<20} memória de pico {pico_mb:.0f} MB ({pico_mb / sessoes:.0f} MB por sessão)")
+        else:
+            print(f"{'':<20} memória não medida (instale psutil)")
+    print(f"Contadores do servidor: {servidor.RequestHandlerClass.contadores}")
+
+
+if __name__ == "__main__":
+    main()
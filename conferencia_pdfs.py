@@ -0,0 +1,140 @@
+"""
+Conferência do conteúdo dos ATPVs baixados contra a planilha.
+
+Extrai o texto de cada PDFs_ORGANIZADOS/<COMITENTE>/<placa>.pdf em um pool
+de processos (pypdf) e confere se a placa e o renavam da linha aparecem no
+documento. Um PDF salvo com o nome errado (ex.: troca de arquivos na pasta
+de downloads) é renomeado pelo PDF.py para <placa>.divergente.pdf, para ser
+baixado de novo (o manifesto ignora esses arquivos), e as divergências vão
+para CONFERENCIA_PDFS.xlsx. O arquivo só é gravado quando há divergência;
+uma conferência sem problemas apaga o relatório da execução anterior.
+
+Uso pela linha de comando (só confere; --renomear também renomeia):
+    python conferencia_pdfs.py planilha_veiculos.xlsx [PDFs_ORGANIZADOS] [--renomear]
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from pypdf import PdfReader
+
+from manifesto_pdfs import SUFIXO_DIVERGENTE
+from planilhas import ler_planilha
+
+ARQUIVO_RESULTADO = "CONFERENCIA_PDFS.xlsx"
+
+OK = "ok"
+DIVERGENTE = "divergente"
+SEM_TEXTO = "sem texto"
+SEM_PDF = "sem pdf"
+ERRO = "erro"
+
+
+def _so_letras_numeros(texto):
+    return re.sub(r"[^A-Z0-9]", "", str(texto).upper())
+
+
+def extrair_texto(caminho):
+    leitor = PdfReader(caminho)
+    return "\n".join(pagina.extract_text() or "" for pagina in leitor.pages)
+
+
+def conferir_pdf(caminho, placa, renavam):
+    """Devolve (situacao, placa_confere, renavam_confere, detalhe)"""
+    if not os.path.exists(caminho):
+        return SEM_PDF, False, False, ""
+    try:
+        texto = _so_letras_numeros(extrair_texto(caminho))
+    except Exception as e:
+        return ERRO, False, False, str(e)
+    if not texto:
+        # PDF só com imagem: não dá para conferir, mas também não é divergência
+        return SEM_TEXTO, False, False, ""
+
+    placa_confere = _so_letras_numeros(placa) in texto
+    renavam_limpo = _so_letras_numeros(renavam).lstrip("0")
+    renavam_confere = not renavam_limpo or renavam_limpo in texto
+    if placa_confere and renavam_confere:
+        return OK, True, True, ""
+    return DIVERGENTE, placa_confere, renavam_confere, texto[:200]
+
+
+def _conferir_linha(argumentos):
+    return conferir_pdf(*argumentos)
+
+
+def conferir_lote(veiculos, pasta_base, workers=None, renomear_divergentes=True):
+    """
+    veiculos = [(renavam, placa, comitente)]; devolve um DataFrame com a
+    situação de cada PDF, conferidos em paralelo.
+    """
+    pasta_base = Path(pasta_base)
+    caminhos = [pasta_base / comitente / f"{placa}.pdf" for renavam, placa, comitente in veiculos]
+    argumentos = [(str(caminho), placa, renavam) for caminho, (renavam, placa, comitente) in zip(caminhos, veiculos)]
+
+    workers = workers or os.cpu_count() or 1
+    if len(argumentos) < 2 * workers:
+        resultados = [_conferir_linha(a) for a in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resultados = list(executor.map(_conferir_linha, argumentos,
+                                           chunksize=max(1, len(argumentos) // (workers * 8))))
+
+    linhas = []
+    for caminho, (renavam, placa, comitente), (situacao, placa_ok, renavam_ok, detalhe) in zip(caminhos, veiculos, resultados):
+        if situacao == DIVERGENTE and renomear_divergentes:
+            try:
+                caminho.replace(caminho.with_name(f"{placa}{SUFIXO_DIVERGENTE}"))
+            except OSError:
+                pass
+        linhas.append({
+            "renavam": renavam, "placa": placa, "comitente": comitente, "arquivo": str(caminho),
+            "situacao": situacao, "placa_confere": placa_ok, "renavam_confere": renavam_ok, "detalhe": detalhe,
+        })
+    return pd.DataFrame(linhas)
+
+
+def salvar_divergencias(conferencia, caminho_saida):
+    """
+    Grava as linhas com divergência ou erro de leitura; devolve quantas.
+    Sem nenhuma, remove o relatório antigo em vez de gravar um vazio
+    """
+    problemas = conferencia[conferencia["situacao"].isin([DIVERGENTE, ERRO])]
+    if len(problemas):
+        problemas.to_excel(str(caminho_saida), index=False)
+    elif os.path.exists(caminho_saida):
+        os.remove(caminho_saida)
+    return len(problemas)
+
+
+def conferir_planilha(df, pasta_base, caminho_saida, workers=None, renomear_divergentes=True):
+    """Confere todas as linhas do df (renavam, placa, comitente) e imprime o resumo"""
+    coluna_comitente = 'COMITENTE' if 'COMITENTE' in df.columns else 'comitente'
+    veiculos = [(str(r).strip(), str(p).strip(), str(c).strip() if pd.notna(c) else "SEM_COMITENTE")
+                for r, p, c in zip(df['renavam'], df['placa'], df[coluna_comitente])]
+
+    inicio = time.perf_counter()
+    conferencia = conferir_lote(veiculos, pasta_base, workers, renomear_divergentes)
+    duracao = time.perf_counter() - inicio
+    contagem = conferencia["situacao"].value_counts().to_dict()
+    problemas = salvar_divergencias(conferencia, caminho_saida)
+
+    print(f"🔎 Conferência de {len(conferencia)} PDFs em {duracao:.1f}s: {contagem}")
+    if problemas:
+        print(f"   ⚠️  {problemas} PDFs com divergência -> {caminho_saida}")
+    return conferencia
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confere se cada PDF baixado é do veículo da planilha")
+    parser.add_argument("planilha")
+    parser.add_argument("pasta", nargs="?", default=str(Path(__file__).parent / "PDFs_ORGANIZADOS"))
+    parser.add_argument("--renomear", action="store_true",
+                        help=f"renomeia os PDFs divergentes para <placa>{SUFIXO_DIVERGENTE} (baixados de novo)")
+    args = parser.parse_args()
+    conferir_planilha(ler_planilha(args.planilha), args.pasta, Path(__file__).parent / ARQUIVO_RESULTADO,
+                      renomear_divergentes=args.renomear)
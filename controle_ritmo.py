@@ -0,0 +1,226 @@
+"""
+Controle adaptativo de concorrência e ritmo (AIMD) contra os portais.
+
+Cada pedido ao e-CRV/Freitas (clique no navegador ou requisição HTTP) passa
+por pedido(): espera uma vaga (limite de pedidos simultâneos) e o intervalo
+mínimo desde o último início. O resultado ajusta os dois:
+
+- sucesso: o intervalo cai um passo e, a cada rodada de `limite`
+  sucessos, o limite sobe 1 (aumento aditivo);
+- congestionamento (timeout, HTTP 429/5xx, conexão recusada, sessão do
+  navegador perdida, latência muito acima da média): o limite cai pela
+  metade e o intervalo dobra (redução multiplicativa), no máximo uma vez
+  por "tempo de ida e volta";
+- outros erros (dados da placa, elemento não encontrado) não mexem em nada.
+
+metricas() expõe o limite atual, pedidos em andamento, intervalo e vazão.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+PADRAO_CONGESTIONAMENTO = re.compile(
+    r"\bHTTP (429|5\d\d)\b|timeout|timed out|too many requests|"
+    r"connection (reset|refused|aborted)|max retries|remotedisconnected|readerror|connecterror",
+    re.IGNORECASE,
+)
+PADRAO_SESSAO = re.compile(
+    r"no such window|invalid session|session deleted|target window already closed|"
+    r"chrome not reachable|disconnected|sessão expirada",
+    re.IGNORECASE,
+)
+
+CONGESTIONAMENTO = "congestionamento"
+SESSAO = "sessao"
+LENTIDAO = "lentidao"
+OUTRO = "outro"
+
+JANELA_VAZAO = 60  # segundos usados no cálculo de pedidos por minuto
+
+
+def classificar_erro(erro):
+    """Classe do erro (exceção ou texto como 'HTTP 503'); None se não houve erro"""
+    if erro is None:
+        return None
+    texto = f"{type(erro).__name__} {erro}" if isinstance(erro, BaseException) else str(erro)
+    if PADRAO_SESSAO.search(texto):
+        return SESSAO
+    if PADRAO_CONGESTIONAMENTO.search(texto):
+        return CONGESTIONAMENTO
+    return OUTRO
+
+
+class ControladorAIMD:
+    def __init__(self, inicial=1, minimo=1, maximo=8, fator_reducao=0.5,
+                 intervalo_inicial=0.0, intervalo_maximo=5.0, passo_intervalo=0.05,
+                 intervalo_apos_erro=0.2, fator_lentidao=4.0, nome=""):
+        self.nome = nome
+        self.minimo = max(1, minimo)
+        self.maximo = max(self.minimo, maximo)
+        self.limite = min(max(inicial, self.minimo), self.maximo)
+        self.fator_reducao = fator_reducao
+        self.intervalo = intervalo_inicial
+        self.intervalo_maximo = intervalo_maximo
+        self.passo_intervalo = passo_intervalo
+        self.intervalo_apos_erro = intervalo_apos_erro
+        self.fator_lentidao = fator_lentidao
+
+        self.ativos = 0
+        self.concluidos = 0
+        self.erros = {CONGESTIONAMENTO: 0, SESSAO: 0, LENTIDAO: 0, OUTRO: 0}
+        self.reducoes = 0
+        self.latencia_media = None
+        self._sucessos_na_rodada = 0
+        self._ultima_reducao = 0.0
+        self._proximo_inicio = 0.0
+        self._conclusoes = deque()
+        self._condicao = threading.Condition()
+
+    # ---------- vagas ----------
+
+    def _tentar_vaga(self):
+        """Reserva a vaga se possível (devolve 0); senão quanto esperar (ou None se sem vaga)"""
+        agora = time.monotonic()
+        if self.ativos >= self.limite:
+            return None
+        if agora < self._proximo_inicio:
+            return self._proximo_inicio - agora
+        self.ativos += 1
+        self._proximo_inicio = agora + self.intervalo
+        return 0
+
+    def aguardar_vaga(self):
+        with self._condicao:
+            while True:
+                espera = self._tentar_vaga()
+                if espera == 0:
+                    return time.monotonic()
+                self._condicao.wait(espera)
+
+    async def aguardar_vaga_async(self):
+        while True:
+            with self._condicao:
+                espera = self._tentar_vaga()
+            if espera == 0:
+                return time.monotonic()
+            await asyncio.sleep(min(espera or 0.05, 0.5))
+
+    def liberar(self, inicio, erro=None):
+        """Devolve a vaga e ajusta limite/intervalo conforme o resultado"""
+        duracao = time.monotonic() - inicio
+        classe = classificar_erro(erro)
+        with self._condicao:
+            self.ativos -= 1
+            if classe is None:
+                self.concluidos += 1
+                self._conclusoes.append(time.monotonic())
+                if self._lento(duracao):
+                    # Deu certo, mas bem mais devagar que a média: portal sob carga
+                    classe = LENTIDAO
+                else:
+                    self._aumentar()
+                self._atualizar_latencia(duracao)
+            if classe is not None:
+                self.erros[classe] += 1
+            if classe in (CONGESTIONAMENTO, SESSAO, LENTIDAO):
+                self._reduzir()
+            self._condicao.notify_all()
+
+    @contextmanager
+    def pedido(self):
+        """
+        with controlador.pedido() as resultado: ...
+        Exceções contam como erro; para erros sem exceção, use resultado["erro"] = ...
+        """
+        inicio = self.aguardar_vaga()
+        resultado = {"erro": None}
+        try:
+            yield resultado
+        except BaseException as e:
+            resultado["erro"] = e
+            raise
+        finally:
+            self.liberar(inicio, resultado["erro"])
+
+    @asynccontextmanager
+    async def pedido_async(self):
+        inicio = await self.aguardar_vaga_async()
+        resultado = {"erro": None}
+        try:
+            yield resultado
+        except BaseException as e:
+            resultado["erro"] = e
+            raise
+        finally:
+            self.liberar(inicio, resultado["erro"])
+
+    # ---------- AIMD ----------
+
+    def _lento(self, duracao):
+        return (self.latencia_media is not None and self.concluidos >= 10
+                and duracao > self.latencia_media * self.fator_lentidao)
+
+    def _atualizar_latencia(self, duracao):
+        if self.latencia_media is None:
+            self.latencia_media = duracao
+        else:
+            self.latencia_media = 0.8 * self.latencia_media + 0.2 * duracao
+
+    def _aumentar(self):
+        self.intervalo = max(0.0, self.intervalo - self.passo_intervalo)
+        self._sucessos_na_rodada += 1
+        if self._sucessos_na_rodada < self.limite:
+            return
+        self._sucessos_na_rodada = 0
+        self.limite = min(self.maximo, self.limite + 1)
+
+    def _reduzir(self):
+        agora = time.monotonic()
+        # Uma redução por "ida e volta": erros da mesma rajada não derrubam o limite várias vezes
+        if agora - self._ultima_reducao < max(self.latencia_media or 0.0, 1.0):
+            return
+        self._ultima_reducao = agora
+        self._sucessos_na_rodada = 0
+        self.reducoes += 1
+        self.limite = max(self.minimo, int(self.limite * self.fator_reducao))
+        self.intervalo = min(self.intervalo_maximo, max(self.intervalo * 2, self.intervalo_apos_erro))
+
+    # ---------- métricas ----------
+
+    def vazao_por_minuto(self):
+        with self._condicao:
+            limite_janela = time.monotonic() - JANELA_VAZAO
+            while self._conclusoes and self._conclusoes[0] < limite_janela:
+                self._conclusoes.popleft()
+            return len(self._conclusoes) * 60 / JANELA_VAZAO
+
+    def metricas(self):
+        vazao = self.vazao_por_minuto()
+        with self._condicao:
+            return {
+                "limite": self.limite,
+                "ativos": self.ativos,
+                "intervalo_s": round(self.intervalo, 3),
+                "concluidos": self.concluidos,
+                "erros": dict(self.erros),
+                "reducoes": self.reducoes,
+                "latencia_media_s": round(self.latencia_media or 0.0, 3),
+                "vazao_por_min": round(vazao, 1),
+            }
+
+    def resumo(self):
+        m = self.metricas()
+        return (f"{self.nome + ': ' if self.nome else ''}limite {m['limite']}, intervalo {m['intervalo_s']}s, "
+                f"{m['concluidos']} ok, erros {m['erros']}, {m['reducoes']} reduções, "
+                f"{m['vazao_por_min']}/min no último minuto")
+
+
+async def executar_controlado(controlador, corrotina):
+    """Aguarda uma vaga, roda a corrotina (que devolve (chave, erro)) e informa o resultado"""
+    async with controlador.pedido_async() as resultado:
+        chave, erro = await corrotina
+        resultado["erro"] = erro
+        return chave, erro
@@ -1,11 +1,12 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
-import time
 import os
 
+from navegador import CHROME, criar_driver
+from paginas import PaginaEcrv
+from rastreador_downloads import RastreadorDownloads, ativar_log_performance
+
 def automatizar_ecrv_aguardar_campos(nome_planilha, pasta_download=None):
     """
     Sistema que AGUARDA os campos carregarem após navegação
@@ -27,41 +28,19 @@ def automatizar_ecrv_aguardar_campos(nome_planilha, pasta_download=None):
             "plugins.always_open_pdf_externally": True
         }
         options.add_experimental_option("prefs", prefs)
+        ativar_log_performance(options)
         
-        driver = webdriver.Chrome(options=options)
+        driver = criar_driver(CHROME, options)
+        rastreador = RastreadorDownloads(driver, pasta_download)
         
         try:
             driver.get("https://www.e-crvsp.sp.gov.br/")
             input("✅ Faça o login COMPLETO e pressione ENTER...")
             
-            # Entrar no frame
-            driver.switch_to.frame("body")
-            print("✅ No frame 'body'")
-            
-            # 🔥 NAVEGAÇÃO (já sabemos que funciona)
+            # 🔥 NAVEGAÇÃO: frame 'body', menu ATPVe, imprimir ATPV e espera dos campos (até 30 segundos)
             print("🔍 Navegando para ATPV...")
-            
-            # Clicar no menu
-            menu = driver.find_element(By.XPATH, "//a[contains(., 'ATPVe')]")
-            menu.click()
-            print("✅ Menu clicado!")
-            time.sleep(3)
-            
-            # Clicar no submenu
-            submenu = driver.find_element(By.XPATH, "//a[contains(text(), 'imprimir ATPV')]")
-            submenu.click()
-            print("✅ Submenu clicado!")
-            
-            # 🔥 AGORA A MUDANÇA CRÍTICA: Aguardar os campos carregarem
-            print("⏳ AGUARDANDO campos carregarem (até 30 segundos)...")
-            
-            # Aguardar até 30 segundos pelos campos
-            campo_renavam = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "renavam"))
-            )
-            campo_placa = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "placa"))
-            )
+            pagina = PaginaEcrv(driver)
+            pagina.abrir_formulario()
             
             print("✅✅✅ CAMPOS ENCONTRADOS! Sistema pronto!")
             
@@ -73,25 +52,20 @@ def automatizar_ecrv_aguardar_campos(nome_planilha, pasta_download=None):
                 print(f"\n🚗 Processando {index + 1}/58 - {placa}")
                 
                 try:
-                    # Preencher campos (já temos as referências)
-                    campo_renavam.clear()
-                    campo_renavam.send_keys(renavam)
-                    campo_placa.clear()
-                    campo_placa.send_keys(placa)
+                    # Preencher campos (referências guardadas pela página)
+                    pagina.preencher_veiculo(renavam, placa)
                     
                     # Clicar em IMPRIMIR
-                    btn_imprimir = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'IMPRIMIR')]"))
-                    )
-                    btn_imprimir.click()
+                    pagina.imprimir(antes=rastreador.iniciar, timeout=10)
                     
-                    print(f"✅ PDF gerado! - {placa}")
-                    time.sleep(6)  # Aguardar download
+                    # Aguardar download terminar
+                    if rastreador.aguardar(timeout=30):
+                        print(f"✅ PDF gerado! - {placa}")
+                    else:
+                        print(f"⚠️  PDF não foi baixado - {placa}")
                     
                     # Limpar campos para próximo
-                    campo_renavam.clear()
-                    campo_placa.clear()
-                    time.sleep(1)
+                    pagina.limpar_campos()
                     
                 except Exception as e:
                     print(f"❌ Erro no veículo {placa}: {e}")
@@ -100,6 +74,7 @@ def automatizar_ecrv_aguardar_campos(nome_planilha, pasta_download=None):
             print("\n🎉 TODOS OS VEÍCULOS PROCESSADOS!")
             
         finally:
+            rastreador.parar()
             driver.quit()
             
     except Exception as e:
@@ -111,37 +86,24 @@ def teste_aguardar_campos():
     Teste apenas para ver se os campos carregam após navegação
     """
     options = webdriver.ChromeOptions()
-    driver = webdriver.Chrome(options=options)
+    driver = criar_driver(CHROME, options)
     
     try:
         driver.get("https://www.e-crvsp.sp.gov.br/")
         input("✅ Faça o login e pressione ENTER...")
         
-        driver.switch_to.frame("body")
-        print("✅ No frame")
-        
-        # Navegação
-        menu = driver.find_element(By.XPATH, "//a[contains(., 'ATPVe')]")
-        menu.click()
-        print("✅ Menu clicado")
-        time.sleep(3)
-        
-        submenu = driver.find_element(By.XPATH, "//a[contains(text(), 'imprimir ATPV')]")
-        submenu.click()
-        print("✅ Submenu clicado")
-        
         print("⏳ AGUARDANDO CAMPOS... (máximo 30 segundos)")
         
-        # Aguardar campos com timeout longo
+        # Navegação e espera dos campos com timeout longo
+        pagina = PaginaEcrv(driver)
         try:
-            campo_renavam = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "renavam"))
-            )
-            campo_placa = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.ID, "placa"))
-            )
+            pagina.abrir_formulario()
+            campo_renavam = pagina.elemento("campo_renavam")
+            campo_placa = pagina.elemento("campo_placa")
             
             print("✅✅✅ SUCESSO! Campos carregaram!")
+            for nome, locator in pagina.seletores_usados().items():
+                print(f"   {nome}: {locator}")
             print(f"   RENAVAM: {campo_renavam.get_attribute('id')}")
             print(f"   PLACA: {campo_placa.get_attribute('id')}")
             
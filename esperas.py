@@ -0,0 +1,99 @@
+"""
+Esperas por condição compartilhadas entre PDF.py, Lançamento.py e diagnóstico.py.
+
+Cada função retorna assim que a condição é satisfeita (verificando a cada
+100 ms) em vez de dormir um tempo fixo, e registra quanto tempo realmente
+esperou. Use resumo_esperas() no fim da execução para ver onde o tempo foi.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+TIMEOUT_PADRAO = 30
+INTERVALO_VERIFICACAO = 0.1
+
+_trava = threading.Lock()
+_tempos = defaultdict(list)
+
+# Considera a página ociosa quando o documento terminou de carregar e não
+# há requisições jQuery em andamento (as páginas do Freitas usam jQuery)
+_JS_AJAX_OCIOSO = """
+return document.readyState === 'complete'
+    && (typeof window.jQuery === 'undefined' || window.jQuery.active === 0);
+"""
+
+
+def _esperar(nome, driver, condicao, timeout):
+    inicio = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(condicao)
+    finally:
+        with _trava:
+            _tempos[nome].append(time.perf_counter() - inicio)
+
+
+def aguardar_frame(driver, frame, timeout=TIMEOUT_PADRAO):
+    """Espera o frame existir e entra nele"""
+    return _esperar("frame", driver, EC.frame_to_be_available_and_switch_to_it(frame), timeout)
+
+
+def aguardar_visivel(driver, locator, timeout=TIMEOUT_PADRAO):
+    return _esperar("visivel", driver, EC.visibility_of_element_located(locator), timeout)
+
+
+def aguardar_clicavel(driver, locator, timeout=TIMEOUT_PADRAO):
+    return _esperar("clicavel", driver, EC.element_to_be_clickable(locator), timeout)
+
+
+def aguardar_habilitado(driver, locator, timeout=TIMEOUT_PADRAO):
+    """Espera o elemento existir e estar habilitado (ex.: select carregado por AJAX)"""
+    def condicao(d):
+        elementos = d.find_elements(*locator)
+        if elementos and elementos[0].is_enabled():
+            return elementos[0]
+        return False
+    return _esperar("habilitado", driver, condicao, timeout)
+
+
+def aguardar_algum(driver, locators, timeout=TIMEOUT_PADRAO, clicavel=False):
+    """
+    Espera o primeiro de vários localizadores alternativos (ex.: ID novo e
+    XPath antigo) e devolve (locator, elemento); cada verificação testa todos
+    """
+    condicao = EC.element_to_be_clickable if clicavel else EC.presence_of_element_located
+
+    def algum(d):
+        for locator in locators:
+            try:
+                elemento = condicao(locator)(d)
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+            if elemento:
+                return locator, elemento
+        return False
+    return _esperar("clicavel" if clicavel else "elemento", driver, algum, timeout)
+
+
+def aguardar_ajax_ocioso(driver, timeout=TIMEOUT_PADRAO):
+    """Espera o documento carregar e as requisições AJAX terminarem"""
+    return _esperar("ajax", driver, lambda d: d.execute_script(_JS_AJAX_OCIOSO), timeout)
+
+
+def aguardar_modal_fechado(driver, locator, timeout=TIMEOUT_PADRAO):
+    """Espera o modal (ou o botão dele) sumir da tela"""
+    return _esperar("modal_fechado", driver, EC.invisibility_of_element_located(locator), timeout)
+
+
+def aguardar_nova_aba(driver, quantidade_atual, timeout=TIMEOUT_PADRAO):
+    """Espera abrir mais uma aba além das quantidade_atual existentes"""
+    return _esperar("nova_aba", driver, lambda d: len(d.window_handles) > quantidade_atual, timeout)
+
+
+def resumo_esperas():
+    """{primitiva: (quantidade, total em s, maior em s)} das esperas até agora"""
+    with _trava:
+        return {nome: (len(t), sum(t), max(t)) for nome, t in _tempos.items() if t}
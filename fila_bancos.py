@@ -0,0 +1,187 @@
+"""
+Fila única para as planilhas de vários bancos (PLANILHAS/).
+
+Junta todas as planilhas em uma fila só, ordenada por prazo e prioridade de
+cada banco, e roda o PDF.py ou o Lançamento.py uma única vez: um navegador,
+um login e um formulário navegado para todos os bancos. O banco vem da
+coluna COMITENTE ou, se ela não existir, do nome do arquivo
+("Pan 19-12.xlsx" -> PAN). Cada banco ganha sua pasta e seu relatório, com
+todas as colunas das planilhas (o processamento só recebe as usadas).
+
+Uso:
+    python fila_bancos.py pdf                                   # todas as planilhas de PLANILHAS/
+    python fila_bancos.py pdf PLANILHAS --prioridade PAN=1 SAFRA=2 --prazo CREDITAS=2025-12-20
+    python fila_bancos.py lancamento "PLANILHAS/Pan 19-12.xlsx" --data-emissao 19/12/2025
+    python fila_bancos.py pdf --conferir-seletores              # para antes se um seletor quebrou
+"""
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from planilhas import enxuta, ler_planilha
+from registro_progresso import RegistroProgresso, escopo_da_planilha
+from verificar_seletores import ECRV, FREITAS, conferir_seletores
+
+PASTA_SCRIPT = Path(__file__).parent.absolute()
+PASTA_PLANILHAS = PASTA_SCRIPT / "PLANILHAS"
+PASTA_RELATORIOS_LANCAMENTO = PASTA_SCRIPT / "RELATORIOS_LANCAMENTO"
+PRIORIDADE_PADRAO = 100
+
+
+def banco_do_arquivo(caminho):
+    """'Pan 19-12.xlsx' -> 'PAN'"""
+    return Path(caminho).stem.split()[0].strip().upper()
+
+
+def listar_planilhas(entradas):
+    arquivos = []
+    for entrada in map(Path, entradas):
+        if entrada.is_dir():
+            arquivos.extend(sorted(p for p in entrada.glob("*.xlsx") if not p.name.startswith("~$")))
+        else:
+            arquivos.append(entrada)
+    return arquivos
+
+
+def _pares(valores, conversor=str):
+    """['PAN=1', 'SAFRA=2'] -> {'PAN': 1, 'SAFRA': 2}"""
+    resultado = {}
+    for valor in valores or []:
+        banco, _, dado = valor.partition("=")
+        if not dado:
+            raise ValueError(f"Use BANCO=valor: {valor}")
+        resultado[banco.strip().upper()] = conversor(dado.strip())
+    return resultado
+
+
+def montar_fila(arquivos, prioridades=None, prazos=None):
+    """
+    Uma planilha só com todos os bancos, na ordem em que devem ser feitos:
+    prazo mais próximo primeiro, depois a menor prioridade, depois a ordem
+    dos arquivos e das linhas. Traz todas as colunas (para os relatórios).
+    """
+    prioridades = prioridades or {}
+    prazos = prazos or {}
+    partes = []
+    for ordem, arquivo in enumerate(arquivos):
+        df = ler_planilha(arquivo, completa=True)
+        if "placa" not in df.columns:
+            print(f"⚠️  {arquivo.name}: sem coluna de placa, ignorada")
+            continue
+        banco = banco_do_arquivo(arquivo)
+        if "comitente" not in df.columns:
+            df["comitente"] = banco
+        df["comitente"] = df["comitente"].fillna(banco).astype(str).str.strip().str.upper()
+        df["arquivo"] = arquivo.name
+        df["_prazo"] = df["comitente"].map(lambda c: prazos.get(c, pd.NaT))
+        df["_prioridade"] = df["comitente"].map(lambda c: prioridades.get(c, PRIORIDADE_PADRAO))
+        df["_ordem"] = ordem
+        partes.append(df)
+
+    if not partes:
+        return pd.DataFrame()
+    fila = pd.concat(partes, ignore_index=True)
+    fila["_prazo"] = pd.to_datetime(fila["_prazo"])
+    fila = fila.sort_values(["_prazo", "_prioridade", "_ordem"], kind="stable", na_position="last")
+    return fila.drop(columns=["_prazo", "_prioridade", "_ordem"]).reset_index(drop=True)
+
+
+def salvar_relatorios_por_banco(caminho_registro, fila, pasta_base, escopo, nome_arquivo="RELATORIO_{banco}.xlsx"):
+    """Um relatório por banco, a partir do registro de progresso (escopo da fila), em pasta_base/<BANCO>/"""
+    registro = RegistroProgresso(caminho_registro, escopo)
+    try:
+        for banco, grupo in fila.groupby("comitente", sort=False):
+            pasta = Path(pasta_base) / banco
+            pasta.mkdir(parents=True, exist_ok=True)
+            relatorio = registro.relatorio(grupo)
+            relatorio.to_excel(pasta / nome_arquivo.format(banco=banco), index=False)
+            concluidas = (relatorio["processado"] == "Sim").sum()
+            print(f"📋 {banco}: {concluidas}/{len(grupo)} concluídos -> {pasta / nome_arquivo.format(banco=banco)}")
+    finally:
+        registro.fechar()
+
+
+def rodar_pdf(fila, num_workers=1, motor="selenium", recomecar=False):
+    pdf = importlib.import_module("PDF")
+    pasta_base = PASTA_SCRIPT / "PDFs_ORGANIZADOS"
+    pdf.automatizar_ecrv_com_comitentes("FILA_BANCOS", pasta_base=pasta_base, num_workers=num_workers,
+                                        motor=motor, df=enxuta(fila, ["arquivo"]), recomecar=recomecar,
+                                        df_relatorio=fila)
+    salvar_relatorios_por_banco(PASTA_SCRIPT / pdf.ARQUIVO_REGISTRO, fila, pasta_base,
+                                escopo_da_planilha(fila, pdf.COLUNAS_ESCOPO))
+
+
+def data_dia_mes(valor):
+    """--data-emissao em dd/mm/aaaa (sem isso o pandas lê 05/12/2025 como 12 de maio)"""
+    try:
+        return pd.to_datetime(valor, format="%d/%m/%Y")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida '{valor}', use dd/mm/aaaa")
+
+
+def rodar_lancamento(fila, data_emissao=None, motor=None, recomecar=False):
+    lancamento = importlib.import_module("Lançamento")
+    formatacao = importlib.import_module("Formatação")
+
+    # O Freitas pesquisa as placas com traço
+    fila["placa"], validas = formatacao.padronizar_placas(fila["placa"])
+    if (~validas).any():
+        print(f"⚠️  {(~validas).sum()} placas inválidas ignoradas: {list(fila.loc[~validas, 'placa'])}")
+        fila = fila[validas].reset_index(drop=True)
+    if "data_emissao" not in fila.columns:
+        fila["data_emissao"] = data_emissao or ""
+    elif data_emissao:
+        fila["data_emissao"] = fila["data_emissao"].fillna(data_emissao)
+
+    automatizador = lancamento.AutomatizadorFreitas(motor=motor or lancamento.MOTOR)
+    automatizador.executar(df=enxuta(fila, ["arquivo"]), recomecar=recomecar)
+    salvar_relatorios_por_banco(lancamento.REGISTRO_PATH, fila, PASTA_RELATORIOS_LANCAMENTO,
+                                escopo_da_planilha(fila, lancamento.COLUNAS_ESCOPO))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roda as planilhas de vários bancos com um único login")
+    parser.add_argument("alvo", choices=["pdf", "lancamento"])
+    parser.add_argument("entradas", nargs="*", default=[str(PASTA_PLANILHAS)], help="arquivos .xlsx ou pastas")
+    parser.add_argument("--prioridade", nargs="*", metavar="BANCO=N", help="menor número vai primeiro")
+    parser.add_argument("--prazo", nargs="*", metavar="BANCO=AAAA-MM-DD", help="prazo mais próximo vai primeiro")
+    parser.add_argument("--workers", type=int, default=1, help="sessões paralelas do PDF.py")
+    parser.add_argument("--motor", choices=["selenium", "http"],
+                        help="http: direto ao servidor, navegador só nas falhas (contrato não verificado)")
+    parser.add_argument("--data-emissao", type=data_dia_mes, metavar="DD/MM/AAAA",
+                        help="data de emissão para planilhas sem a coluna data_emissao")
+    parser.add_argument("--recomecar", "--recomeçar", action="store_true",
+                        help="ignora o progresso registrado desta fila e começa do zero")
+    parser.add_argument("--conferir-seletores", action="store_true",
+                        help="confere os seletores nas páginas salvas antes de começar (verificar_seletores.py)")
+    args = parser.parse_args()
+
+    try:
+        fila = montar_fila(listar_planilhas(args.entradas), _pares(args.prioridade, int), _pares(args.prazo))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if fila.empty:
+        print("❌ Nenhuma planilha com placas encontrada")
+        sys.exit(1)
+
+    print(f"📊 {len(fila)} veículos de {fila['comitente'].nunique()} bancos na fila:")
+    for banco, quantidade in fila["comitente"].value_counts(sort=False).items():
+        print(f"   {banco}: {quantidade}")
+
+    if args.conferir_seletores and not conferir_seletores([ECRV if args.alvo == "pdf" else FREITAS]):
+        print("❌ Seletores quebrados ou sem instantâneo: capture as páginas (verificar_seletores.py capturar) "
+              "ou atualize paginas.py antes de rodar o lote")
+        sys.exit(1)
+
+    if args.alvo == "pdf":
+        rodar_pdf(fila, args.workers, args.motor or "selenium", args.recomecar)
+    else:
+        rodar_lancamento(fila, args.data_emissao, args.motor, args.recomecar)
+
+
+if __name__ == "__main__":
+    main()
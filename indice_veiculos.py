@@ -0,0 +1,155 @@
+"""
+Índice persistente placa -> URL da página do veículo no Freitas.
+
+Uma pré-varredura percorre a listagem de veículos (página a página) e guarda
+o link de cada placa em JSON. Só os links de detalhe do veículo contam
+(seletor links_veiculos de paginas.py), a placa vem do href (o mesmo
+contrato de link_veiculo) e, se uma placa aparece em mais de um link, vale
+o primeiro. No laço principal, a página do veículo é aberta
+direto pela URL, sem digitar a placa nem esperar o resultado da pesquisa.
+Placas que não estão no índice (ou cuja URL ficou velha) caem na pesquisa
+normal e a URL encontrada é acrescentada ao índice.
+
+O JSON é regravado a cada SALVAR_A_CADA alterações e em fechar(), não a
+cada placa (regravar o índice inteiro por placa custava O(n²) de disco).
+"""
+import json
+import logging
+import os
+import re
+import threading
+
+from selenium.webdriver.common.by import By
+
+from paginas import alternativas
+
+# Alterações acumuladas antes de regravar o JSON
+SALVAR_A_CADA = int(os.environ.get("INDICE_SALVAR_A_CADA", "50"))
+
+PADRAO_PLACA = re.compile(r"\b[A-Z]{3}-?\d[A-Z0-9]\d{2}\b")
+
+# Devolve o href dos links do seletor CSS numa única chamada ao driver
+_JS_HREFS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .map(function(a) { return a.href; }).filter(Boolean);
+"""
+
+
+def normalizar_placa(placa):
+    """'ash-8j01 ' -> 'ASH8J01' (chave do índice)"""
+    return str(placa).strip().upper().replace("-", "").replace(" ", "")
+
+
+class IndiceVeiculos:
+    def __init__(self, caminho, salvar_a_cada=SALVAR_A_CADA):
+        self.caminho = str(caminho)
+        self.salvar_a_cada = max(1, salvar_a_cada)
+        self._trava = threading.Lock()
+        self._urls = {}
+        self._alteracoes = 0
+        if os.path.exists(self.caminho):
+            try:
+                with open(self.caminho, encoding="utf-8") as arquivo:
+                    self._urls = json.load(arquivo)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Índice de veículos ilegível, recomeçando: {e}")
+
+    def __len__(self):
+        return len(self._urls)
+
+    def obter(self, placa):
+        return self._urls.get(normalizar_placa(placa))
+
+    def _alterado(self):
+        """Conta a alteração e regrava o JSON quando acumulou SALVAR_A_CADA"""
+        with self._trava:
+            self._alteracoes += 1
+            cheio = self._alteracoes >= self.salvar_a_cada
+        if cheio:
+            self.salvar()
+
+    def registrar(self, placa, url):
+        with self._trava:
+            self._urls[normalizar_placa(placa)] = url
+        self._alterado()
+
+    def remover(self, placa):
+        with self._trava:
+            self._urls.pop(normalizar_placa(placa), None)
+        self._alterado()
+
+    def faltantes(self, placas):
+        return [placa for placa in placas if normalizar_placa(placa) not in self._urls]
+
+    def salvar(self):
+        with self._trava:
+            temporario = self.caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(self._urls, arquivo, ensure_ascii=False, indent=0)
+            os.replace(temporario, self.caminho)
+            self._alteracoes = 0
+
+    def fechar(self):
+        """Grava o que ainda não foi salvo"""
+        if self._alteracoes:
+            self.salvar()
+
+    def coletar_pagina(self, driver, seletor_links, vistas=None):
+        """
+        Registra os links de detalhe de veículo (seletor_links) da página atual;
+        devolve quantos achou. Placas já em vistas (desta varredura) ficam com
+        o primeiro link
+        """
+        vistas = set() if vistas is None else vistas
+        encontrados = 0
+        for href in self._hrefs(driver, seletor_links):
+            placa = PADRAO_PLACA.search(href.upper())
+            if not placa or normalizar_placa(placa.group(0)) in vistas:
+                continue
+            vistas.add(normalizar_placa(placa.group(0)))
+            self.registrar(placa.group(0), href)
+            encontrados += 1
+        return encontrados
+
+    @staticmethod
+    def _hrefs(driver, seletor_links):
+        """hrefs da primeira alternativa de seletor_links que encontra links"""
+        for por, valor in alternativas(seletor_links):
+            if por == By.CSS_SELECTOR:
+                hrefs = driver.execute_script(_JS_HREFS, valor)
+            else:
+                hrefs = [href for href in (a.get_attribute("href") for a in driver.find_elements(por, valor)) if href]
+            if hrefs:
+                return hrefs
+        return []
+
+    def construir(self, driver, abrir_listagem, seletor_proxima, seletor_links, max_paginas=500):
+        """
+        Percorre a listagem inteira: abrir_listagem() mostra a primeira página
+        e o link seletor_proxima (um localizador ou uma lista de alternativas)
+        leva às seguintes; seletor_links acha os links de detalhe de veículo.
+        Para se o link sumir ou apontar para uma página já visitada.
+        """
+        abrir_listagem()
+        total = 0
+        visitadas = {driver.current_url}
+        vistas = set()
+        for pagina in range(1, max_paginas + 1):
+            total += self.coletar_pagina(driver, seletor_links, vistas)
+            href = self._proxima(driver, seletor_proxima)
+            if not href or href in visitadas:
+                break
+            visitadas.add(href)
+            driver.get(href)
+        self.salvar()
+        logging.info(f"Índice de veículos: {total} links coletados em {pagina} página(s), {len(self)} placas no total")
+        return total
+
+    @staticmethod
+    def _proxima(driver, seletor_proxima):
+        """href do link para a próxima página (primeira alternativa que existe)"""
+        for locator in alternativas(seletor_proxima):
+            proximas = driver.find_elements(*locator)
+            if proximas:
+                return proximas[0].get_attribute("href")
+        return None
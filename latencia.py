@@ -0,0 +1,126 @@
+"""
+Medição de latência por etapa de cada placa.
+
+Cada etapa (preencher, imprimir, download, mover, pesquisar, salvar...) é
+envolvida em um "span" que grava uma linha JSONL com a execução, a placa,
+a etapa, a duração e o status. O resumo imprime p50/p95/p99 por etapa e
+o total por placa de cada execução, para comparar execuções entre si.
+
+Uso pela linha de comando:
+    python latencia.py latencia_pdf.jsonl [id_da_execucao]
+"""
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+PERCENTIS = (50, 95, 99)
+
+
+class MedidorEtapas:
+    def __init__(self, caminho, execucao=None):
+        self.caminho = str(caminho)
+        self.execucao = execucao or time.strftime('%Y%m%d-%H%M%S')
+        self._trava = threading.Lock()
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    @contextmanager
+    def etapa(self, placa, nome):
+        """Mede o bloco e grava um registro; exceções são registradas e repassadas"""
+        inicio = time.time()
+        contador = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "erro"
+            raise
+        finally:
+            self.registrar(placa, nome, (time.perf_counter() - contador) * 1000, status, inicio)
+
+    def registrar(self, placa, nome, duracao_ms, status="ok", inicio=None):
+        linha = json.dumps({
+            "execucao": self.execucao,
+            "placa": placa,
+            "etapa": nome,
+            "inicio": inicio or time.time(),
+            "duracao_ms": round(duracao_ms, 1),
+            "status": status,
+        }, ensure_ascii=False)
+        with self._trava:
+            self._arquivo.write(linha + "\n")
+            self._arquivo.flush()
+
+    def fechar(self):
+        with self._trava:
+            self._arquivo.close()
+
+
+def carregar(caminho):
+    registros = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha:
+                registros.append(json.loads(linha))
+    return registros
+
+
+def percentil(valores, p):
+    """Percentil com interpolação linear (valores já ordenados)"""
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    abaixo = int(posicao)
+    acima = min(abaixo + 1, len(valores) - 1)
+    return valores[abaixo] + (valores[acima] - valores[abaixo]) * (posicao - abaixo)
+
+
+def resumir(registros):
+    """{execucao: {etapa: {"n", "erros", "p50", "p95", "p99"}}} incluindo o total por placa"""
+    duracoes = defaultdict(lambda: defaultdict(list))
+    erros = defaultdict(lambda: defaultdict(int))
+    por_placa = defaultdict(lambda: defaultdict(float))
+
+    for registro in registros:
+        execucao, etapa = registro["execucao"], registro["etapa"]
+        duracoes[execucao][etapa].append(registro["duracao_ms"])
+        por_placa[execucao][registro["placa"]] += registro["duracao_ms"]
+        if registro.get("status") != "ok":
+            erros[execucao][etapa] += 1
+
+    resumo = {}
+    for execucao, etapas in duracoes.items():
+        etapas = dict(etapas)
+        etapas["TOTAL_PLACA"] = list(por_placa[execucao].values())
+        resumo[execucao] = {}
+        for etapa, valores in etapas.items():
+            valores = sorted(valores)
+            estatisticas = {"n": len(valores), "erros": erros[execucao].get(etapa, 0)}
+            for p in PERCENTIS:
+                estatisticas[f"p{p}"] = percentil(valores, p)
+            resumo[execucao][etapa] = estatisticas
+    return resumo
+
+
+def imprimir_resumo(resumo):
+    for execucao, etapas in resumo.items():
+        print(f"\n{'=' * 72}")
+        print(f"⏱️  EXECUÇÃO {execucao} - {etapas['TOTAL_PLACA']['n']} placas")
+        print(f"{'=' * 72}")
+        print(f"{'etapa':<20}{'n':>7}{'erros':>7}" + "".join(f"{'p' + str(p) + ' (ms)':>13}" for p in PERCENTIS))
+        for etapa, est in etapas.items():
+            print(f"{etapa:<20}{est['n']:>7}{est['erros']:>7}" + "".join(f"{est['p' + str(p)]:>13.0f}" for p in PERCENTIS))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python latencia.py <arquivo.jsonl> [id_da_execucao]")
+        sys.exit(1)
+
+    resumo = resumir(carregar(sys.argv[1]))
+    if len(sys.argv) > 2:
+        resumo = {sys.argv[2]: resumo[sys.argv[2]]}
+    imprimir_resumo(resumo)
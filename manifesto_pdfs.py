@@ -0,0 +1,146 @@
+"""
+Manifesto dos PDFs já baixados em PDFs_ORGANIZADOS/<COMITENTE>/<placa>.pdf.
+
+Uma única varredura (os.scandir, dois níveis) monta o índice com caminho,
+tamanho, SHA-256 e uma checagem estrutural (cabeçalho %PDF- e %%EOF no
+final). Arquivos com mesmo tamanho e data de modificação reaproveitam o
+que está salvo em manifesto_pdfs.json, então só os PDFs novos ou alterados
+são lidos. O PDF.py pula as linhas cujo PDF válido já está no disco e
+refaz só as que faltam ou estão corrompidas.
+
+Uso pela linha de comando:
+    python manifesto_pdfs.py [PDFs_ORGANIZADOS]
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+NOME_MANIFESTO = "manifesto_pdfs.json"
+# PDFs renomeados pela conferência (conferencia_pdfs.py): não contam como baixados
+SUFIXO_DIVERGENTE = ".divergente.pdf"
+ASSINATURA_PDF = b"%PDF-"
+MARCA_FIM_PDF = b"%%EOF"
+TAMANHO_FINAL = 1024  # %%EOF pode vir seguido de espaços/quebras de linha
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def analisar_pdf(caminho):
+    """Lê o arquivo uma vez: devolve (sha256, erro) com erro None se a estrutura estiver ok"""
+    resumo = hashlib.sha256()
+    inicio = b""
+    final = b""
+    with open(caminho, "rb") as arquivo:
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            resumo.update(bloco)
+            if not inicio:
+                inicio = bloco[:len(ASSINATURA_PDF)]
+            final = (final + bloco)[-TAMANHO_FINAL:]
+
+    if not inicio:
+        return resumo.hexdigest(), "arquivo vazio"
+    if not inicio.startswith(ASSINATURA_PDF):
+        return resumo.hexdigest(), "sem cabeçalho %PDF-"
+    if MARCA_FIM_PDF not in final:
+        return resumo.hexdigest(), "sem %%EOF (download incompleto?)"
+    return resumo.hexdigest(), None
+
+
+def pdf_baixado(nome):
+    """True para <placa>.pdf; False para outros arquivos e para os .divergente.pdf"""
+    nome = nome.lower()
+    return nome.endswith(".pdf") and not nome.endswith(SUFIXO_DIVERGENTE)
+
+
+def verificar_pdf(caminho):
+    """None se o PDF estiver íntegro, senão o motivo"""
+    try:
+        return analisar_pdf(caminho)[1]
+    except OSError as e:
+        return str(e)
+
+
+class ManifestoPdfs:
+    def __init__(self, pasta_base, caminho=None):
+        self.pasta_base = Path(pasta_base)
+        self.caminho = Path(caminho) if caminho else self.pasta_base / NOME_MANIFESTO
+        self.entradas = {}
+        if self.caminho.exists():
+            try:
+                with open(self.caminho, encoding="utf-8") as arquivo:
+                    self.entradas = json.load(arquivo)
+            except (OSError, ValueError):
+                self.entradas = {}
+
+    @staticmethod
+    def chave(comitente, placa):
+        return f"{comitente}/{placa}.pdf"
+
+    def atualizar(self):
+        """Varre a pasta uma vez e devolve (válidos, inválidos)"""
+        anteriores = self.entradas
+        self.entradas = {}
+        if self.pasta_base.exists():
+            with os.scandir(self.pasta_base) as pastas:
+                for pasta in pastas:
+                    if not pasta.is_dir():
+                        continue
+                    with os.scandir(pasta.path) as arquivos:
+                        for arquivo in arquivos:
+                            if arquivo.is_file() and pdf_baixado(arquivo.name):
+                                self._registrar(f"{pasta.name}/{arquivo.name}", arquivo, anteriores)
+        self.salvar()
+        validos = sum(1 for entrada in self.entradas.values() if entrada["valido"])
+        return validos, len(self.entradas) - validos
+
+    def _registrar(self, chave, arquivo, anteriores):
+        estado = arquivo.stat()
+        anterior = anteriores.get(chave)
+        if anterior and anterior["tamanho"] == estado.st_size and anterior["mtime_ns"] == estado.st_mtime_ns:
+            self.entradas[chave] = anterior
+            return
+        try:
+            sha256, erro = analisar_pdf(arquivo.path)
+        except OSError as e:
+            sha256, erro = None, str(e)
+        self.entradas[chave] = {
+            "caminho": arquivo.path,
+            "tamanho": estado.st_size,
+            "mtime_ns": estado.st_mtime_ns,
+            "sha256": sha256,
+            "valido": erro is None,
+            "erro": erro,
+        }
+
+    def valido(self, comitente, placa):
+        entrada = self.entradas.get(self.chave(comitente, placa))
+        return bool(entrada and entrada["valido"])
+
+    def invalido(self, comitente, placa):
+        """True se existe um arquivo para a placa, mas corrompido"""
+        entrada = self.entradas.get(self.chave(comitente, placa))
+        return bool(entrada and not entrada["valido"])
+
+    def salvar(self):
+        try:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            temporario = self.caminho.with_suffix(".tmp")
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(self.entradas, arquivo, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            print(f"⚠️  Não foi possível salvar o manifesto de PDFs: {e}")
+
+
+if __name__ == "__main__":
+    pasta = sys.argv[1] if len(sys.argv) > 1 else str(Path(__file__).parent / "PDFs_ORGANIZADOS")
+    manifesto = ManifestoPdfs(pasta)
+    validos, invalidos = manifesto.atualizar()
+    print(f"📄 {validos} PDFs válidos, {invalidos} corrompidos em {pasta}")
+    for chave, entrada in sorted(manifesto.entradas.items()):
+        if not entrada["valido"]:
+            print(f"   ❌ {chave}: {entrada['erro']}")
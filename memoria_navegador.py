@@ -0,0 +1,232 @@
+"""
+Vigia de memória do navegador e reciclagem preventiva da sessão.
+
+Em execuções longas o mesmo Edge/Chrome acumula DOM, modais e histórico de
+downloads até cair ("target window already closed"). A cada AMOSTRAR_A_CADA
+placas o vigia mede:
+
+- o RSS somado do processo do navegador e dos filhos (renderizadores, GPU),
+  achados pelo --user-data-dir da sessão (psutil);
+- o heap JS e a contagem de nós/documentos da aba (DevTools
+  Performance.getMetrics).
+
+Quando o RSS, o heap ou o número de placas desde o último início passa do
+limite, verificar() pede a reciclagem: quem chama fecha o navegador entre
+duas placas e abre outro com o login copiado. Cada amostra vira uma linha
+JSONL (curva de memória por execução e sessão).
+
+Uso pela linha de comando:
+    python memoria_navegador.py memoria_pdf.jsonl [id_da_execucao]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+try:
+    import psutil
+except ImportError:  # sem psutil o vigia usa só o heap e a contagem de placas
+    psutil = None
+
+# Limites por sessão do navegador (0 desliga o limite)
+LIMITE_RSS_MB = float(os.environ.get("NAVEGADOR_LIMITE_RSS_MB", "1500"))
+LIMITE_HEAP_MB = float(os.environ.get("NAVEGADOR_LIMITE_HEAP_MB", "300"))
+MAX_PLACAS_POR_SESSAO = int(os.environ.get("NAVEGADOR_MAX_PLACAS", "250"))
+AMOSTRAR_A_CADA = int(os.environ.get("NAVEGADOR_AMOSTRAR_A_CADA", "5"))
+
+MB = 1024 * 1024
+
+
+def _pasta_perfil(driver):
+    """--user-data-dir da sessão (Chrome: 'chrome', Edge: 'msedge' nas capabilities)"""
+    capacidades = getattr(driver, "capabilities", None) or {}
+    for chave in ("chrome", "msedge"):
+        pasta = (capacidades.get(chave) or {}).get("userDataDir")
+        if pasta:
+            return os.path.normcase(os.path.abspath(pasta))
+    return None
+
+
+def processo_navegador(driver):
+    """Processo principal do navegador da sessão (psutil.Process) ou None"""
+    if psutil is None:
+        return None
+    pasta = _pasta_perfil(driver)
+    if not pasta:
+        return None
+    for processo in psutil.process_iter(["cmdline"]):
+        try:
+            argumentos = processo.info["cmdline"] or []
+        except psutil.Error:
+            continue
+        if any(a.startswith("--type=") for a in argumentos):
+            continue  # renderizador/GPU: entra como filho do principal
+        for argumento in argumentos:
+            if (argumento.startswith("--user-data-dir=")
+                    and os.path.normcase(os.path.abspath(argumento.split("=", 1)[1].strip('"'))) == pasta):
+                return processo
+    return None
+
+
+def rss_mb(processo):
+    """RSS do navegador somado ao dos filhos; None se o processo sumiu"""
+    try:
+        total = processo.memory_info().rss
+        for filho in processo.children(recursive=True):
+            try:
+                total += filho.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / MB
+    except psutil.Error:
+        return None
+
+
+def metricas_devtools(driver):
+    """{heap_mb, heap_total_mb, nos, documentos} da aba atual pelo DevTools; {} se indisponível"""
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metricas = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        return {
+            "heap_mb": round(metricas.get("JSHeapUsedSize", 0) / MB, 1),
+            "heap_total_mb": round(metricas.get("JSHeapTotalSize", 0) / MB, 1),
+            "nos": int(metricas.get("Nodes", 0)),
+            "documentos": int(metricas.get("Documents", 0)),
+        }
+    except Exception:
+        pass
+    try:
+        usado = driver.execute_script("return window.performance.memory ? performance.memory.usedJSHeapSize : null;")
+        return {"heap_mb": round(usado / MB, 1)} if usado else {}
+    except Exception:
+        return {}
+
+
+class VigiaMemoria:
+    def __init__(self, caminho, execucao=None, limite_rss_mb=LIMITE_RSS_MB, limite_heap_mb=LIMITE_HEAP_MB,
+                 max_placas=MAX_PLACAS_POR_SESSAO, amostrar_a_cada=AMOSTRAR_A_CADA):
+        self.caminho = str(caminho)
+        self.execucao = execucao or time.strftime('%Y%m%d-%H%M%S')
+        self.limite_rss_mb = limite_rss_mb
+        self.limite_heap_mb = limite_heap_mb
+        self.max_placas = max_placas
+        self.amostrar_a_cada = max(1, amostrar_a_cada)
+        self.reciclagens = 0
+        self.pico_rss_mb = 0.0
+        self.pico_heap_mb = 0.0
+        self._sessoes = {}
+        self._trava = threading.Lock()
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    def _estado(self, driver, sessao):
+        """Estado da sessão; zera a contagem quando o navegador foi trocado"""
+        estado = self._sessoes.get(sessao)
+        if estado is None or estado["id"] != driver.session_id:
+            estado = {"id": driver.session_id, "placas": 0, "processo": None}
+            self._sessoes[sessao] = estado
+        return estado
+
+    def amostrar(self, driver, sessao="", evento="amostra"):
+        """Mede e grava uma linha; devolve a amostra"""
+        with self._trava:
+            estado = self._estado(driver, sessao)
+            placas = estado["placas"]
+        processo = estado["processo"]
+        if processo is None or (processo and not processo.is_running()):
+            # False: procurado e não achado (sem psutil ou sem --user-data-dir), não procura de novo
+            processo = estado["processo"] = processo_navegador(driver) or False
+
+        memoria = rss_mb(processo) if processo else None
+        amostra = {"rss_mb": round(memoria, 1) if memoria is not None else None}
+        amostra.update(metricas_devtools(driver))
+        linha = {
+            "execucao": self.execucao,
+            "sessao": sessao,
+            "momento": time.time(),
+            "evento": evento,
+            "placas_na_sessao": placas,
+            **amostra,
+        }
+        with self._trava:
+            self.pico_rss_mb = max(self.pico_rss_mb, amostra.get("rss_mb") or 0.0)
+            self.pico_heap_mb = max(self.pico_heap_mb, amostra.get("heap_mb") or 0.0)
+            self._arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+        return amostra
+
+    def verificar(self, driver, sessao=""):
+        """
+        Chamado entre duas placas: conta a placa, amostra quando for a vez e
+        devolve o motivo da reciclagem (ou None para seguir com o mesmo navegador)
+        """
+        with self._trava:
+            estado = self._estado(driver, sessao)
+            estado["placas"] += 1
+            placas = estado["placas"]
+        limite_placas = bool(self.max_placas) and placas >= self.max_placas
+        if placas % self.amostrar_a_cada and not limite_placas:
+            return None
+
+        amostra = self.amostrar(driver, sessao)
+        if limite_placas:
+            return f"{placas} placas na mesma sessão"
+        if self.limite_rss_mb and (amostra.get("rss_mb") or 0) >= self.limite_rss_mb:
+            return f"RSS {amostra['rss_mb']:.0f} MB"
+        if self.limite_heap_mb and (amostra.get("heap_mb") or 0) >= self.limite_heap_mb:
+            return f"heap JS {amostra['heap_mb']:.0f} MB"
+        return None
+
+    def reciclado(self, driver, sessao=""):
+        """Registra a troca de navegador e a memória do novo (linha de base da curva)"""
+        with self._trava:
+            self.reciclagens += 1
+        self.amostrar(driver, sessao, evento="reciclagem")
+
+    def resumo(self):
+        return (f"pico RSS {self.pico_rss_mb:.0f} MB, pico heap JS {self.pico_heap_mb:.0f} MB, "
+                f"{self.reciclagens} reciclagens")
+
+    def fechar(self):
+        with self._trava:
+            self._arquivo.close()
+
+
+def carregar(caminho):
+    registros = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha:
+                registros.append(json.loads(linha))
+    return registros
+
+
+def imprimir_curvas(registros, pontos=10):
+    """Por execução e sessão: amostras, reciclagens e a curva de RSS/heap em até `pontos` marcos"""
+    curvas = defaultdict(list)
+    for registro in registros:
+        curvas[(registro["execucao"], registro["sessao"])].append(registro)
+
+    for (execucao, sessao), amostras in sorted(curvas.items()):
+        reciclagens = sum(1 for a in amostras if a["evento"] == "reciclagem")
+        print(f"\n🧠 EXECUÇÃO {execucao} {sessao or ''}- {len(amostras)} amostras, {reciclagens} reciclagens")
+        passo = max(1, len(amostras) // pontos)
+        for amostra in amostras[::passo]:
+            minutos = (amostra["momento"] - amostras[0]["momento"]) / 60
+            rss = f"{amostra['rss_mb']:>8.0f}" if amostra.get("rss_mb") is not None else f"{'-':>8}"
+            heap = f"{amostra['heap_mb']:>8.0f}" if amostra.get("heap_mb") is not None else f"{'-':>8}"
+            print(f"   {minutos:>6.1f} min  RSS {rss} MB  heap {heap} MB  "
+                  f"nós {amostra.get('nos', '-'):>7}  {amostra['evento']}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python memoria_navegador.py <arquivo.jsonl> [id_da_execucao]")
+        sys.exit(1)
+
+    registros = carregar(sys.argv[1])
+    if len(sys.argv) > 2:
+        registros = [r for r in registros if r["execucao"] == sys.argv[2]]
+    imprimir_curvas(registros)
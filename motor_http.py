@@ -0,0 +1,120 @@
+"""
+Motor de download direto (sem navegador) dos PDFs de ATPV.
+
+Reaproveita os cookies do login feito no Selenium e envia a requisição de
+"imprimir ATPV" direto para o servidor, com um cliente HTTP com pool de
+conexões e concorrência limitada. O PDF é gravado em streaming em
+PDFs_ORGANIZADOS/<COMITENTE>/<placa>.pdf. Respostas que não são PDF voltam
+como pendentes para o caminho normal pelo Selenium.
+
+ATENÇÃO: o contrato do endpoint (CAMINHO_IMPRIMIR_ATPV e os campos do POST
+em CAMPOS_FIXOS) não foi verificado no e-CRV real: pagina_completa.html só
+tem o frameset, e o formulário só foi testado contra o servidor_mock. Por
+isso o motor HTTP não é oferecido no uso normal do PDF.py; ele só roda com
+--motor http (PDF.py ou fila_bancos.py), depois de conferir o POST real
+(DevTools > Rede) com alguns veículos.
+"""
+import asyncio
+import logging
+import os
+from pathlib import Path
+from urllib.parse import urljoin
+
+import httpx
+
+from controle_ritmo import ControladorAIMD, executar_controlado
+from manifesto_pdfs import verificar_pdf
+
+# 🔥 ENDPOINT DO FORMULÁRIO "imprimir ATPV" (relativo ao endereço do e-CRV)
+CAMINHO_IMPRIMIR_ATPV = os.environ.get("ECRV_CAMINHO_IMPRIMIR_ATPV", "/gever/GVR/atpve/imprimirATPV.do")
+CAMPOS_FIXOS = {"method": "imprimir"}
+
+LIMITE_CONCORRENCIA = 4
+LIMITE_MAXIMO = int(os.environ.get("ECRV_HTTP_MAX_CONEXOES", "16"))
+TIMEOUT_REQUISICAO = 30
+ASSINATURA_PDF = b"%PDF-"
+
+
+def cookies_do_driver(driver):
+    """Copia os cookies da sessão do Selenium para o cliente HTTP"""
+    cookies = httpx.Cookies()
+    for cookie in driver.get_cookies():
+        cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return cookies
+
+
+async def _baixar_atpv(cliente, url, veiculo, pasta_base):
+    """Baixa um ATPV; devolve (index, erro) com erro None em caso de sucesso"""
+    index, renavam, placa, comitente = veiculo
+    pasta_destino = Path(pasta_base) / comitente
+    caminho_destino = pasta_destino / f"{placa}.pdf"
+    caminho_parcial = pasta_destino / f"{placa}.pdf.part"
+    dados = dict(CAMPOS_FIXOS, renavam=renavam, placa=placa)
+
+    try:
+        async with cliente.stream("POST", url, data=dados) as resposta:
+            if resposta.status_code != 200:
+                return index, f"HTTP {resposta.status_code}"
+
+            pasta_destino.mkdir(parents=True, exist_ok=True)
+            inicio = b""
+            with open(caminho_parcial, "wb") as arquivo:
+                async for pedaco in resposta.aiter_bytes():
+                    if len(inicio) < len(ASSINATURA_PDF):
+                        inicio += pedaco[:len(ASSINATURA_PDF)]
+                        if len(inicio) >= len(ASSINATURA_PDF) and not inicio.startswith(ASSINATURA_PDF):
+                            break
+                    arquivo.write(pedaco)
+            if not inicio.startswith(ASSINATURA_PDF):
+                caminho_parcial.unlink()
+                tipo = resposta.headers.get("content-type", "?")
+                return index, f"Resposta não é PDF ({tipo})"
+        erro_pdf = verificar_pdf(caminho_parcial)
+        if erro_pdf:
+            caminho_parcial.unlink()
+            return index, f"PDF inválido: {erro_pdf}"
+        caminho_parcial.replace(caminho_destino)
+        return index, None
+
+    except (httpx.HTTPError, OSError) as e:
+        try:
+            caminho_parcial.unlink()
+        except OSError:
+            pass
+        return index, str(e) or type(e).__name__
+
+
+async def baixar_lote(cookies, veiculos, pasta_base, url_base, controlador, user_agent=None):
+    """Baixa vários ATPVs em paralelo (concorrência ditada pelo controlador); devolve {index: erro ou None}"""
+    url = urljoin(url_base, CAMINHO_IMPRIMIR_ATPV)
+    cabecalhos = {"User-Agent": user_agent} if user_agent else {}
+    limites = httpx.Limits(max_connections=controlador.maximo, max_keepalive_connections=controlador.maximo)
+
+    async with httpx.AsyncClient(cookies=cookies, headers=cabecalhos, limits=limites,
+                                 timeout=TIMEOUT_REQUISICAO, follow_redirects=True) as cliente:
+        tarefas = [executar_controlado(controlador, _baixar_atpv(cliente, url, veiculo, pasta_base))
+                   for veiculo in veiculos]
+        return dict(await asyncio.gather(*tarefas))
+
+
+def baixar_atpvs_http(driver, veiculos, pasta_base, url_base, controlador=None):
+    """
+    Tenta baixar todos os veículos por HTTP usando o login do driver.
+    Devolve (baixados, pendentes): índices concluídos e veículos que devem
+    seguir pelo Selenium, com o motivo da falha.
+    """
+    logging.warning(f"Motor HTTP do e-CRV com contrato não verificado ({CAMINHO_IMPRIMIR_ATPV}); "
+                    "confira os primeiros PDFs antes de seguir com o lote")
+    if controlador is None:
+        controlador = ControladorAIMD(inicial=LIMITE_CONCORRENCIA, maximo=LIMITE_MAXIMO, nome="e-CRV HTTP")
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception:
+        user_agent = None
+
+    resultados = asyncio.run(baixar_lote(cookies_do_driver(driver), veiculos, pasta_base,
+                                         url_base, controlador, user_agent))
+
+    baixados = [index for index, erro in resultados.items() if erro is None]
+    pendentes = [(veiculo, resultados[veiculo[0]]) for veiculo in veiculos if resultados[veiculo[0]]]
+    return baixados, pendentes
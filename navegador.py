@@ -0,0 +1,289 @@
+"""
+Inicialização do navegador (Edge/Chrome): perfis e fábrica de drivers.
+
+"completo" é o comportamento de sempre: janela visível carregando tudo.
+"enxuto" é para produção e para várias sessões em paralelo: headless (new),
+janela reduzida, sem imagens/fontes/mídia nem scripts de analytics
+(bloqueados via DevTools Network.setBlockedURLs) e sem os serviços de
+fundo do navegador (sync, extensões, tradução, atualização de componentes).
+Sem janela não há como fazer o login manual: quando a sessão salva não
+serve, PDF.py e Lançamento.py abrem uma janela "completo" só para o login e
+passam a sessão para o navegador sem janela (veja sem_janela()).
+
+criar_driver() resolve o msedgedriver/chromedriver sem rede no caminho
+normal: descobre a versão instalada do navegador e procura um driver da
+mesma versão principal no cache local (ou no cache do webdriver-manager) e,
+depois, junto dos scripts (também conferindo a versão). Só baixa quando
+não acha nada. O processo do driver fica aquecido e é
+reaproveitado por todas as sessões e reinícios do mesmo script.
+"""
+import atexit
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from selenium.webdriver.chrome.service import Service as ServicoChrome
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.edge.service import Service as ServicoEdge
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+COMPLETO = "completo"
+ENXUTO = "enxuto"
+PERFIS = (COMPLETO, ENXUTO)
+
+TAMANHO_JANELA_ENXUTO = "1280,800"
+
+ARGUMENTOS_ENXUTO = [
+    "--headless=new",
+    f"--window-size={TAMANHO_JANELA_ENXUTO}",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+
+PREFERENCIAS_ENXUTO = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+# Padrões bloqueados no perfil enxuto (imagens, fontes, mídia e analytics)
+URLS_BLOQUEADAS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*facebook.net*", "*clarity.ms*",
+]
+
+
+def sem_janela(perfil, headless=False):
+    """True se o navegador abre sem janela (o enxuto é sempre headless): login manual impossível nele"""
+    return validar_perfil(perfil) == ENXUTO or headless
+
+
+def validar_perfil(perfil):
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil de navegador inválido: {perfil} (use {', '.join(PERFIS)})")
+    return perfil
+
+
+def aplicar_perfil(options, perfil=COMPLETO, headless=False):
+    """Acrescenta às options os argumentos e preferências do perfil"""
+    validar_perfil(perfil)
+    if perfil == COMPLETO:
+        if headless:
+            options.add_argument("--headless=new")
+        return options
+
+    for argumento in ARGUMENTOS_ENXUTO:
+        options.add_argument(argumento)
+
+    # Mescla com as preferências de download já configuradas
+    prefs = dict(options.experimental_options.get("prefs", {}))
+    prefs.update(PREFERENCIAS_ENXUTO)
+    options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def bloquear_recursos(driver, perfil=COMPLETO):
+    """No perfil enxuto, bloqueia imagens/fontes/mídia/analytics pelo DevTools"""
+    if perfil != ENXUTO:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS})
+    except Exception as e:
+        logging.warning(f"Não foi possível bloquear recursos pelo DevTools: {e}")
+
+
+# ==============================
+# FÁBRICA DE DRIVERS
+# ==============================
+
+PASTA_SCRIPT = Path(__file__).parent.absolute()
+PASTA_CACHE_DRIVERS = Path(os.environ.get("ATPVE_CACHE_DRIVERS", Path.home() / ".cache" / "atpve-drivers"))
+PASTA_CACHE_WDM = Path.home() / ".wdm" / "drivers"
+
+EDGE = "edge"
+CHROME = "chrome"
+
+_EXE = ".exe" if sys.platform == "win32" else ""
+NAVEGADORES = {
+    EDGE: {
+        "driver": f"msedgedriver{_EXE}",
+        "pasta_wdm": "edgedriver",
+        "registro": r"Software\Microsoft\Edge\BLBeacon",
+        "executaveis": ["microsoft-edge", "microsoft-edge-stable", "msedge"],
+        "servico": ServicoEdge,
+        "prefixo": "ms",
+        "nome": "MicrosoftEdge",
+        # Drivers deixados junto dos scripts (ex.: edgedriver_win64/)
+        "locais": [PASTA_SCRIPT / f"msedgedriver{_EXE}", PASTA_SCRIPT / "edgedriver_win64" / f"msedgedriver{_EXE}"],
+    },
+    CHROME: {
+        "driver": f"chromedriver{_EXE}",
+        "pasta_wdm": "chromedriver",
+        "registro": r"Software\Google\Chrome\BLBeacon",
+        "executaveis": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+        "servico": ServicoChrome,
+        "prefixo": "goog",
+        "nome": "chrome",
+        "locais": [PASTA_SCRIPT / f"chromedriver{_EXE}"],
+    },
+}
+
+_trava_servicos = threading.Lock()
+_servicos = {}
+
+
+def versao_navegador(navegador):
+    """Versão instalada do navegador ('131.0.2903.86') ou None"""
+    info = NAVEGADORES[navegador]
+    if sys.platform == "win32":
+        import winreg
+        for raiz in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(raiz, info["registro"]) as chave:
+                    return winreg.QueryValueEx(chave, "version")[0]
+            except OSError:
+                continue
+        return None
+
+    for executavel in info["executaveis"]:
+        caminho = shutil.which(executavel)
+        if not caminho:
+            continue
+        try:
+            saida = subprocess.run([caminho, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        encontrado = re.search(r"\d+\.\d+\.\d+\.\d+", saida)
+        if encontrado:
+            return encontrado.group(0)
+    return None
+
+
+def _versao_principal(versao):
+    return versao.split(".")[0] if versao else None
+
+
+def versao_driver(caminho):
+    """Versão do msedgedriver/chromedriver ('131.0.2903.86') ou None"""
+    try:
+        saida = subprocess.run([str(caminho), "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    encontrado = re.search(r"\d+\.\d+\.\d+\.\d+", saida)
+    return encontrado.group(0) if encontrado else None
+
+
+def _procurar_no_cache(navegador, principal):
+    """Procura um driver da versão principal no cache próprio e no do webdriver-manager"""
+    info = NAVEGADORES[navegador]
+    candidato = PASTA_CACHE_DRIVERS / navegador / principal / info["driver"]
+    if candidato.exists():
+        return candidato
+
+    pasta_wdm = PASTA_CACHE_WDM / info["pasta_wdm"]
+    if pasta_wdm.exists():
+        for pasta_versao in sorted(pasta_wdm.glob(f"*/{principal}.*"), reverse=True):
+            for encontrado in pasta_versao.rglob(info["driver"]):
+                return encontrado
+    return None
+
+
+def _guardar_no_cache(navegador, principal, caminho):
+    destino = PASTA_CACHE_DRIVERS / navegador / (principal or "desconhecida") / NAVEGADORES[navegador]["driver"]
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(caminho, destino)
+        return destino
+    except OSError as e:
+        logging.warning(f"Não foi possível guardar o driver no cache: {e}")
+        return Path(caminho)
+
+
+def _baixar_driver(navegador):
+    """Último recurso: baixa pela rede com o webdriver-manager"""
+    if navegador == EDGE:
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager().install()
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolver_driver(navegador, caminho_preferido=None):
+    """Caminho do driver compatível com o navegador instalado, evitando a rede"""
+    if caminho_preferido and os.path.exists(caminho_preferido):
+        return Path(caminho_preferido)
+
+    principal = _versao_principal(versao_navegador(navegador))
+    if principal:
+        encontrado = _procurar_no_cache(navegador, principal)
+        if encontrado:
+            return encontrado
+
+    # Drivers deixados junto dos scripts só servem se forem da mesma versão principal
+    for local in NAVEGADORES[navegador]["locais"]:
+        if not local.exists():
+            continue
+        principal_local = _versao_principal(versao_driver(local))
+        if principal is None or principal_local == principal:
+            return local
+        logging.info(f"Ignorando {local}: driver {principal_local or '?'}, navegador {principal}")
+
+    logging.info(f"Driver do {navegador} (versão {principal or '?'}) fora do cache, baixando...")
+    return _guardar_no_cache(navegador, principal, _baixar_driver(navegador))
+
+
+class DriverServicoCompartilhado(RemoteWebDriver):
+    """WebDriver ligado a um serviço aquecido: o quit() encerra só a sessão"""
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+
+def _servico_aquecido(navegador, caminho_driver):
+    chave = (navegador, str(caminho_driver))
+    with _trava_servicos:
+        servico = _servicos.get(chave)
+        if servico is None or not servico.is_connectable():
+            servico = NAVEGADORES[navegador]["servico"](executable_path=str(caminho_driver))
+            servico.start()
+            _servicos[chave] = servico
+        return servico
+
+
+def criar_driver(navegador, options, caminho_driver=None):
+    """Abre uma sessão do navegador reaproveitando o serviço do driver já iniciado"""
+    info = NAVEGADORES[navegador]
+    servico = _servico_aquecido(navegador, resolver_driver(navegador, caminho_driver))
+    conexao = ChromiumRemoteConnection(
+        remote_server_addr=servico.service_url,
+        vendor_prefix=info["prefixo"],
+        browser_name=info["nome"],
+    )
+    return DriverServicoCompartilhado(command_executor=conexao, options=options)
+
+
+@atexit.register
+def encerrar_servicos():
+    with _trava_servicos:
+        for servico in _servicos.values():
+            try:
+                servico.stop()
+            except Exception:
+                pass
+        _servicos.clear()
@@ -0,0 +1,80 @@
+"""
+Organizador de PDFs em segundo plano.
+
+Assim que o download de um veículo é detectado, o navegador entrega o
+arquivo para esta fila e já segue para o próximo renavam/placa. Uma thread
+separada cria a pasta do comitente, move e renomeia o arquivo para
+<placa>.pdf, confere a integridade e só então registra o sucesso (ou a
+falha) daquela placa no registro de progresso. ao_falhar(placa, erro), se
+informado, é chamado nas falhas (ex.: para reagendar a placa).
+"""
+import queue
+import threading
+from pathlib import Path
+
+from manifesto_pdfs import verificar_pdf
+
+_FIM = object()
+
+
+class OrganizadorPdfs:
+    def __init__(self, pasta_base, registro, medidor=None, ao_falhar=None):
+        self.pasta_base = Path(pasta_base)
+        self.registro = registro
+        self.medidor = medidor
+        self.ao_falhar = ao_falhar
+        self.organizados = 0
+        self.falhas = 0
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._trabalhar, name="organizador-pdfs", daemon=True)
+        self._thread.start()
+
+    def entregar(self, arquivo, placa, comitente):
+        """Enfileira o arquivo baixado; volta na hora"""
+        self._fila.put((Path(arquivo), placa, comitente))
+
+    def _organizar(self, arquivo, placa, comitente):
+        pasta_destino = self.pasta_base / comitente
+        pasta_destino.mkdir(parents=True, exist_ok=True)
+        caminho_destino = pasta_destino / f"{placa}{arquivo.suffix or '.pdf'}"
+        arquivo.replace(caminho_destino)
+
+        erro_pdf = verificar_pdf(caminho_destino)
+        if erro_pdf:
+            caminho_destino.unlink()
+            raise RuntimeError(f"PDF inválido: {erro_pdf}")
+        return caminho_destino
+
+    def _trabalhar(self):
+        while True:
+            tarefa = self._fila.get()
+            if tarefa is _FIM:
+                self._fila.task_done()
+                return
+            arquivo, placa, comitente = tarefa
+            try:
+                if self.medidor:
+                    with self.medidor.etapa(placa, "mover"):
+                        destino = self._organizar(arquivo, placa, comitente)
+                else:
+                    destino = self._organizar(arquivo, placa, comitente)
+                self.registro.sucesso(placa)
+                self.organizados += 1
+                print(f"   ✅ PDF ORGANIZADO: {comitente}/{destino.name}")
+            except Exception as e:
+                self.registro.falha(placa, e)
+                self.falhas += 1
+                print(f"   ❌ {placa}: erro ao organizar o PDF: {e}")
+                if self.ao_falhar:
+                    self.ao_falhar(placa, e)
+            finally:
+                self._fila.task_done()
+
+    def aguardar(self):
+        """Espera a fila esvaziar (tudo movido e registrado)"""
+        self._fila.join()
+
+    def encerrar(self):
+        if self._thread.is_alive():
+            self._fila.put(_FIM)
+            self._thread.join()
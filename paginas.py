@@ -0,0 +1,203 @@
+"""
+Page objects do e-CRV e do Freitas, compartilhados por PDF.py,
+Lançamento.py e diagnóstico.py.
+
+Os seletores ficam em dicionários nome -> localizador, no modelo do antigo
+SELECTORS do Lançamento. Um nome pode ter uma lista de alternativas (ex.:
+proxima_pagina do Freitas): a primeira que encontra o elemento fica
+memorizada, e as buscas seguintes vão direto nela.
+
+Pagina guarda as referências dos elementos entre uma placa e outra. Ela só
+localiza de novo depois de um StaleElementReferenceException. Assim o
+formulário do ATPV não é procurado (nem a aba/frame trocados) a cada
+veículo.
+"""
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        NoSuchElementException, StaleElementReferenceException)
+from selenium.webdriver.common.by import By
+
+from esperas import TIMEOUT_PADRAO, aguardar_algum, aguardar_frame
+
+FRAME_ECRV = "body"
+
+# Os mesmos localizadores que o PDF.py usa no e-CRV real desde a primeira
+# versão. pagina_completa.html só tem o frameset (o frame 'body' carrega
+# /gever/SGU/...), então não há IDs conhecidos para o menu e o botão; os IDs
+# do servidor_mock não existem no portal. Antes de trocar um XPath por ID,
+# confira com verificar_seletores.py capturar ecrv
+SELETORES_ECRV = {
+    "menu_atpve": (By.XPATH, "//a[contains(., 'ATPVe')]"),
+    "link_imprimir_atpv": (By.XPATH, "//a[contains(text(), 'imprimir ATPV')]"),
+    "campo_renavam": (By.ID, "renavam"),
+    "campo_placa": (By.ID, "placa"),
+    "botao_imprimir": (By.XPATH, "//*[contains(text(), 'IMPRIMIR')]"),
+}
+
+SELETORES_FREITAS = {
+    "campo_pesquisa": (By.ID, "txtPesquisarVeiculos"),
+    "botao_pesquisar": (By.ID, "btnPesquisarVeiculos"),
+    "aba_leilao": (By.ID, "leilao-tab"),
+    "campo_emissao": (By.ID, "ATPVEmitida"),
+    "campo_data": (By.ID, "DataEmitidaATPV"),
+    "botao_salvar": (By.XPATH, "//button[@onclick='atualizarEmissaoATPVForm();']"),
+    "popup_sim": (By.XPATH, "//button[contains(text(),'Sim')]"),
+    "popup_ok": (By.ID, "modalJsAlertOk"),
+    # Não conferido na listagem real do Freitas (só no servidor_mock): as
+    # alternativas cobrem o PagedList do ASP.NET MVC e uma paginação
+    # Bootstrap. Confirme com verificar_seletores.py capturar freitas
+    "proxima_pagina": [
+        (By.CSS_SELECTOR, "a[rel='next']"),
+        (By.CSS_SELECTOR, "li.PagedList-skipToNext > a, .pagination li.next > a"),
+        (By.XPATH, "//a[normalize-space()='Próxima' or normalize-space()='»']"),
+    ],
+    # Links de detalhe do veículo na listagem (índice de veículos); a placa
+    # sai do href, como em link_veiculo. Também não conferido no Freitas real
+    "links_veiculos": [
+        (By.CSS_SELECTOR, "a[href*='/Veiculo/']"),
+        (By.CSS_SELECTOR, "table a[href]"),
+    ],
+}
+
+
+def link_veiculo(placa):
+    """Link da placa no resultado da pesquisa do Freitas (CSS em vez de XPath)"""
+    return By.CSS_SELECTOR, f"a[href*='{placa}']"
+
+
+def alternativas(seletor):
+    """Aceita um localizador só ou uma lista de alternativas"""
+    return [seletor] if isinstance(seletor, tuple) else list(seletor)
+
+
+class Pagina:
+    seletores = {}
+
+    def __init__(self, driver, seletores=None):
+        self.driver = driver
+        self.seletores = {nome: alternativas(s) for nome, s in (seletores or self.seletores).items()}
+        self.buscas = 0  # idas ao driver para localizar elementos
+        self._escolhidos = {}
+        self._elementos = {}
+
+    def _ordem(self, nome):
+        """Alternativas do nome, começando pela que funcionou da última vez"""
+        alternativas = self.seletores[nome]
+        escolhido = self._escolhidos.get(nome)
+        if escolhido is None:
+            return alternativas
+        return [escolhido] + [a for a in alternativas if a != escolhido]
+
+    def localizador(self, nome):
+        return self._ordem(nome)[0]
+
+    def seletores_usados(self):
+        """{nome: localizador} que encontrou cada elemento (diagnóstico de seletores)"""
+        return dict(self._escolhidos)
+
+    def localizar(self, nome):
+        """Busca imediata (sem cache), tentando as alternativas em ordem"""
+        for locator in self._ordem(nome):
+            self.buscas += 1
+            elementos = self.driver.find_elements(*locator)
+            if elementos:
+                self._escolhidos[nome] = locator
+                self._elementos[nome] = elementos[0]
+                return elementos[0]
+        raise NoSuchElementException(f"'{nome}' não encontrado ({self.seletores[nome]})")
+
+    def aguardar(self, nome, clicavel=False, timeout=TIMEOUT_PADRAO):
+        """Espera qualquer alternativa aparecer (ou ficar clicável) e guarda o elemento"""
+        self.buscas += 1
+        locator, elemento = aguardar_algum(self.driver, self._ordem(nome), timeout, clicavel)
+        self._escolhidos[nome] = locator
+        self._elementos[nome] = elemento
+        return elemento
+
+    def elemento(self, nome):
+        """Elemento em cache; só vai ao driver se ainda não foi localizado"""
+        elemento = self._elementos.get(nome)
+        return elemento if elemento is not None else self.localizar(nome)
+
+    def existe(self, nome):
+        try:
+            self.localizar(nome)
+            return True
+        except NoSuchElementException:
+            return False
+
+    def usar(self, nome, acao):
+        """acao(elemento) no elemento em cache; se ele ficou velho, localiza de novo e repete"""
+        try:
+            return acao(self.elemento(nome))
+        except StaleElementReferenceException:
+            self._elementos.pop(nome, None)
+            return acao(self.localizar(nome))
+
+    def clicar(self, nome, antes=None, timeout=10):
+        """
+        Clica no elemento em cache; se ainda não está clicável, espera até
+        timeout. antes() roda logo antes do clique (ex.: rastreador.iniciar)
+        """
+        def clique(elemento):
+            if antes:
+                antes()
+            elemento.click()
+
+        try:
+            self.usar(nome, clique)
+        except (NoSuchElementException, ElementNotInteractableException, ElementClickInterceptedException):
+            clique(self.aguardar(nome, clicavel=True, timeout=timeout))
+
+    def preencher(self, nome, valor):
+        def digitar(elemento):
+            elemento.clear()
+            elemento.send_keys(valor)
+        self.usar(nome, digitar)
+
+    def limpar(self, *nomes):
+        for nome in nomes:
+            self.usar(nome, lambda elemento: elemento.clear())
+
+
+class PaginaEcrv(Pagina):
+    """Formulário de impressão do ATPV, dentro do frame 'body'"""
+    seletores = SELETORES_ECRV
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.aba_principal = None
+
+    def menu_disponivel(self, timeout=10):
+        """Checagem rápida de login: o frame abre com o menu ATPVe"""
+        try:
+            aguardar_frame(self.driver, FRAME_ECRV, timeout=timeout)
+            return self.existe("menu_atpve")
+        except Exception:
+            return False
+        finally:
+            self.driver.switch_to.default_content()
+
+    def abrir_formulario(self):
+        """Entra no frame, abre ATPVe > imprimir ATPV e espera os campos"""
+        aguardar_frame(self.driver, FRAME_ECRV)
+        self.clicar("menu_atpve")
+        self.clicar("link_imprimir_atpv", timeout=TIMEOUT_PADRAO)
+        self.aguardar("campo_renavam")
+        self.aguardar("campo_placa")
+        self.aba_principal = self.driver.current_window_handle
+        return self.aba_principal
+
+    def voltar_formulario(self):
+        """Volta para a aba e o frame do formulário (após um erro ou pop-up)"""
+        self.driver.switch_to.window(self.aba_principal)
+        self.driver.switch_to.frame(FRAME_ECRV)
+
+    def preencher_veiculo(self, renavam, placa):
+        self.preencher("campo_renavam", renavam)
+        self.preencher("campo_placa", placa)
+
+    def imprimir(self, antes=None, timeout=10):
+        self.clicar("botao_imprimir", antes=antes, timeout=timeout)
+
+    def limpar_campos(self):
+        self.limpar("campo_renavam", "campo_placa")
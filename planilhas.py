@@ -0,0 +1,142 @@
+"""
+Leitura única e rápida das planilhas de entrada.
+
+A planilha é lida uma vez pelo openpyxl em modo somente leitura (streaming),
+guardando só as colunas usadas pelos scripts (placa, renavam, comitente,
+data_emissao), com os nomes e tipos padronizados. O resultado fica em cache
+na memória e em disco (.cache_planilhas/), indexado pelo caminho e pela data
+de modificação do arquivo: validar e depois executar, ou abrir o script de
+novo com a mesma planilha, não lê o Excel outra vez.
+
+Os relatórios devolvem ao operador a planilha dele: ler_planilha(...,
+completa=True) traz também as outras colunas, com os nomes originais
+(as conhecidas continuam padronizadas), e enxuta() recorta de novo só as
+colunas usadas no processamento.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+
+PASTA_CACHE = Path(__file__).parent.absolute() / ".cache_planilhas"
+
+# Nome padronizado -> cabeçalhos aceitos (sem diferenciar maiúsculas)
+COLUNAS = {
+    "placa": ("placa",),
+    "renavam": ("renavam",),
+    "comitente": ("comitente",),
+    "data_emissao": ("data_emissao", "data emissao", "data_emissão", "data emissão"),
+}
+
+_trava = threading.Lock()
+_cache_memoria = {}
+
+
+def _assinatura(caminho):
+    estado = os.stat(caminho)
+    return (estado.st_mtime_ns, estado.st_size)
+
+
+def _arquivo_cache(caminho, completa=False):
+    chave = caminho + ("|completa" if completa else "")
+    return PASTA_CACHE / (hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20] + ".pkl")
+
+
+def enxuta(df, extras=()):
+    """Só as colunas conhecidas (e as extras) que existem no df, na ordem de COLUNAS"""
+    colunas = [c for c in list(COLUNAS) + list(extras) if c in df.columns]
+    enxuto = df[colunas].copy()
+    enxuto.attrs = dict(df.attrs)
+    return enxuto
+
+
+def _texto(valor):
+    """Célula -> texto sem espaços; números inteiros sem o '.0' do Excel"""
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).strip()
+    return texto or None
+
+
+def _ler_excel(caminho, completa=False):
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [str(c).strip() if c is not None else "" for c in next(linhas, ())]
+
+        aceitos = {nome: padrao for padrao, nomes in COLUNAS.items() for nome in nomes}
+        posicoes = {}
+        for posicao, nome in enumerate(cabecalho):
+            padrao = aceitos.get(nome.lower())
+            if padrao and padrao not in posicoes:
+                posicoes[padrao] = posicao
+            elif completa and nome and not padrao and nome not in posicoes:
+                posicoes[nome] = posicao
+
+        dados = {padrao: [] for padrao in posicoes}
+        for linha in linhas:
+            if not any(c is not None for c in linha):
+                continue
+            for padrao, posicao in posicoes.items():
+                dados[padrao].append(linha[posicao] if posicao < len(linha) else None)
+    finally:
+        livro.close()
+
+    df = pd.DataFrame(dados)
+    for padrao in ("placa", "renavam", "comitente"):
+        if padrao in df:
+            df[padrao] = df[padrao].map(_texto)
+    if "data_emissao" in df:
+        df["data_emissao"] = pd.to_datetime(df["data_emissao"], errors="coerce", dayfirst=True)
+    if "placa" in df:
+        df = df[df["placa"].notna()].reset_index(drop=True)
+    df.attrs["colunas_originais"] = [nome for nome in cabecalho if nome]
+    return df
+
+
+def ler_planilha(caminho, completa=False):
+    """
+    DataFrame com as colunas conhecidas que existem na planilha (com
+    completa=True, também as demais, para os relatórios).
+    df.attrs["colunas_originais"] lista todos os cabeçalhos do arquivo.
+    """
+    caminho = str(Path(caminho).absolute())
+    assinatura = _assinatura(caminho)
+    chave = (caminho, completa)
+
+    with _trava:
+        em_memoria = _cache_memoria.get(chave)
+    if em_memoria and em_memoria[0] == assinatura:
+        return em_memoria[1].copy()
+
+    arquivo_cache = _arquivo_cache(caminho, completa)
+    df = None
+    try:
+        with open(arquivo_cache, "rb") as arquivo:
+            assinatura_salva, df_salvo = pickle.load(arquivo)
+        if assinatura_salva == assinatura:
+            df = df_salvo
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    if df is None:
+        df = _ler_excel(caminho, completa)
+        try:
+            PASTA_CACHE.mkdir(exist_ok=True)
+            temporario = arquivo_cache.with_suffix(".tmp")
+            with open(temporario, "wb") as arquivo:
+                pickle.dump((assinatura, df), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, arquivo_cache)
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar o cache da planilha: {e}")
+
+    with _trava:
+        _cache_memoria[chave] = (assinatura, df)
+    return df.copy()
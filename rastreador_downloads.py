@@ -0,0 +1,261 @@
+"""
+Rastreador de downloads do navegador.
+
+Em vez de varrer a pasta a cada segundo e comparar tamanhos, escuta os
+eventos de download do DevTools lidos do log de performance e, se eles não
+estiverem disponíveis, observa a pasta com o watchdog (inotify /
+ReadDirectoryChangesW) ou com uma varredura curta. O Chromium só dá o nome
+final ao arquivo quando o download termina, então o primeiro arquivo novo
+sem extensão parcial já está completo.
+
+O log de performance do chromedriver/msedgedriver só registra os domínios
+Network, Page e Tracing: os eventos Browser.download* (de
+Browser.setDownloadBehavior com eventsEnabled) não chegam nele. Os que
+chegam são Page.downloadWillBegin/downloadProgress, com o domínio Page
+ligado em perfLoggingPrefs (ativar_log_performance). Como isso depende da
+versão do driver, o rastreador só confia nos eventos depois de ver o
+primeiro downloadWillBegin. Se um arquivo aparece na pasta sem nenhum
+evento, ele passa a usar só a pasta.
+
+preparar_pedido() cria uma pasta nova para cada download e aponta o
+navegador para ela (Browser.setDownloadBehavior): o arquivo é atribuído ao
+pedido certo sem apagar nada da pasta. Com os eventos confirmados só conta
+o download cujo downloadWillBegin chegou depois de iniciar(), e a pasta não
+é mais consultada, então um download atrasado do pedido anterior é
+ignorado mesmo que caia na pasta nova.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog é opcional
+    Observer = None
+    FileSystemEventHandler = object
+
+EXTENSOES_PARCIAIS = ('.tmp', '.crdownload', '.partial')
+INTERVALO_VARREDURA = 0.1
+
+# Capabilities que ativam o log de performance (eventos do DevTools)
+LOGGING_PREFS = {"performance": "ALL"}
+# Só o domínio Page (onde estão os eventos de download); sem Network o log fica bem menor
+PERF_LOGGING_PREFS = {"enableNetwork": False, "enablePage": True}
+
+
+def ativar_log_performance(options):
+    """Liga o log de performance (domínio Page) nas options do Edge/Chrome"""
+    for chave in ("ms:loggingPrefs", "goog:loggingPrefs"):
+        try:
+            options.set_capability(chave, LOGGING_PREFS)
+        except Exception:
+            pass
+    try:
+        options.add_experimental_option("perfLoggingPrefs", PERF_LOGGING_PREFS)
+    except Exception:
+        pass
+
+
+def arquivo_parcial(nome):
+    """Indica se o nome é de um download ainda em andamento"""
+    return nome.endswith(EXTENSOES_PARCIAIS)
+
+
+class _AvisoPasta(FileSystemEventHandler):
+    """Acorda o rastreador sempre que algo muda na pasta"""
+
+    def __init__(self, evento):
+        self.evento = evento
+
+    def on_any_event(self, event):
+        self.evento.set()
+
+
+class RastreadorDownloads:
+    def __init__(self, driver, pasta):
+        self.driver = driver
+        self.pasta_raiz = Path(pasta)
+        self.pasta = self.pasta_raiz
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self._pedidos = 0
+        self.pasta_por_pedido = False
+        self.eventos_confirmados = False  # já chegou um downloadWillBegin no log
+        self._conhecidos = set()
+        self._nomes_sugeridos = {}
+        self._mudanca = threading.Event()
+        self._observador = None
+        self.eventos_disponiveis = self._ativar_eventos()
+        self._iniciar_observador()
+
+    def _apontar_downloads(self, pasta):
+        self.driver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+            'behavior': 'allow',
+            'downloadPath': str(pasta),
+            'eventsEnabled': True
+        })
+
+    def _ativar_eventos(self):
+        """Pede ao navegador para emitir eventos de progresso de download"""
+        try:
+            self._apontar_downloads(self.pasta)
+            self.pasta_por_pedido = True
+        except Exception:
+            self.pasta_por_pedido = False
+            return False
+        try:
+            self.driver.get_log('performance')
+            return True
+        except Exception:
+            return False
+
+    def _iniciar_observador(self):
+        if Observer is None:
+            return
+        try:
+            self._observador = Observer()
+            self._observador.schedule(_AvisoPasta(self._mudanca), str(self.pasta_raiz), recursive=True)
+            self._observador.daemon = True
+            self._observador.start()
+        except Exception as e:
+            logging.warning(f"Watchdog indisponível, usando varredura: {e}")
+            self._observador = None
+
+    def trocar_navegador(self, driver):
+        """Passa a acompanhar outro navegador (reciclagem) sem reiniciar a numeração dos pedidos"""
+        self.parar()
+        self.driver = driver
+        self.pasta = self.pasta_raiz
+        self.eventos_disponiveis = self._ativar_eventos()
+        self._iniciar_observador()
+
+    def preparar_pedido(self):
+        """
+        Pasta exclusiva para o próximo download; sem DevTools continua na
+        pasta da sessão (iniciar() guarda o que já existia nela)
+        """
+        if not self.pasta_por_pedido:
+            return self.pasta
+        anterior = self.pasta if self.pasta != self.pasta_raiz else None
+        self._pedidos += 1
+        pasta = self.pasta_raiz / f"pedido_{self._pedidos:06d}"
+        pasta.mkdir(exist_ok=True)
+        try:
+            self._apontar_downloads(pasta)
+        except Exception as e:
+            logging.warning(f"Não foi possível trocar a pasta de download, usando a da sessão: {e}")
+            self.pasta_por_pedido = False
+            pasta.rmdir()
+            return self.pasta
+        self.pasta = pasta
+
+        # A pasta do pedido anterior fica vazia quando o arquivo já foi organizado
+        if anterior:
+            try:
+                anterior.rmdir()
+            except OSError:
+                pass
+        return pasta
+
+    def iniciar(self):
+        """Marca o estado atual; chamar imediatamente antes do clique que baixa o arquivo"""
+        self._conhecidos = {entrada.name for entrada in os.scandir(self.pasta)}
+        self._nomes_sugeridos = {}
+        self._mudanca.clear()
+        if self.eventos_disponiveis:
+            try:
+                self.driver.get_log('performance')
+            except Exception:
+                self.eventos_disponiveis = False
+
+    def _concluido_por_evento(self):
+        """Lê os eventos pendentes e devolve o caminho do download concluído"""
+        try:
+            entradas = self.driver.get_log('performance')
+        except Exception:
+            self.eventos_disponiveis = False
+            return None
+
+        for entrada in entradas:
+            try:
+                mensagem = json.loads(entrada['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            metodo = mensagem.get('method', '')
+            params = mensagem.get('params', {})
+            if metodo.endswith('.downloadWillBegin'):
+                self.eventos_confirmados = True
+                self._nomes_sugeridos[params.get('guid')] = params.get('suggestedFilename')
+            elif metodo.endswith('.downloadProgress') and params.get('state') == 'completed':
+                if params.get('guid') not in self._nomes_sugeridos:
+                    # Download iniciado antes deste pedido (atrasado do veículo anterior)
+                    continue
+                caminho = params.get('filePath')
+                if caminho and os.path.exists(caminho):
+                    return Path(caminho)
+                nome = self._nomes_sugeridos[params.get('guid')]
+                if nome and (self.pasta / nome).exists():
+                    return self.pasta / nome
+                # Nome desconhecido: o arquivo novo da pasta é o concluído
+                return self._novo_na_pasta()
+        return None
+
+    def _achado_sem_evento(self, arquivo):
+        """
+        Arquivo novo na pasta antes do evento de conclusão: relê o log. Se
+        nenhum downloadWillBegin chegou, os eventos não são registrados e o
+        rastreador passa a usar a pasta; se chegou, espera o evento
+        """
+        if not self.eventos_disponiveis:
+            return arquivo
+        concluido = self._concluido_por_evento()
+        if concluido or self.eventos_confirmados:
+            return concluido
+        logging.warning("Eventos de download não chegam ao log de performance, usando a pasta do pedido")
+        self.eventos_disponiveis = False
+        return arquivo
+
+    def _novo_na_pasta(self):
+        for entrada in os.scandir(self.pasta):
+            if entrada.name in self._conhecidos or arquivo_parcial(entrada.name):
+                continue
+            if entrada.is_file() and entrada.stat().st_size > 0:
+                return Path(entrada.path)
+        return None
+
+    def aguardar(self, timeout=30):
+        """
+        Espera o download terminar e devolve o caminho exato do arquivo (ou
+        None). Com os eventos confirmados a pasta não é consultada
+        """
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if self.eventos_disponiveis:
+                arquivo = self._concluido_por_evento()
+                if arquivo:
+                    return arquivo
+
+            if not (self.eventos_disponiveis and self.eventos_confirmados):
+                arquivo = self._novo_na_pasta()
+                if arquivo:
+                    arquivo = self._achado_sem_evento(arquivo)
+                    if arquivo:
+                        return arquivo
+
+            if self._observador:
+                self._mudanca.wait(INTERVALO_VARREDURA)
+                self._mudanca.clear()
+            else:
+                time.sleep(INTERVALO_VARREDURA)
+        return None
+
+    def parar(self):
+        if self._observador:
+            try:
+                self._observador.stop()
+            except Exception:
+                pass
+            self._observador = None
@@ -0,0 +1,177 @@
+"""
+Registro durável do progresso por placa (checkpoint / retomada).
+
+Cada mudança de estado vira uma linha nova em uma tabela SQLite que só
+recebe INSERTs (pendente -> ok / erro), com número da tentativa e horário.
+Ao abrir, o estado mais recente de cada placa é carregado para um dict, de
+modo que um reinício pula as placas concluídas em O(1) por linha. O
+relatório em Excel é montado a partir do registro, então pode ser gerado a
+qualquer momento, mesmo que a execução tenha caído no meio.
+
+Cada evento pertence a um escopo: o hash das colunas da planilha que
+definem o trabalho (escopo_da_planilha; ex.: placa e data_emissao no
+Lançamento). Rodar de novo a mesma planilha retoma de onde parou. Uma
+planilha nova, outro banco ou a mesma placa com outra data é trabalho novo
+e não é pulado. Eventos gravados antes do escopo existir ficam no escopo ''
+e não contam mais.
+
+Para refazer uma planilha do zero: --recomecar no PDF.py, Lançamento.py ou
+fila_bancos.py (apaga só o escopo dela). Para zerar o registro inteiro:
+python registro_progresso.py progresso_pdf.sqlite3 --limpar, ou apague o
+.sqlite3 (e os -wal/-shm) com nenhuma execução aberta.
+
+Uso pela linha de comando:
+    python registro_progresso.py progresso_pdf.sqlite3 planilha.xlsx RELATORIO.xlsx
+    python registro_progresso.py progresso_lancamento.sqlite3 --limpar
+"""
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+PENDENTE = "pendente"
+OK = "ok"
+ERRO = "erro"
+
+# Como cada estado aparece na coluna 'processado' dos relatórios
+ROTULOS_RELATORIO = {OK: "Sim", ERRO: "Erro", PENDENTE: "Pendente"}
+
+
+def _agora():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def escopo_da_planilha(df, colunas):
+    """
+    Hash das colunas que definem o trabalho (as que existirem no df), sem
+    depender da ordem das linhas: a mesma planilha dá sempre o mesmo escopo
+    """
+    presentes = [coluna for coluna in colunas if coluna in df.columns]
+    linhas = sorted("\t".join(map(str, linha)) for linha in df[presentes].itertuples(index=False))
+    return hashlib.sha1("\n".join(linhas).encode("utf-8")).hexdigest()[:12]
+
+
+class RegistroProgresso:
+    def __init__(self, caminho, escopo=None):
+        """escopo None lê o último estado de cada placa em todos os escopos (relatórios avulsos)"""
+        self.caminho = str(caminho)
+        self.escopo = escopo
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS eventos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                placa TEXT NOT NULL,
+                estado TEXT NOT NULL,
+                tentativa INTEGER NOT NULL,
+                erro TEXT,
+                momento TEXT NOT NULL
+            )
+        """)
+        colunas = [linha[1] for linha in self._conexao.execute("PRAGMA table_info(eventos)")]
+        if "escopo" not in colunas:
+            self._conexao.execute("ALTER TABLE eventos ADD COLUMN escopo TEXT NOT NULL DEFAULT ''")
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_eventos_escopo ON eventos (escopo, placa, id)")
+        self._estado = {}
+        self._carregar()
+
+    def _carregar(self):
+        """Carrega o último evento de cada placa (do escopo, se houver)"""
+        filtro, parametros = ("WHERE escopo = ?", (self.escopo,)) if self.escopo is not None else ("", ())
+        linhas = self._conexao.execute(f"""
+            SELECT e.placa, e.estado, e.tentativa, e.erro, e.momento, p.primeiro
+            FROM eventos e
+            JOIN (SELECT placa, MAX(id) AS ultimo, MIN(momento) AS primeiro
+                  FROM eventos {filtro} GROUP BY placa) p
+              ON e.id = p.ultimo
+        """, parametros)
+        for placa, estado, tentativa, erro, momento, primeiro in linhas:
+            self._estado[placa] = {
+                "estado": estado, "tentativas": tentativa, "erro": erro,
+                "inicio": primeiro, "atualizado": momento,
+            }
+
+    def _anexar(self, placa, estado, erro=None):
+        with self._trava:
+            atual = self._estado.get(placa, {})
+            tentativa = atual.get("tentativas", 0) + (1 if estado == PENDENTE else 0)
+            momento = _agora()
+            self._conexao.execute(
+                "INSERT INTO eventos (placa, estado, tentativa, erro, momento, escopo) VALUES (?, ?, ?, ?, ?, ?)",
+                (placa, estado, tentativa, erro, momento, self.escopo or "")
+            )
+            self._estado[placa] = {
+                "estado": estado, "tentativas": tentativa, "erro": erro,
+                "inicio": atual.get("inicio") or momento, "atualizado": momento,
+            }
+
+    def iniciar(self, placa):
+        """Registra o início de uma tentativa"""
+        self._anexar(placa, PENDENTE)
+
+    def sucesso(self, placa):
+        self._anexar(placa, OK)
+
+    def falha(self, placa, erro):
+        self._anexar(placa, ERRO, str(erro))
+
+    def concluido(self, placa):
+        """True se a placa já terminou com sucesso em alguma execução do mesmo escopo"""
+        return self._estado.get(placa, {}).get("estado") == OK
+
+    def estado(self, placa):
+        return self._estado.get(placa)
+
+    def contagem(self):
+        """Quantidade de placas em cada estado"""
+        totais = {PENDENTE: 0, OK: 0, ERRO: 0}
+        for info in self._estado.values():
+            totais[info["estado"]] = totais.get(info["estado"], 0) + 1
+        return totais
+
+    def relatorio(self, df, coluna_placa='placa'):
+        """Devolve uma cópia do df com as colunas de situação vindas do registro"""
+        df = df.copy()
+        placas = df[coluna_placa].astype(str).str.strip()
+        info = placas.map(lambda placa: self._estado.get(placa, {}))
+        df['processado'] = info.map(lambda i: ROTULOS_RELATORIO.get(i.get("estado"), ""))
+        df['data_processamento'] = info.map(lambda i: i.get("atualizado") if i.get("estado") == OK else None)
+        df['erro'] = info.map(lambda i: i.get("erro"))
+        df['tentativas'] = info.map(lambda i: i.get("tentativas", 0))
+        return df
+
+    def recomecar(self):
+        """Apaga os eventos do escopo (ou de todos, com escopo None); devolve quantos"""
+        with self._trava:
+            if self.escopo is None:
+                apagados = self._conexao.execute("DELETE FROM eventos").rowcount
+            else:
+                apagados = self._conexao.execute("DELETE FROM eventos WHERE escopo = ?", (self.escopo,)).rowcount
+            self._estado.clear()
+        return apagados
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[2] == "--limpar":
+        registro = RegistroProgresso(sys.argv[1])
+        print(f"🧹 {registro.recomecar()} eventos apagados de {sys.argv[1]}")
+        registro.fechar()
+        sys.exit(0)
+    if len(sys.argv) != 4:
+        print("Uso: python registro_progresso.py <registro.sqlite3> <planilha.xlsx> <saida.xlsx>")
+        print("     python registro_progresso.py <registro.sqlite3> --limpar")
+        sys.exit(1)
+
+    registro = RegistroProgresso(sys.argv[1])
+    planilha = pd.read_excel(sys.argv[2])
+    registro.relatorio(planilha).to_excel(sys.argv[3], index=False)
+    print(f"📋 Relatório gerado: {sys.argv[3]} {registro.contagem()}")
@@ -0,0 +1,319 @@
+"""
+Servidor local que imita o e-CRV e o portal do Freitas para testes e benchmark.
+
+e-CRV:   /                                  frameset de pagina_completa.html
+         /gever/SGU/login.do                frame 'body' já logado, menu ATPVe
+         /gever/GVR/atpve/formImprimir.do   formulário renavam/placa + IMPRIMIR
+         /gever/GVR/atpve/imprimirATPV.do   POST que devolve o PDF do ATPV
+Freitas: /Home/Login                        login com link para a área (nova aba)
+         /Area, /Veiculos?q=<placa>         pesquisa (txtPesquisarVeiculos); vazia lista tudo
+         /Veiculo/Detalhe?placa=<placa>     aba leilao-tab, ATPVEmitida, modais
+         /Veiculo/AtualizarEmissaoATPV      POST do atualizarEmissaoATPVForm()
+
+Latência (ms, com ±30% de variação) e taxa de falhas são configuráveis.
+
+Uso pela linha de comando:
+    python servidor_mock.py [porta] [latencia_ms] [taxa_falhas]
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PASTA_SCRIPT = Path(__file__).parent.absolute()
+PAGINA_BASE = PASTA_SCRIPT / "pagina_completa.html"
+
+COOKIE_SESSAO = "JSESSIONID"
+ITENS_POR_PAGINA = 50
+
+# Recursos "pesados" das páginas reais (logotipos, fontes), para medir o perfil enxuto
+RECURSOS = """<style>@font-face{font-family:Gov;src:url('/static/fonte.woff2')}body{font-family:Gov,sans-serif}</style>
+<img id="logotipo" src="/static/logotipo.png" alt="">
+"""
+TAMANHO_RECURSO = 256 * 1024
+
+MENU_ECRV = """<html><head><meta charset="utf-8"><title>e-CRV</title></head><body>
+""" + RECURSOS + """<ul id="menu">
+  <li><a href="javascript:void(0)" id="menuATPVe"
+         onclick="document.getElementById('submenuATPVe').style.display='block'">ATPVe</a>
+    <ul id="submenuATPVe" style="display:none">
+      <li><a id="linkImprimirATPV" href="/gever/GVR/atpve/formImprimir.do">imprimir ATPV</a></li>
+    </ul>
+  </li>
+</ul>
+</body></html>"""
+
+FORMULARIO_ECRV = """<html><head><meta charset="utf-8"><title>Imprimir ATPV</title></head><body>
+<form id="formImprimirATPV" method="post" action="/gever/GVR/atpve/imprimirATPV.do">
+  <input type="hidden" name="method" value="imprimir">
+  <label>Renavam <input type="text" id="renavam" name="renavam"></label>
+  <label>Placa <input type="text" id="placa" name="placa"></label>
+  <button type="submit" id="btnImprimir">IMPRIMIR</button>
+</form>
+</body></html>"""
+
+ERRO_ECRV = """<html><head><meta charset="utf-8"></head><body>
+<p class="erro">Serviço indisponível. Tente novamente.</p></body></html>"""
+
+CABECALHO_FREITAS = """<html><head><meta charset="utf-8"><title>Freitas</title>
+<style>.modal{display:none;position:fixed;top:30%;left:30%;background:#fff;border:1px solid #000;padding:20px}</style>
+</head><body>
+""" + RECURSOS + """<div id="barraPesquisa">
+  <input type="text" id="txtPesquisarVeiculos">
+  <button type="button" id="btnPesquisarVeiculos"
+          onclick="location.href='/Veiculos?q='+encodeURIComponent(document.getElementById('txtPesquisarVeiculos').value)">Pesquisar</button>
+</div>
+"""
+
+LOGIN_FREITAS = """<html><head><meta charset="utf-8"><title>Login</title></head><body>
+<form onsubmit="return false"><input id="usuario"><input id="senha" type="password"></form>
+<a id="linkArea" href="/Area" target="_blank">Área do comitente</a>
+</body></html>"""
+
+DETALHE_FREITAS = """
+<h1 id="placaVeiculo">{placa}</h1>
+<ul class="nav-tabs">
+  <li><a id="dados-tab" href="#">Dados</a></li>
+  <li><a id="leilao-tab" href="#" onclick="abrirLeilao();return false;">Leilão</a></li>
+</ul>
+<div id="leilao" style="display:none">
+  <select id="ATPVEmitida" name="ATPVEmitida" disabled>
+    <option value="">Selecione</option><option value="0">Não</option><option value="1">Sim</option>
+  </select>
+  <input type="text" id="DataEmitidaATPV" name="DataEmitidaATPV">
+  <button type="button" onclick="atualizarEmissaoATPVForm();">Salvar</button>
+</div>
+<div id="modalConfirmacao" class="modal"><p>Confirma a alteração?</p>
+  <button type="button" onclick="confirmarEmissao()">Sim</button>
+  <button type="button" onclick="document.getElementById('modalConfirmacao').style.display='none'">Não</button>
+</div>
+<div id="modalJsAlert" class="modal"><p id="modalJsAlertTexto"></p>
+  <button type="button" id="modalJsAlertOk" onclick="document.getElementById('modalJsAlert').style.display='none'">OK</button>
+</div>
+<script>
+var ID_VEICULO = {id_veiculo};
+function abrirLeilao() {{
+  document.getElementById('leilao').style.display = 'block';
+  setTimeout(function() {{ document.getElementById('ATPVEmitida').disabled = false; }}, {atraso_aba});
+}}
+function atualizarEmissaoATPVForm() {{
+  document.getElementById('modalConfirmacao').style.display = 'block';
+}}
+function confirmarEmissao() {{
+  document.getElementById('modalConfirmacao').style.display = 'none';
+  var dados = new URLSearchParams();
+  dados.append('IdVeiculo', ID_VEICULO);
+  dados.append('ATPVEmitida', document.getElementById('ATPVEmitida').value);
+  dados.append('DataEmitidaATPV', document.getElementById('DataEmitidaATPV').value);
+  fetch('/Veiculo/AtualizarEmissaoATPV', {{method: 'POST', body: dados}})
+    .then(function(r) {{ return r.json(); }})
+    .catch(function() {{ return {{sucesso: false, mensagem: 'Erro de comunicação'}}; }})
+    .then(function(j) {{
+      document.getElementById('modalJsAlertTexto').innerText = j.mensagem;
+      document.getElementById('modalJsAlert').style.display = 'block';
+    }});
+}}
+</script>
+</body></html>"""
+
+
+def gerar_pdf_atpv(placa, renavam):
+    """Monta um PDF mínimo e válido com a placa e o renavam no texto"""
+    texto = f"BT /F1 14 Tf 50 780 Td (AUTORIZACAO PARA TRANSFERENCIA - ATPV) Tj 0 -30 Td (PLACA {placa}) Tj 0 -20 Td (RENAVAM {renavam}) Tj ET"
+    objetos = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(texto)} >>\nstream\n{texto}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    saida = b"%PDF-1.4\n"
+    posicoes = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posicoes.append(len(saida))
+        saida += f"{numero} 0 obj\n{objeto}\nendobj\n".encode("latin-1")
+    inicio_xref = len(saida)
+    saida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for posicao in posicoes:
+        saida += f"{posicao:010d} 00000 n \n".encode("latin-1")
+    saida += (f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n"
+              f"startxref\n{inicio_xref}\n%%EOF\n").encode("latin-1")
+    return saida
+
+
+def _pagina_inicial_ecrv():
+    """pagina_completa.html sem dependências externas"""
+    try:
+        html = PAGINA_BASE.read_text(encoding="iso-8859-1")
+        return html.replace("https://www.saopaulo.sp.gov.br/barra-govsp/topo-basico-preto.html", "about:blank")
+    except OSError:
+        return ('<html><frameset rows="70,100%"><frame name="header" src="about:blank">'
+                '<frame id="frameMain" name="body" src="/gever/SGU/login.do?method=iniciarLogin">'
+                '</frameset></html>')
+
+
+class ManipuladorMock(BaseHTTPRequestHandler):
+    # Ajustados por iniciar_servidor()
+    latencia_ms = 0
+    taxa_falhas = 0.0
+    atraso_aba_ms = 200
+    placas_cadastradas = ()
+    contadores = None
+    trava = threading.Lock()
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _atrasar(self):
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms * random.uniform(0.7, 1.3) / 1000)
+
+    def _falhar(self):
+        return random.random() < self.taxa_falhas
+
+    def _contar(self, chave):
+        with self.trava:
+            self.contadores[chave] = self.contadores.get(chave, 0) + 1
+
+    def _tem_sessao(self):
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        return COOKIE_SESSAO in cookies
+
+    def _responder(self, corpo, tipo="text/html; charset=utf-8", status=200, cabecalhos=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode("utf-8" if "utf-8" in tipo else "iso-8859-1")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _formulario(self):
+        tamanho = int(self.headers.get("Content-Length", 0) or 0)
+        dados = parse_qs(self.rfile.read(tamanho).decode("utf-8")) if tamanho else {}
+        return {chave: valores[0] for chave, valores in dados.items()}
+
+    def do_GET(self):
+        self._atrasar()
+        url = urlparse(self.path)
+        consulta = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+
+        # ---------- e-CRV ----------
+        if url.path == "/":
+            self._responder(_pagina_inicial_ecrv(), "text/html; charset=iso-8859-1",
+                            cabecalhos={"Set-Cookie": f"{COOKIE_SESSAO}=mock{random.randint(1, 10**9)}; Path=/"})
+        elif url.path == "/gever/SGU/login.do":
+            self._responder(MENU_ECRV)
+        elif url.path == "/gever/GVR/atpve/formImprimir.do":
+            self._responder(FORMULARIO_ECRV)
+
+        elif url.path.startswith("/static/"):
+            tipo = "image/png" if url.path.endswith(".png") else "font/woff2"
+            self._responder(b"\0" * TAMANHO_RECURSO, tipo)
+
+        # ---------- Freitas ----------
+        elif url.path == "/Home/Login":
+            self._responder(LOGIN_FREITAS, cabecalhos={"Set-Cookie": f"{COOKIE_SESSAO}=freitas; Path=/"})
+        elif url.path == "/Area":
+            self._responder(CABECALHO_FREITAS + "</body></html>")
+        elif url.path == "/Veiculos":
+            placa = consulta.get("q", "").strip().upper()
+            if placa:
+                encontradas, proxima = [placa], None
+            else:
+                # Pesquisa vazia: listagem paginada de todos os veículos cadastrados
+                pagina = int(consulta.get("pagina", "1"))
+                inicio = (pagina - 1) * ITENS_POR_PAGINA
+                encontradas = self.placas_cadastradas[inicio:inicio + ITENS_POR_PAGINA]
+                proxima = pagina + 1 if inicio + ITENS_POR_PAGINA < len(self.placas_cadastradas) else None
+            linhas = "".join(f'<tr><td><a href="/Veiculo/Detalhe?placa={p}">{p}</a></td></tr>' for p in encontradas)
+            resultado = f'<table id="resultado">{linhas}</table>'
+            if proxima:
+                resultado += f'<a rel="next" href="/Veiculos?q=&pagina={proxima}">Próxima</a>'
+            self._responder(CABECALHO_FREITAS + resultado + "</body></html>")
+        elif url.path == "/Veiculo/Detalhe":
+            placa = consulta.get("placa", "").strip().upper()
+            detalhe = DETALHE_FREITAS.format(placa=placa, id_veiculo=abs(hash(placa)) % 10**6,
+                                             atraso_aba=self.atraso_aba_ms)
+            self._responder(CABECALHO_FREITAS + detalhe)
+        else:
+            self._responder("", status=404)
+
+    def do_POST(self):
+        self._atrasar()
+        url = urlparse(self.path)
+        dados = self._formulario()
+
+        if url.path == "/gever/GVR/atpve/imprimirATPV.do":
+            if not self._tem_sessao():
+                self._contar("ecrv_sem_sessao")
+                self._responder(MENU_ECRV)
+            elif self._falhar():
+                self._contar("ecrv_falhas")
+                self._responder(ERRO_ECRV, status=503)
+            else:
+                self._contar("ecrv_pdfs")
+                placa = dados.get("placa", "").strip().upper()
+                pdf = gerar_pdf_atpv(placa, dados.get("renavam", "").strip())
+                self._responder(pdf, "application/pdf", cabecalhos={
+                    "Content-Disposition": f'attachment; filename="ATPV_{placa}.pdf"'
+                })
+
+        elif url.path == "/Veiculo/AtualizarEmissaoATPV":
+            if not self._tem_sessao():
+                self._contar("freitas_sem_sessao")
+                self._responder(json.dumps({"sucesso": False, "mensagem": "Sessão expirada"}),
+                                "application/json; charset=utf-8", status=401)
+            elif not dados.get("IdVeiculo", "").isdigit() or dados.get("ATPVEmitida") != "1":
+                self._contar("freitas_invalidas")
+                self._responder(json.dumps({"sucesso": False, "mensagem": "Dados inválidos"}),
+                                "application/json; charset=utf-8")
+            elif self._falhar():
+                self._contar("freitas_falhas")
+                self._responder(json.dumps({"sucesso": False, "mensagem": "Erro ao salvar"}),
+                                "application/json; charset=utf-8", status=500)
+            else:
+                self._contar("freitas_atualizacoes")
+                self._responder(json.dumps({"sucesso": True, "mensagem": "Registro atualizado com sucesso"}),
+                                "application/json; charset=utf-8")
+        else:
+            self._responder("", status=404)
+
+
+def iniciar_servidor(porta=0, latencia_ms=0, taxa_falhas=0.0, atraso_aba_ms=200, placas_cadastradas=()):
+    """Sobe o servidor em uma thread; devolve (servidor, url_base)"""
+    manipulador = type("Manipulador", (ManipuladorMock,), {
+        "placas_cadastradas": [str(p).strip().upper() for p in placas_cadastradas],
+        "latencia_ms": latencia_ms,
+        "taxa_falhas": taxa_falhas,
+        "atraso_aba_ms": atraso_aba_ms,
+        "contadores": {},
+    })
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), manipulador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latencia = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    falhas = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    servidor, url_base = iniciar_servidor(porta, latencia, falhas)
+    print(f"🧪 Servidor mock em {url_base} (latência {latencia} ms, falhas {falhas:.0%})")
+    print(f"   e-CRV:   {url_base}")
+    print(f"   Freitas: {url_base}Home/Login")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,104 @@
+"""
+Sessão autenticada salva em disco (cookies + localStorage).
+
+Depois de um login bem-sucedido a sessão é gravada em JSON; no próximo
+início os cookies (de todos os domínios envolvidos) e o localStorage são
+recolocados no navegador e o script confere, com uma checagem barata, se
+continua logado. O login manual só é pedido quando a sessão expirou.
+Funciona também com o Edge em modo InPrivate, já que nada depende do
+perfil do navegador.
+
+⚠️ O arquivo dá acesso à conta enquanto a sessão for válida: não versionar
+nem compartilhar (sessao_*.json está no .gitignore).
+"""
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+_JS_LER_STORAGE = "return Object.assign({}, window.localStorage);"
+_JS_GRAVAR_STORAGE = "var d = arguments[0]; for (var k in d) { window.localStorage.setItem(k, d[k]); }"
+
+
+def cookie_para_selenium(cookie):
+    """Cópia do cookie aceita pelo add_cookie (sameSite inválido removido)"""
+    cookie = dict(cookie)
+    if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+        cookie.pop("sameSite", None)
+    return cookie
+
+
+class SessaoSalva:
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+
+    def salvar(self, driver):
+        """Grava URL, cookies e localStorage da aba atual"""
+        try:
+            local_storage = driver.execute_script(_JS_LER_STORAGE) or {}
+        except Exception:
+            local_storage = {}
+        dados = {
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "local_storage": local_storage,
+            "salvo_em": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        try:
+            temporario = self.caminho.with_suffix(".tmp")
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            print(f"⚠️  Não foi possível salvar a sessão: {e}")
+
+    def restaurar(self, driver):
+        """
+        Recoloca cookies e localStorage e abre a URL salva; False se não há
+        sessão salva (ou todos os cookies já venceram). Quem chama confere
+        se a página aberta está mesmo logada.
+        """
+        dados = self._carregar()
+        if not dados or not dados.get("url"):
+            return False
+        agora = time.time()
+        cookies = [c for c in dados.get("cookies", []) if not c.get("expiry") or c["expiry"] > agora]
+        if not cookies:
+            return False
+
+        # O add_cookie só aceita cookies do domínio aberto: visita cada domínio uma vez
+        url = urlparse(dados["url"])
+        por_dominio = {}
+        for cookie in cookies:
+            por_dominio.setdefault(cookie.get("domain", url.hostname).lstrip("."), []).append(cookie)
+        for dominio, lista in por_dominio.items():
+            endereco = url.netloc if url.hostname == dominio else dominio
+            driver.get(f"{url.scheme}://{endereco}/")
+            for cookie in lista:
+                try:
+                    driver.add_cookie(cookie_para_selenium(cookie))
+                except Exception:
+                    pass
+
+        if dados.get("local_storage"):
+            driver.get(dados["url"])
+            try:
+                driver.execute_script(_JS_GRAVAR_STORAGE, dados["local_storage"])
+            except Exception:
+                pass
+        driver.get(dados["url"])
+        return True
+
+    def apagar(self):
+        try:
+            self.caminho.unlink()
+        except OSError:
+            pass
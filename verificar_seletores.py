@@ -0,0 +1,341 @@
+"""
+Regressão dos seletores contra páginas salvas (sem portal e sem login).
+
+Quando o DETRAN ou o Freitas mudam uma página, o seletor quebrado só
+aparecia no meio de um lote. Esta ferramenta tem duas partes.
+
+- capturar: percorre o fluxo uma vez e salva o DOM de cada etapa em
+  INSTANTANEOS_PAGINAS/<fluxo>/<etapa>.html, com um .json ao lado (URL,
+  placa usada e data). No e-CRV as etapas são o frameset, o menu e o
+  formulário. No Freitas são a área, a listagem, a pesquisa e o veículo.
+  O e-CRV e o Freitas reais exigem login manual; "mock" usa o servidor_mock.
+- verificar: abre cada instantâneo em um navegador headless local, com
+  JavaScript desligado, e confere cada seletor de paginas.py na sua etapa.
+  Também mostra qual alternativa encontrou o elemento. Leva poucos
+  segundos e sai com código 1 se algum seletor não encontra mais nada ou
+  se falta o instantâneo de uma etapa (nada conferido não é aprovação).
+  Serve para rodar antes de um lote de produção (fila_bancos.py
+  --conferir-seletores).
+
+O frameset do e-CRV, quando não foi capturado, é conferido em
+pagina_completa.html.
+
+Uso:
+    python verificar_seletores.py capturar ecrv
+    python verificar_seletores.py capturar freitas --placa ABC1D23
+    python verificar_seletores.py capturar mock
+    python verificar_seletores.py verificar [ecrv] [freitas] [--navegador edge]
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+from esperas import aguardar_clicavel, aguardar_frame, aguardar_habilitado, aguardar_nova_aba, aguardar_visivel
+from navegador import CHROME, EDGE, ENXUTO, aplicar_perfil, criar_driver
+from paginas import FRAME_ECRV, SELETORES_ECRV, SELETORES_FREITAS, PaginaEcrv, alternativas, link_veiculo
+
+PASTA_SCRIPT = Path(__file__).parent.absolute()
+PASTA_INSTANTANEOS = PASTA_SCRIPT / "INSTANTANEOS_PAGINAS"
+PAGINA_INICIAL_PADRAO = PASTA_SCRIPT / "pagina_completa.html"
+
+ECRV = "ecrv"
+FREITAS = "freitas"
+FLUXOS = (ECRV, FREITAS)
+
+# Etapa de cada fluxo -> seletores (nomes de paginas.py) que precisam existir nela
+ETAPAS = {
+    ECRV: {
+        "inicio": ["frame_body"],
+        "menu": ["menu_atpve", "link_imprimir_atpv"],
+        "formulario": ["campo_renavam", "campo_placa", "botao_imprimir"],
+    },
+    FREITAS: {
+        "area": ["campo_pesquisa", "botao_pesquisar"],
+        "listagem": ["proxima_pagina", "links_veiculos"],
+        "pesquisa": ["link_veiculo"],
+        "veiculo": ["aba_leilao", "campo_emissao", "campo_data", "botao_salvar", "popup_sim", "popup_ok"],
+    },
+}
+
+# Podem faltar no instantâneo sem ser regressão (só aviso)
+OPCIONAIS = {
+    "proxima_pagina": "só aparece com mais de uma página de veículos",
+    "popup_sim": "o modal pode ser criado só depois de salvar",
+    "popup_ok": "o modal pode ser criado só depois de salvar",
+}
+
+OK = "ok"
+FALHOU = "falhou"
+AVISO = "aviso"
+SEM_INSTANTANEO = "sem instantâneo"
+
+_JS_DESLIGADO = {"profile.managed_default_content_settings.javascript": 2}
+
+
+def seletores_do_fluxo(fluxo, meta=None):
+    """Seletores de paginas.py do fluxo (o link do veículo depende da placa capturada)"""
+    if fluxo == ECRV:
+        return {**SELETORES_ECRV, "frame_body": (By.NAME, FRAME_ECRV)}
+    seletores = dict(SELETORES_FREITAS)
+    if meta and meta.get("placa"):
+        seletores["link_veiculo"] = link_veiculo(meta["placa"])
+    return seletores
+
+
+def seletores_sem_etapa():
+    """Seletores de paginas.py que nenhuma etapa confere (precisam de uma etapa nova)"""
+    faltando = []
+    for fluxo, dicionario in ((ECRV, SELETORES_ECRV), (FREITAS, SELETORES_FREITAS)):
+        conferidos = {nome for nomes in ETAPAS[fluxo].values() for nome in nomes}
+        faltando += [f"{fluxo}.{nome}" for nome in dicionario if nome not in conferidos]
+    return faltando
+
+
+# ==============================
+# CAPTURA
+# ==============================
+
+def salvar_instantaneo(driver, pasta, fluxo, etapa, **meta):
+    """Grava o DOM atual (do frame em que o driver está) e os metadados da etapa"""
+    destino = Path(pasta) / fluxo
+    destino.mkdir(parents=True, exist_ok=True)
+    (destino / f"{etapa}.html").write_text(driver.page_source, encoding="utf-8")
+    meta = {"url": driver.current_url, "capturado_em": time.strftime('%Y-%m-%d %H:%M:%S'), **meta}
+    (destino / f"{etapa}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"   📸 {fluxo}/{etapa}.html")
+
+
+def capturar_ecrv(pasta, aguardar_login=None):
+    """Login (sessão salva ou manual), frameset, menu e formulário do ATPV"""
+    pdf = importlib.import_module("PDF")
+    pasta_download = Path(tempfile.mkdtemp(prefix="instantaneos_ecrv_"))
+    driver = pdf.criar_driver_edge(pasta_download)
+    try:
+        if aguardar_login:
+            aguardar_login(driver)
+        else:
+            pdf.entrar_ecrv(driver, PASTA_SCRIPT / pdf.ARQUIVO_SESSAO)
+        driver.switch_to.default_content()
+        salvar_instantaneo(driver, pasta, ECRV, "inicio")
+
+        aguardar_frame(driver, FRAME_ECRV)
+        salvar_instantaneo(driver, pasta, ECRV, "menu")
+        driver.switch_to.default_content()
+
+        PaginaEcrv(driver).abrir_formulario()
+        salvar_instantaneo(driver, pasta, ECRV, "formulario")
+    finally:
+        driver.quit()
+
+
+def capturar_freitas(pasta, placa, login=None):
+    """Área logada, listagem, pesquisa da placa e página do veículo (aba Leilão), sem salvar nada"""
+    lancamento = importlib.import_module("Lançamento")
+    seletores = lancamento.SELECTORS
+    automatizador = lancamento.AutomatizadorFreitas()
+    if login:
+        automatizador.login = lambda: login(automatizador)
+    if not automatizador.iniciar_navegador():
+        raise RuntimeError("Não foi possível abrir o navegador")
+    driver = automatizador.driver
+    try:
+        automatizador.login()
+        salvar_instantaneo(driver, pasta, FREITAS, "area")
+
+        automatizador.listar_todos_veiculos()
+        salvar_instantaneo(driver, pasta, FREITAS, "listagem")
+
+        campo = aguardar_visivel(driver, seletores["campo_pesquisa"])
+        campo.clear()
+        campo.send_keys(placa)
+        driver.find_element(*seletores["botao_pesquisar"]).click()
+        link = aguardar_clicavel(driver, link_veiculo(placa))
+        salvar_instantaneo(driver, pasta, FREITAS, "pesquisa", placa=placa)
+
+        link.click()
+        aguardar_clicavel(driver, seletores["aba_leilao"]).click()
+        aguardar_habilitado(driver, seletores["campo_emissao"])
+        salvar_instantaneo(driver, pasta, FREITAS, "veiculo", placa=placa)
+    finally:
+        automatizador.medidor.fechar()
+        automatizador.vigia.fechar()
+        driver.quit()
+
+
+def capturar_mock(pasta):
+    """Instantâneos das páginas do servidor_mock (confere se o mock acompanha os seletores)"""
+    os.environ.setdefault("NAVEGADOR_HEADLESS", "1")
+    from servidor_mock import ITENS_POR_PAGINA, iniciar_servidor
+
+    placas = [f"MCK{i:04d}" for i in range(ITENS_POR_PAGINA + 1)]
+    servidor, url_base = iniciar_servidor(placas_cadastradas=placas, atraso_aba_ms=0)
+    temporaria = Path(tempfile.mkdtemp(prefix="instantaneos_mock_"))
+    try:
+        pdf = importlib.import_module("PDF")
+        pdf.ECRV_URL = url_base
+        capturar_ecrv(pasta, aguardar_login=lambda driver: driver.get(url_base))
+
+        lancamento = importlib.import_module("Lançamento")
+        lancamento.URL_LOGIN = url_base + "Home/Login"
+        lancamento.SESSAO_PATH = str(temporaria / "sessao_freitas.json")
+        lancamento.INDICE_PATH = str(temporaria / "indice_veiculos.json")
+        lancamento.LATENCIA_PATH = str(temporaria / "latencia_lancamento.jsonl")
+        lancamento.MEMORIA_PATH = str(temporaria / "memoria_lancamento.jsonl")
+
+        def login_mock(automatizador):
+            driver = automatizador.driver
+            driver.get(lancamento.URL_LOGIN)
+            driver.find_element(By.ID, "linkArea").click()
+            aguardar_nova_aba(driver, 1)
+            driver.switch_to.window(driver.window_handles[-1])
+            aguardar_visivel(driver, lancamento.SELECTORS["campo_pesquisa"])
+
+        capturar_freitas(pasta, placas[0], login=login_mock)
+    finally:
+        servidor.shutdown()
+
+
+# ==============================
+# VERIFICAÇÃO
+# ==============================
+
+def criar_driver_verificacao(navegador=CHROME):
+    """Navegador headless enxuto e sem JavaScript (o DOM salvo não pode se alterar)"""
+    options = webdriver.EdgeOptions() if navegador == EDGE else webdriver.ChromeOptions()
+    aplicar_perfil(options, ENXUTO)
+    prefs = dict(options.experimental_options.get("prefs", {}))
+    prefs.update(_JS_DESLIGADO)
+    options.add_experimental_option("prefs", prefs)
+    return criar_driver(navegador, options)
+
+
+def instantaneo(pasta, fluxo, etapa):
+    """(html, meta) da etapa; o frameset do e-CRV cai em pagina_completa.html"""
+    arquivo = Path(pasta) / fluxo / f"{etapa}.html"
+    if not arquivo.exists():
+        if fluxo == ECRV and etapa == "inicio" and PAGINA_INICIAL_PADRAO.exists():
+            return PAGINA_INICIAL_PADRAO, {}
+        return None, {}
+    try:
+        meta = json.loads(arquivo.with_suffix(".json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        meta = {}
+    return arquivo, meta
+
+
+def conferir_seletor(driver, nome, seletor):
+    """Testa as alternativas em ordem; devolve (situacao, detalhe)"""
+    lista = alternativas(seletor)
+    for posicao, locator in enumerate(lista, start=1):
+        try:
+            encontrados = driver.find_elements(*locator)
+        except InvalidSelectorException as e:
+            return FALHOU, f"seletor inválido {locator}: {e.msg}"
+        if encontrados:
+            detalhe = f"{len(encontrados)}x {locator[0]}={locator[1]}"
+            if len(lista) > 1:
+                detalhe = f"alternativa {posicao}/{len(lista)}: {detalhe}"
+            return OK, detalhe
+    if nome in OPCIONAIS:
+        return AVISO, f"não encontrado ({OPCIONAIS[nome]})"
+    return FALHOU, f"nenhuma alternativa encontrou o elemento: {lista}"
+
+
+def verificar(fluxos=FLUXOS, pasta=PASTA_INSTANTANEOS, navegador=CHROME):
+    """Confere todos os seletores nos instantâneos; devolve [{fluxo, etapa, seletor, situacao, detalhe}]"""
+    resultados = []
+    driver = criar_driver_verificacao(navegador)
+    try:
+        for fluxo in fluxos:
+            for etapa, nomes in ETAPAS[fluxo].items():
+                arquivo, meta = instantaneo(pasta, fluxo, etapa)
+                if arquivo is None:
+                    resultados += [{"fluxo": fluxo, "etapa": etapa, "seletor": nome, "situacao": SEM_INSTANTANEO,
+                                    "detalhe": f"capture com: python verificar_seletores.py capturar {fluxo}"}
+                                   for nome in nomes]
+                    continue
+                driver.get(arquivo.as_uri())
+                seletores = seletores_do_fluxo(fluxo, meta)
+                for nome in nomes:
+                    if nome in seletores:
+                        situacao, detalhe = conferir_seletor(driver, nome, seletores[nome])
+                    else:
+                        situacao, detalhe = AVISO, "instantâneo sem a placa usada na captura"
+                    resultados.append({"fluxo": fluxo, "etapa": etapa, "seletor": nome,
+                                       "situacao": situacao, "detalhe": detalhe})
+    finally:
+        driver.quit()
+    return resultados
+
+
+def imprimir_resultados(resultados):
+    icones = {OK: "✅", FALHOU: "❌", AVISO: "⚠️ ", SEM_INSTANTANEO: "📭"}
+    for r in resultados:
+        etapa = f"{r['fluxo']}/{r['etapa']}"
+        print(f"{icones[r['situacao']]} {etapa:<20} {r['seletor']:<20} {r['detalhe']}")
+    for nome in seletores_sem_etapa():
+        print(f"⚠️  {nome}: nenhuma etapa confere este seletor")
+
+
+def conferir_seletores(fluxos=FLUXOS, pasta=PASTA_INSTANTANEOS, navegador=CHROME):
+    """
+    Verifica e imprime; True só se nenhum seletor quebrou e todas as etapas
+    tinham instantâneo (para rodar antes de um lote)
+    """
+    inicio = time.perf_counter()
+    resultados = verificar(fluxos, pasta, navegador)
+    imprimir_resultados(resultados)
+    falhas = [r for r in resultados if r["situacao"] == FALHOU]
+    sem_instantaneo = [r for r in resultados if r["situacao"] == SEM_INSTANTANEO]
+    print(f"\n🔎 {len(resultados)} seletores conferidos em {time.perf_counter() - inicio:.1f}s: "
+          f"{len(falhas)} quebrados, {len(sem_instantaneo)} sem instantâneo")
+    for fluxo in sorted({r["fluxo"] for r in sem_instantaneo}):
+        placa = " --placa ABC1D23" if fluxo == FREITAS else ""
+        print(f"📭 Faltam instantâneos do {fluxo}: rode antes python verificar_seletores.py capturar {fluxo}{placa}")
+    return not falhas and not sem_instantaneo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere os seletores contra páginas salvas, sem o portal")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    captura = subcomandos.add_parser("capturar", help="salva o DOM de cada etapa do fluxo")
+    captura.add_argument("fluxo", choices=[ECRV, FREITAS, "mock"])
+    captura.add_argument("--placa", help="placa cadastrada no Freitas (obrigatória para capturar freitas)")
+    captura.add_argument("--pasta", default=str(PASTA_INSTANTANEOS))
+
+    verificacao = subcomandos.add_parser("verificar", help="confere os seletores nos instantâneos")
+    verificacao.add_argument("fluxos", nargs="*", metavar="{ecrv,freitas}", help="padrão: os dois")
+    verificacao.add_argument("--pasta", default=str(PASTA_INSTANTANEOS))
+    verificacao.add_argument("--navegador", choices=[CHROME, EDGE], default=CHROME)
+    args = parser.parse_args()
+
+    if args.comando == "verificar":
+        fluxos = args.fluxos or list(FLUXOS)
+        desconhecidos = set(fluxos) - set(FLUXOS)
+        if desconhecidos:
+            parser.error(f"fluxo inválido: {', '.join(sorted(desconhecidos))} (use {ECRV} ou {FREITAS})")
+        sys.exit(0 if conferir_seletores(fluxos, args.pasta, args.navegador) else 1)
+
+    if args.fluxo == ECRV:
+        capturar_ecrv(args.pasta)
+    elif args.fluxo == FREITAS:
+        if not args.placa:
+            parser.error("capturar freitas precisa de --placa")
+        capturar_freitas(args.pasta, args.placa)
+    else:
+        capturar_mock(args.pasta)
+    print(f"✅ Instantâneos em {args.pasta}; confira com: python verificar_seletores.py verificar")
+
+
+if __name__ == "__main__":
+    main()